@@ -0,0 +1,349 @@
+"""Load test one MCP server instance with many concurrent client sessions.
+
+Every session opens its own MCP client, picks tools from a weighted mix and
+calls them back to back until the run ends. The server syncs a generated
+policy repository from the offline fake GitHub API used by the tests, and
+optional refresh events push new commits while the run is in progress.
+
+With ``--transport http`` the server listens on a local port and clients use
+streamable HTTP; with ``memory`` they use the in-process transport. Clients
+and server share one process, so RSS and open file descriptors cover both.
+
+Run with:
+
+    uv run python benchmarks/bench_load.py --clients 100 --duration 10
+    uv run python benchmarks/bench_load.py --transport http --refresh-every 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import resource
+import shutil
+import socket
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import uvicorn
+from fastmcp import Client
+
+from policygate.config.logging import logger
+from policygate.domains.gateway.services import PolicyGatewayService
+from policygate.entry_points import mcp_server
+from policygate.infrastructure.repository.github_repository_gateway import (
+    GitHubRepositoryGateway,
+)
+from policygate.infrastructure.repository.refresh_scheduler import RateLimitBudget
+
+# The fake GitHub API lives with the tests; make it importable when this
+# script is run by path.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tests.fake_github import FakeGitHubApi
+
+TOOL_NAMES = {
+    "outline": "outline_router",
+    "read": "read_rules",
+    "search": "search_rules",
+    "copy": "copy_scripts",
+    "hashes": "rule_hashes",
+}
+_SEARCH_WORDS = ["deploy", "review", "security", "tests", "logging", "release"]
+
+
+@dataclass
+class _Results:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    rss_bytes: list[int] = field(default_factory=list)
+    open_fds: list[int] = field(default_factory=list)
+    refreshes: int = 0
+
+
+def _build_files(rule_count: int, task_count: int, script_count: int) -> dict[str, str]:
+    rng = random.Random(0)
+    lines = ["tasks:"]
+    for task in range(task_count):
+        rules = rng.sample(range(rule_count), min(5, rule_count))
+        scripts = rng.sample(range(script_count), min(2, script_count))
+        lines += [
+            f"  task_{task}:",
+            f"    description: Task {task} about {rng.choice(_SEARCH_WORDS)}",
+            f"    rules: [{', '.join(f'rule_{index}' for index in rules)}]",
+            f"    scripts: [{', '.join(f'script_{index}' for index in scripts)}]",
+        ]
+    lines.append("rules:")
+    files: dict[str, str] = {}
+    for index in range(rule_count):
+        lines += [
+            f"  rule_{index}:",
+            f"    path: rules/rule_{index}.md",
+            f"    description: Rule {index} on {rng.choice(_SEARCH_WORDS)}",
+        ]
+        words = " ".join(rng.choices(_SEARCH_WORDS, k=12))
+        files[f"rules/rule_{index}.md"] = f"# Rule {index}\n" + f"{words}.\n" * 40
+    lines.append("scripts:")
+    for index in range(script_count):
+        lines += [
+            f"  script_{index}:",
+            f"    path: scripts/script_{index}.py",
+            f"    description: Script {index}",
+        ]
+        files[f"scripts/script_{index}.py"] = f"print({index})\n"
+    files["router.yaml"] = "\n".join(lines) + "\n"
+    return files
+
+
+def _parse_mix(raw: str) -> dict[str, float]:
+    mix: dict[str, float] = {}
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        tool = TOOL_NAMES.get(name.strip(), name.strip())
+        if tool not in TOOL_NAMES.values():
+            raise SystemExit(f"unknown tool in --mix: {name}")
+        mix[tool] = float(weight or 1)
+    return mix
+
+
+def _arguments(
+    tool: str,
+    rng: random.Random,
+    rule_count: int,
+    script_count: int,
+) -> dict[str, Any]:
+    if tool == "read_rules":
+        picked = rng.sample(range(rule_count), rng.randint(1, min(5, rule_count)))
+        return {"rule_names": [f"rule_{index}" for index in picked]}
+    if tool == "search_rules":
+        return {"query": " ".join(rng.sample(_SEARCH_WORDS, 2)), "limit": 5}
+    if tool == "copy_scripts":
+        return {"script_names": [f"script_{rng.randrange(script_count)}"]}
+    if tool == "outline_router" and rng.random() < 0.5:
+        return {"section": "rules", "offset": rng.randrange(rule_count), "limit": 20}
+    return {}
+
+
+async def _session(
+    connect: Callable[[], Client],
+    mix: dict[str, float],
+    args: argparse.Namespace,
+    deadline: float,
+    seed: int,
+    results: _Results,
+) -> None:
+    rng = random.Random(seed)
+    tools = list(mix)
+    weights = list(mix.values())
+    async with connect() as client:
+        while time.perf_counter() < deadline:
+            tool = rng.choices(tools, weights)[0]
+            arguments = _arguments(tool, rng, args.rules, args.scripts)
+            started = time.perf_counter()
+            result = await client.call_tool(tool, arguments, raise_on_error=False)
+            elapsed = time.perf_counter() - started
+            if result.is_error:
+                results.errors[tool] += 1
+                continue
+            results.latencies[tool].append(elapsed)
+            if tool == "copy_scripts":
+                shutil.rmtree(result.data["destination_directory"], ignore_errors=True)
+
+
+async def _push_commits(
+    api: FakeGitHubApi,
+    gateway: GitHubRepositoryGateway,
+    every_seconds: float,
+    deadline: float,
+    results: _Results,
+) -> None:
+    while time.perf_counter() + every_seconds < deadline:
+        await asyncio.sleep(every_seconds)
+        results.refreshes += 1
+        before = api.sha
+        api.sha = f"sha-{results.refreshes + 1}"
+        api.files["rules/rule_0.md"] = f"# Rule 0\nrevision {results.refreshes}\n"
+        gateway.notify_push("owner/repo", api.sha, before=before)
+
+
+async def _sample_resources(results: _Results, deadline: float) -> None:
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    while time.perf_counter() < deadline:
+        try:
+            resident_pages = int(Path("/proc/self/statm").read_text().split()[1])
+            results.rss_bytes.append(resident_pages * page_size)
+            results.open_fds.append(len(os.listdir("/proc/self/fd")))
+        except OSError:
+            return
+        await asyncio.sleep(0.2)
+
+
+async def _wait_for_port(port: int, timeout_seconds: float = 10.0) -> None:
+    deadline = time.perf_counter() + timeout_seconds
+    while time.perf_counter() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            await asyncio.sleep(0.05)
+            continue
+        writer.close()
+        await writer.wait_closed()
+        return
+    raise SystemExit(f"HTTP server did not start on port {port}")
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+async def _run(
+    args: argparse.Namespace,
+    api: FakeGitHubApi,
+    gateway: GitHubRepositoryGateway,
+) -> tuple[_Results, float]:
+    results = _Results()
+    mix = _parse_mix(args.mix)
+    server: uvicorn.Server | None = None
+    server_task: asyncio.Task[None] | None = None
+    if args.transport == "http":
+        port = _free_port()
+        server = uvicorn.Server(
+            uvicorn.Config(
+                mcp_server.mcp.http_app(),
+                host="127.0.0.1",
+                port=port,
+                log_level="warning",
+            )
+        )
+        server_task = asyncio.create_task(server.serve())
+        await _wait_for_port(port)
+        url = f"http://127.0.0.1:{port}/mcp"
+
+        def connect() -> Client:
+            return Client(url)
+
+    else:
+
+        def connect() -> Client:
+            return Client(mcp_server.mcp)
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    background = [asyncio.create_task(_sample_resources(results, deadline))]
+    if args.refresh_every > 0:
+        background.append(
+            asyncio.create_task(
+                _push_commits(api, gateway, args.refresh_every, deadline, results)
+            )
+        )
+    try:
+        await asyncio.gather(
+            *(
+                _session(connect, mix, args, deadline, args.seed + index, results)
+                for index in range(args.clients)
+            )
+        )
+        elapsed = time.perf_counter() - started
+        await asyncio.gather(*background)
+    finally:
+        if server is not None and server_task is not None:
+            server.should_exit = True
+            await server_task
+    return results, elapsed
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    index = min(int(fraction * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def _report(results: _Results, elapsed: float, revision: str | None) -> None:
+    print(f"{'tool':>16} {'calls':>7} {'errors':>6} {'p50 ms':>8} {'p99 ms':>8}")
+    everything: list[float] = []
+    for tool in sorted({*results.latencies, *results.errors}):
+        latencies = sorted(results.latencies[tool])
+        everything += latencies
+        p50 = _percentile(latencies, 0.5) * 1000 if latencies else float("nan")
+        p99 = _percentile(latencies, 0.99) * 1000 if latencies else float("nan")
+        print(
+            f"{tool:>16} {len(latencies):>7} {results.errors[tool]:>6} "
+            f"{p50:>8.2f} {p99:>8.2f}"
+        )
+    everything.sort()
+    if everything:
+        print(
+            f"{'all':>16} {len(everything):>7} {sum(results.errors.values()):>6} "
+            f"{_percentile(everything, 0.5) * 1000:>8.2f} "
+            f"{_percentile(everything, 0.99) * 1000:>8.2f}"
+        )
+    print(f"throughput: {len(everything) / elapsed:.1f} calls/s over {elapsed:.1f}s")
+    print(f"refresh events: {results.refreshes}, final revision: {revision}")
+    if results.rss_bytes:
+        print(
+            f"RSS: start {results.rss_bytes[0] / 2**20:.1f} MiB, "
+            f"peak {max(results.rss_bytes) / 2**20:.1f} MiB"
+        )
+        print(f"open fds: start {results.open_fds[0]}, peak {max(results.open_fds)}")
+    peak_rss_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"max RSS reported by getrusage: {peak_rss_kib / 1024:.1f} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--transport", choices=["memory", "http"], default="memory")
+    parser.add_argument(
+        "--mix",
+        default="outline=1,read=4,search=2,copy=1",
+        help="Weighted tools: outline, read, search, copy, hashes.",
+    )
+    parser.add_argument("--rules", type=int, default=500)
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--scripts", type=int, default=50)
+    parser.add_argument(
+        "--refresh-every",
+        type=float,
+        default=0.0,
+        help="Push a new commit every N seconds; 0 disables refresh events.",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    logger.setLevel(args.log_level)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    api = FakeGitHubApi(files=_build_files(args.rules, args.tasks, args.scripts))
+    with tempfile.TemporaryDirectory(prefix="policygate-load-") as temp_dir:
+        gateway = GitHubRepositoryGateway(
+            repository_url="https://github.com/owner/repo",
+            access_token="token",
+            local_repo_data_dir=str(Path(temp_dir) / "cache"),
+            refresh_interval_seconds=3600,
+            rate_limit_budget=RateLimitBudget(),
+            transport=api.transport(),
+            background_refresh=True,
+        )
+        gateway.force_refresh()
+        service = PolicyGatewayService(repository_gateway=gateway)
+        mcp_server.build_service = lambda: service
+        print(
+            f"clients={args.clients} transport={args.transport} "
+            f"rules={args.rules} mix={args.mix}"
+        )
+        results, elapsed = asyncio.run(_run(args, api, gateway))
+        _report(results, elapsed, gateway.current_revision())
+
+
+if __name__ == "__main__":
+    main()
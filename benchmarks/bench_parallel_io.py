@@ -0,0 +1,90 @@
+"""Benchmark sequential and parallel batched reads and copies on a slow filesystem.
+
+Per-file latency is simulated by sleeping inside the gateway file hooks, which
+approximates network filesystems and cold page caches.
+
+Run with:
+
+    uv run python benchmarks/bench_parallel_io.py --files 48 --latency-ms 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from policygate.infrastructure.repository.github_repository_gateway import (
+    GitHubRepositoryGateway,
+)
+
+
+class SlowFilesystemGateway(GitHubRepositoryGateway):
+    """Gateway whose per-file operations pay a fixed simulated latency."""
+
+    def __init__(self, latency_seconds: float, **kwargs: object) -> None:
+        super().__init__(**kwargs)
+        self._latency_seconds = latency_seconds
+
+    def _read_file_text(self, source: Path) -> str:
+        time.sleep(self._latency_seconds)
+        return super()._read_file_text(source)
+
+    def _copy_file(self, source: Path, target: Path) -> None:
+        time.sleep(self._latency_seconds)
+        super()._copy_file(source, target)
+
+
+def _measure(
+    gateway: GitHubRepositoryGateway,
+    paths: list[str],
+    out: Path,
+) -> tuple[float, float]:
+    started = time.perf_counter()
+    gateway.read_many_texts(paths)
+    read_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    gateway.copy_many_files(paths, destination_directory=str(out))
+    copy_seconds = time.perf_counter() - started
+    return read_seconds, copy_seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=48)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="policygate-bench-") as temp_dir:
+        cache = Path(temp_dir) / "cache"
+        (cache / "rules").mkdir(parents=True)
+        paths: list[str] = []
+        for number in range(args.files):
+            relative_path = f"rules/rule{number}.md"
+            (cache / relative_path).write_text("# rule\n" * 200, encoding="utf-8")
+            paths.append(relative_path)
+
+        print(f"files={args.files} latency={args.latency_ms}ms")
+        for workers in (1, args.workers):
+            gateway = SlowFilesystemGateway(
+                latency_seconds=args.latency_ms / 1000,
+                repository_url="https://github.com/owner/repo",
+                access_token="token",
+                local_repo_data_dir=str(cache),
+                io_workers=workers,
+            )
+            read_seconds, copy_seconds = _measure(
+                gateway, paths, Path(temp_dir) / f"out-{workers}"
+            )
+            mode = "sequential" if workers == 1 else f"parallel({workers})"
+            print(
+                f"{mode:>14}: read {read_seconds * 1000:8.1f} ms  "
+                f"copy {copy_seconds * 1000:8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
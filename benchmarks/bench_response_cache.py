@@ -0,0 +1,104 @@
+"""Benchmark MCP tool calls with and without the tool response cache.
+
+Calls go through the in-memory ``fastmcp.Client`` transport against a local
+directory repository, so timings include argument validation, the service
+call and result encoding, but no network.
+
+Run with:
+
+    uv run python benchmarks/bench_response_cache.py --rules 200 --calls 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from fastmcp import Client
+
+from policygate.domains.gateway.services import PolicyGatewayService
+from policygate.entry_points import mcp_server
+from policygate.infrastructure.repository.local_directory_gateway import (
+    LocalDirectoryRepositoryGateway,
+)
+
+
+def _write_repository(root: Path, rule_count: int) -> None:
+    (root / "rules").mkdir(parents=True)
+    lines = ["tasks:", "  task_0:", "    description: Task", "    rules: [rule_0]"]
+    lines.append("rules:")
+    for index in range(rule_count):
+        (root / "rules" / f"rule_{index}.md").write_text(
+            f"# Rule {index}\n" + "Follow the documented procedure.\n" * 100,
+            encoding="utf-8",
+        )
+        lines += [
+            f"  rule_{index}:",
+            f"    path: rules/rule_{index}.md",
+            f"    description: Rule number {index}",
+        ]
+    (root / "router.yaml").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+async def _measure(
+    client: Client,
+    name: str,
+    arguments: dict[str, Any],
+    calls: int,
+    cached: bool,
+) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        if not cached:
+            mcp_server.response_cache.clear()
+        await client.call_tool(name=name, arguments=arguments)
+    return (time.perf_counter() - started) / calls
+
+
+async def _run(rule_count: int, calls: int, aliases: int) -> None:
+    async with Client(mcp_server.mcp) as client:
+        cases = {
+            "outline_router": {},
+            f"read_rules({aliases})": {
+                "rule_names": [f"rule_{index}" for index in range(aliases)]
+            },
+            "search_rules": {"query": "documented procedure", "limit": 10},
+        }
+        print(f"rules={rule_count} calls={calls}")
+        for label, arguments in cases.items():
+            name = label.split("(")[0]
+            await client.call_tool(name=name, arguments=arguments)
+            uncached = await _measure(client, name, arguments, calls, cached=False)
+            cached = await _measure(client, name, arguments, calls, cached=True)
+            print(
+                f"{label:>16}: uncached {uncached * 1000:7.3f} ms/call  "
+                f"cached {cached * 1000:7.3f} ms/call  "
+                f"speedup {uncached / cached:5.1f}x"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--aliases", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="policygate-bench-") as temp_dir:
+        root = Path(temp_dir)
+        _write_repository(root, args.rules)
+        service = PolicyGatewayService(
+            repository_gateway=LocalDirectoryRepositoryGateway(
+                root_dir=str(root), poll_interval_seconds=60
+            )
+        )
+        mcp_server.build_service = lambda: service
+        asyncio.run(_run(args.rules, args.calls, min(args.aliases, args.rules)))
+
+
+if __name__ == "__main__":
+    main()
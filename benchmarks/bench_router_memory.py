@@ -0,0 +1,99 @@
+"""Benchmark memory and build time of pydantic router models and the compact router.
+
+Both representations are built from the same parsed router document, so the
+numbers exclude YAML parsing and compare only the in-memory forms.
+
+Run with:
+
+    uv run python benchmarks/bench_router_memory.py --rules 20000 --tasks 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from policygate.domains.gateway.compact_router import CompactRouter
+from policygate.domains.gateway.models import RouterConfig
+
+_DESCRIPTIONS = [
+    "Python style guide",
+    "Security review checklist",
+    "Database migration policy",
+    "Release process",
+    "Logging conventions",
+]
+
+
+def _router_document(rule_count: int, task_count: int, seed: int) -> dict[str, Any]:
+    rng = random.Random(seed)
+    rules = {
+        f"rule_{index}": {
+            "path": f"rules/rule_{index}.md",
+            "description": rng.choice(_DESCRIPTIONS),
+        }
+        for index in range(rule_count)
+    }
+    scripts = {
+        f"script_{index}": {
+            "path": f"scripts/script_{index}.py",
+            "description": rng.choice(_DESCRIPTIONS),
+        }
+        for index in range(max(rule_count // 10, 1))
+    }
+    tasks = {
+        f"task_{index}": {
+            "description": rng.choice(_DESCRIPTIONS),
+            # Copy aliases so every reference is a distinct string, as from YAML.
+            "rules": ["".join(alias) for alias in rng.sample(list(rules), 20)],
+            "scripts": ["".join(alias) for alias in rng.sample(list(scripts), 2)],
+        }
+        for index in range(task_count)
+    }
+    return {"tasks": tasks, "rules": rules, "scripts": scripts}
+
+
+def _measure(build: Callable[[], object]) -> tuple[float, int]:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, retained
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", type=int, default=20000)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    document = _router_document(args.rules, args.tasks, args.seed)
+    config = RouterConfig.model_validate(document)
+
+    model_seconds, model_bytes = _measure(lambda: RouterConfig.model_validate(document))
+    compact_seconds, compact_bytes = _measure(lambda: CompactRouter.from_config(config))
+
+    print(f"rules={args.rules} tasks={args.tasks}")
+    print(
+        f"pydantic models: {model_bytes / 1e6:8.2f} MB  built in {model_seconds:.3f}s"
+    )
+    print(
+        f"compact router:  {compact_bytes / 1e6:8.2f} MB  built in {compact_seconds:.3f}s"
+        " (from validated models)"
+    )
+    print(f"retained memory ratio: {compact_bytes / model_bytes:.2f}")
+
+
+if __name__ == "__main__":
+    main()
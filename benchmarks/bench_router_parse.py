@@ -0,0 +1,89 @@
+"""Benchmark router loading time versus router size for each loading path.
+
+Compares the pure-Python and libyaml YAML loaders followed by validation with
+loading the JSON router cache written at sync time.
+
+Run with:
+
+    uv run python benchmarks/bench_router_parse.py --sizes 100 1000 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Callable
+from functools import partial
+
+import yaml
+
+from policygate.domains.gateway.compact_router import CompactRouter
+from policygate.domains.gateway.compiler import (
+    dump_router_cache,
+    load_router_cache,
+    parse_router,
+)
+from policygate.domains.gateway.models import RouterConfig
+
+
+def _router_yaml(rule_count: int) -> str:
+    lines = ["tasks:"]
+    for index in range(max(rule_count // 10, 1)):
+        aliases = ", ".join(
+            f"rule_{(index * 10 + offset) % rule_count}" for offset in range(10)
+        )
+        lines += [
+            f"  task_{index}:",
+            f"    description: Task number {index}",
+            f"    rules: [{aliases}]",
+        ]
+    lines.append("rules:")
+    for index in range(rule_count):
+        lines += [
+            f"  rule_{index}:",
+            f"    path: rules/rule_{index}.md",
+            f"    description: Rule number {index} for the benchmark",
+        ]
+    lines.append("scripts: {}")
+    return "\n".join(lines) + "\n"
+
+
+def _python_loader(raw: str) -> CompactRouter:
+    parsed = yaml.load(raw, Loader=yaml.SafeLoader)
+    return CompactRouter.from_config(RouterConfig.model_validate(parsed))
+
+
+def _best_of(operation: Callable[[], object], repeat: int) -> float:
+    timings: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"libyaml available: {yaml.__with_libyaml__}")
+    print(f"{'rules':>8} {'SafeLoader':>12} {'CSafeLoader':>12} {'JSON cache':>12}")
+    for size in args.sizes:
+        raw = _router_yaml(size)
+        cache = dump_router_cache(parse_router(raw), router_sha256="bench")
+
+        python_seconds = _best_of(partial(_python_loader, raw), args.repeat)
+        c_seconds = _best_of(partial(parse_router, raw), args.repeat)
+        cache_seconds = _best_of(
+            partial(load_router_cache, cache, "bench"), args.repeat
+        )
+        print(
+            f"{size:>8} {python_seconds * 1000:>10.1f}ms {c_seconds * 1000:>10.1f}ms "
+            f"{cache_seconds * 1000:>10.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
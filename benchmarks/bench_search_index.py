@@ -0,0 +1,112 @@
+"""Benchmark rule search index build and query time at ten-thousand-rule scale.
+
+Run with:
+
+    uv run python benchmarks/bench_search_index.py --rules 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+
+from policygate.domains.gateway.search import RuleSearchIndex, SearchDocument
+
+_VOCABULARY = [
+    "python",
+    "security",
+    "review",
+    "database",
+    "migration",
+    "logging",
+    "tests",
+    "api",
+    "schema",
+    "deploy",
+    "kubernetes",
+    "docker",
+    "frontend",
+    "react",
+    "performance",
+    "cache",
+    "latency",
+    "secrets",
+    "tokens",
+    "style",
+    "lint",
+    "format",
+    "release",
+    "changelog",
+    "docs",
+    "typing",
+    "async",
+    "threads",
+]
+
+
+def _build_documents(rule_count: int, words_per_rule: int) -> list[SearchDocument]:
+    rng = random.Random(42)
+    documents: list[SearchDocument] = []
+    for number in range(rule_count):
+        description = " ".join(rng.choices(_VOCABULARY, k=6))
+        body = " ".join(rng.choices(_VOCABULARY, k=words_per_rule))
+        documents.append(
+            SearchDocument(
+                alias=f"rule_{number}",
+                description=description,
+                metadata_text=description,
+                body=body,
+            )
+        )
+    return documents
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", type=int, default=10_000)
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    documents = _build_documents(args.rules, args.words)
+
+    started = time.perf_counter()
+    index = RuleSearchIndex(documents=documents, revision="sha-1")
+    full_build = time.perf_counter() - started
+
+    changed = list(documents)
+    for position in range(0, len(changed), 100):
+        original = changed[position]
+        changed[position] = SearchDocument(
+            alias=original.alias,
+            description=original.description,
+            metadata_text=original.metadata_text,
+            body=f"{original.body} updated",
+        )
+    started = time.perf_counter()
+    rebuilt = RuleSearchIndex(documents=changed, revision="sha-2", previous=index)
+    incremental_build = time.perf_counter() - started
+
+    rng = random.Random(7)
+    timings: list[float] = []
+    for _ in range(args.queries):
+        query = " ".join(rng.choices(_VOCABULARY, k=3))
+        started = time.perf_counter()
+        rebuilt.search(query, limit=10)
+        timings.append(time.perf_counter() - started)
+
+    timings.sort()
+    print(f"rules={args.rules} words_per_rule={args.words}")
+    print(f"full build:        {full_build * 1000:9.1f} ms")
+    print(
+        f"incremental build: {incremental_build * 1000:9.1f} ms "
+        f"(reused {rebuilt.reused_count}/{len(rebuilt)})"
+    )
+    print(f"query p50:         {statistics.median(timings) * 1000:9.2f} ms")
+    print(f"query p99:         {timings[int(len(timings) * 0.99) - 1] * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""On-demand profiling of tool calls and slow-call records."""
+
+from __future__ import annotations
+
+import cProfile
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal, Protocol
+
+from policygate.config.logging import logger
+from policygate.config.settings import Settings
+from policygate.config.tracing import Span, tracer
+
+ProfilingMode = Literal["cprofile", "sampling"]
+
+_TOOL_SPAN_PREFIX = "tool."
+_MAX_PROFILE_FILES = 200
+
+
+@dataclass(frozen=True)
+class ProfilingStatus:
+    """Current profiling configuration and most recent profile files."""
+
+    mode: ProfilingMode
+    armed_calls: int
+    slow_call_threshold_ms: float | None
+    profile_slow_calls: bool
+    profile_dir: str
+    recent_profiles: list[str]
+
+
+class _Collector(Protocol):
+    suffix: str
+
+    def start(self) -> None: ...
+
+    def stop(self) -> None: ...
+
+    def save(self, path: Path) -> None: ...
+
+
+class _CProfileCollector:
+    """Deterministic profile of the calling thread, saved as pstats."""
+
+    suffix = ".pstats"
+
+    def __init__(self) -> None:
+        self._profile = cProfile.Profile()
+
+    def start(self) -> None:
+        self._profile.enable()
+
+    def stop(self) -> None:
+        self._profile.disable()
+
+    def save(self, path: Path) -> None:
+        self._profile.dump_stats(path)
+
+
+class _StackSampler:
+    """Periodic stack samples of one thread, saved as collapsed stacks."""
+
+    suffix = ".collapsed"
+
+    def __init__(self, thread_id: int, interval_seconds: float) -> None:
+        self._thread_id = thread_id
+        self._interval_seconds = interval_seconds
+        self._stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="policygate-profiler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def save(self, path: Path) -> None:
+        lines = [f"{stack} {count}" for stack, count in self._stacks.most_common()]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval_seconds):
+            frame = sys._current_frames().get(self._thread_id)
+            frames: list[str] = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{Path(code.co_filename).stem}:{code.co_qualname}")
+                frame = frame.f_back
+            if frames:
+                self._stacks[";".join(reversed(frames))] += 1
+
+
+class ToolProfiler:
+    """Profile selected tool calls and log slow ones with a stage breakdown.
+
+    A call is profiled while the profiler is armed for the next calls, or
+    always when slow-call profiling is on; then only profiles of calls above
+    the threshold are kept. One call is profiled at a time and concurrent
+    calls run unprofiled.
+
+    Slow-call records are built from tracing spans: the profiler is a span
+    exporter that collects spans per trace until the root tool span ends.
+    """
+
+    def __init__(self, sample_interval_seconds: float = 0.005) -> None:
+        self._sample_interval_seconds = sample_interval_seconds
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+        self._profile_dir = Path("~/.policygate/profiles").expanduser()
+        self._mode: ProfilingMode = "cprofile"
+        self._armed_calls = 0
+        self._slow_call_threshold_ms: float | None = None
+        self._profile_slow_calls = False
+        self._pending: dict[str, list[Span]] = {}
+        self._saved: list[Path] = []
+
+    def configure(
+        self,
+        *,
+        profile_dir: str | None = None,
+        mode: ProfilingMode | None = None,
+        next_calls: int = 0,
+        slow_call_threshold_ms: float | None = None,
+        profile_slow_calls: bool = False,
+    ) -> ProfilingStatus:
+        """Replace the profiling configuration; ``None`` keeps dir and mode."""
+        with self._lock:
+            if profile_dir is not None:
+                self._profile_dir = Path(profile_dir).expanduser().resolve()
+            if mode is not None:
+                self._mode = mode
+            self._armed_calls = max(next_calls, 0)
+            self._slow_call_threshold_ms = slow_call_threshold_ms
+            self._profile_slow_calls = (
+                profile_slow_calls and slow_call_threshold_ms is not None
+            )
+            self._pending.clear()
+
+        if slow_call_threshold_ms is None:
+            tracer.remove_exporter(self)
+        else:
+            tracer.add_exporter(self)
+        logger.info(
+            "Configured tool call profiling",
+            extra={
+                "mode": self._mode,
+                "armed_calls": self._armed_calls,
+                "slow_call_threshold_ms": slow_call_threshold_ms,
+                "profile_slow_calls": self._profile_slow_calls,
+            },
+        )
+        return self.status()
+
+    def status(self) -> ProfilingStatus:
+        """Return current configuration and the latest saved profiles."""
+        with self._lock:
+            return ProfilingStatus(
+                mode=self._mode,
+                armed_calls=self._armed_calls,
+                slow_call_threshold_ms=self._slow_call_threshold_ms,
+                profile_slow_calls=self._profile_slow_calls,
+                profile_dir=str(self._profile_dir),
+                recent_profiles=[str(path) for path in self._saved[-10:]],
+            )
+
+    @contextmanager
+    def profile(self, tool_name: str) -> Iterator[None]:
+        """Profile the enclosed tool call when armed or profiling slow calls."""
+        if self._armed_calls == 0 and not self._profile_slow_calls:
+            yield
+            return
+        if not self._profile_lock.acquire(blocking=False):
+            yield
+            return
+
+        try:
+            with self._lock:
+                armed = self._armed_calls > 0
+                if armed:
+                    self._armed_calls -= 1
+                selected = armed or self._profile_slow_calls
+                threshold_ms = self._slow_call_threshold_ms
+                collector = self._new_collector(self._mode) if selected else None
+            if collector is None:
+                yield
+                return
+            try:
+                collector.start()
+            except ValueError as error:
+                logger.warning("Could not start profiler", extra={"error": str(error)})
+                yield
+                return
+
+            started = time.perf_counter()
+            try:
+                yield
+            finally:
+                collector.stop()
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                if armed or (threshold_ms is not None and elapsed_ms >= threshold_ms):
+                    self._save(collector, tool_name, elapsed_ms)
+        finally:
+            self._profile_lock.release()
+
+    def export(self, span: Span) -> None:
+        """Collect spans and log a slow-call record when a tool span ends."""
+        threshold_ms = self._slow_call_threshold_ms
+        if threshold_ms is None:
+            return
+        with self._lock:
+            if span.parent_span_id is not None:
+                self._pending.setdefault(span.trace_id, []).append(span)
+                return
+            children = self._pending.pop(span.trace_id, [])
+        if not span.name.startswith(_TOOL_SPAN_PREFIX):
+            return
+        if span.duration_ms < threshold_ms:
+            return
+
+        stages: dict[str, float] = {}
+        for child in children:
+            stages[child.name] = stages.get(child.name, 0.0) + child.duration_ms
+        logger.warning(
+            "Slow tool call",
+            extra={
+                "tool": span.name.removeprefix(_TOOL_SPAN_PREFIX),
+                "duration_ms": round(span.duration_ms, 3),
+                "stages_ms": {name: round(ms, 3) for name, ms in stages.items()},
+                "trace_id": span.trace_id,
+                "status": span.status,
+            },
+        )
+
+    def _new_collector(self, mode: ProfilingMode) -> _Collector:
+        if mode == "sampling":
+            return _StackSampler(
+                thread_id=threading.get_ident(),
+                interval_seconds=self._sample_interval_seconds,
+            )
+        return _CProfileCollector()
+
+    def _save(self, collector: _Collector, tool_name: str, elapsed_ms: float) -> None:
+        self._profile_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = self._profile_dir / (
+            f"{stamp}-{time.monotonic_ns() % 1_000_000:06d}-{tool_name}"
+            f"-{elapsed_ms:.0f}ms{collector.suffix}"
+        )
+        try:
+            collector.save(path)
+        except OSError as error:
+            logger.warning(
+                "Could not write tool call profile",
+                extra={"path": str(path), "error": str(error)},
+            )
+            return
+
+        with self._lock:
+            self._saved.append(path)
+            expired = self._saved[:-_MAX_PROFILE_FILES]
+            del self._saved[:-_MAX_PROFILE_FILES]
+        for old_path in expired:
+            old_path.unlink(missing_ok=True)
+        logger.info(
+            "Saved tool call profile",
+            extra={
+                "tool": tool_name,
+                "duration_ms": round(elapsed_ms, 3),
+                "path": str(path),
+            },
+        )
+
+
+profiler = ToolProfiler()
+
+
+def setup_profiling(settings: Settings) -> None:
+    """Configure the process-wide tool profiler from settings."""
+    profiler.configure(
+        profile_dir=settings.profiling_dir,
+        mode=settings.profiling_mode,
+        next_calls=settings.profiling_next_calls,
+        slow_call_threshold_ms=settings.slow_call_threshold_ms,
+        profile_slow_calls=settings.profiling_slow_calls,
+    )
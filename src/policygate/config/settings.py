@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -25,6 +27,87 @@ class Settings(BaseSettings):
         description="Log file path",
     )
 
+    # Tracing
+    tracing_enabled: bool = Field(
+        default=False,
+        description="Record timing spans for tool calls and their stages",
+    )
+    tracing_exporter: Literal["file", "memory"] = Field(
+        default="file",
+        description="Where finished spans go: JSON lines file or in-memory buffer",
+    )
+    tracing_file_path: str = Field(
+        default="~/.policygate/traces.jsonl",
+        description="Span output file for the file exporter",
+    )
+    tracing_sample_rate: float = Field(
+        default=1.0,
+        description="Fraction of tool calls whose traces are recorded",
+    )
+
+    # Profiling
+    profiling_dir: str = Field(
+        default="~/.policygate/profiles",
+        description="Directory receiving tool call profiles",
+    )
+    profiling_mode: Literal["cprofile", "sampling"] = Field(
+        default="cprofile",
+        description="cProfile pstats files or sampled collapsed stacks",
+    )
+    profiling_next_calls: int = Field(
+        default=0,
+        description="Number of tool calls profiled after startup",
+    )
+    slow_call_threshold_ms: float | None = Field(
+        default=None,
+        description="Log tool calls slower than this with a stage breakdown",
+    )
+    profiling_slow_calls: bool = Field(
+        default=False,
+        description="Profile every tool call and keep profiles of slow calls",
+    )
+
+    # Responses
+    response_cache_max_chars: int = Field(
+        default=8_000_000,
+        description="Text budget of cached tool responses per revision; 0 disables",
+    )
+
+    # Warm-up
+    warmup_enabled: bool = Field(
+        default=True,
+        description="Load the router and preload hot rules off the request path "
+        "at startup and after each sync",
+    )
+    warmup_top_rules: int = Field(
+        default=50,
+        description="Most read rules kept in memory by warm-up; 0 preloads none",
+    )
+
+    # Usage statistics
+    usage_stats_file: str = Field(
+        default="~/.policygate/usage.sqlite3",
+        description="SQLite file keeping alias usage across restarts; empty disables",
+    )
+    usage_flush_interval_seconds: float = Field(
+        default=30.0,
+        description="Interval between batched writes of recorded usage",
+    )
+
+    # Repository backend
+    repository_backend: Literal["github", "local"] = Field(
+        default="github",
+        description="Serve policies from GitHub or from a local directory",
+    )
+    local_repository_dir: str = Field(
+        default="",
+        description="Local checkout served directly by the local repository backend",
+    )
+    local_repository_poll_interval_seconds: float = Field(
+        default=1.0,
+        description="Minimum interval between local directory change scans",
+    )
+
     # GitHub repository integration
     github_repository_url: str = Field(
         default="",
@@ -34,6 +117,10 @@ class Settings(BaseSettings):
         default="",
         description="GitHub access token for repository access",
     )
+    github_api_url: str = Field(
+        default="https://api.github.com",
+        description="GitHub REST API base URL",
+    )
 
     # Local repository cache
     local_repo_data_dir: str = Field(
@@ -42,7 +129,77 @@ class Settings(BaseSettings):
     )
     repository_refresh_interval_seconds: int = Field(
         default=1800,
-        description="Minimal interval between remote refresh checks",
+        description="Initial interval between remote refresh checks",
+    )
+    repository_refresh_min_interval_seconds: int = Field(
+        default=60,
+        description="Shortest adaptive refresh interval, used right after a change",
+    )
+    repository_refresh_max_interval_seconds: int = Field(
+        default=7200,
+        description="Longest adaptive refresh interval for quiet repositories",
+    )
+    repository_sync_max_retries: int = Field(
+        default=3,
+        description="Retries for transient GitHub errors during one sync",
+    )
+    repository_sync_retry_backoff_seconds: float = Field(
+        default=0.5,
+        description="Base delay for jittered exponential retry backoff",
+    )
+    repository_background_refresh: bool = Field(
+        default=True,
+        description="Run conditional refresh checks off the request path",
+    )
+    repository_invalidate_file: str = Field(
+        default="",
+        description="File whose modification makes the next refresh check due",
+    )
+    repository_io_workers: int = Field(
+        default=8,
+        description="Maximum threads used for batched rule reads and script copies",
+    )
+    repository_cold_blob_min_bytes: int = Field(
+        default=0,
+        description="Store rule files at least this large gzip-compressed; 0 disables",
+    )
+    repository_cold_blob_promote_reads: int = Field(
+        default=3,
+        description="Reads after which a compressed rule file is stored plain again",
+    )
+    repository_sparse_sync: bool = Field(
+        default=False,
+        description="Store only files referenced by router.yaml, fetch others on use",
+    )
+    repository_sparse_tasks: str = Field(
+        default="",
+        description="Comma-separated tasks whose files a sparse sync stores",
+    )
+    repository_archive_max_file_bytes: int = Field(
+        default=16 * 1024 * 1024,
+        description="Largest policy file accepted from an archive; 0 disables",
+    )
+    repository_archive_max_total_bytes: int = Field(
+        default=256 * 1024 * 1024,
+        description="Total size of policy files accepted from an archive; 0 disables",
+    )
+    repository_archive_max_files: int = Field(
+        default=20_000,
+        description="Number of policy files accepted from an archive; 0 disables",
+    )
+
+    # Push webhook endpoint
+    webhook_port: int | None = Field(
+        default=None,
+        description="Port of the local GitHub push webhook endpoint; disabled if unset",
+    )
+    webhook_host: str = Field(
+        default="127.0.0.1",
+        description="Interface the push webhook endpoint listens on",
+    )
+    webhook_secret: str = Field(
+        default="",
+        description="Secret used to verify GitHub webhook signatures",
     )
 
 
@@ -0,0 +1,265 @@
+"""Lightweight span tracing with OpenTelemetry-compatible span records."""
+
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from collections.abc import Callable
+from contextvars import ContextVar, Token
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Protocol, Self
+
+from policygate.config.settings import Settings
+
+
+class SpanExporter(Protocol):
+    """Receiver of finished spans."""
+
+    def export(self, span: Span) -> None: ...
+
+
+class Span:
+    """Timed operation within a trace.
+
+    Spans nest through a context variable, so spans opened in worker threads
+    started with ``asyncio.to_thread`` keep their parent.
+    """
+
+    __slots__ = (
+        "_perf_start_ns",
+        "_token",
+        "_tracer",
+        "attributes",
+        "duration_ns",
+        "name",
+        "parent_span_id",
+        "span_id",
+        "start_time_ns",
+        "status",
+        "trace_id",
+    )
+
+    def __init__(
+        self,
+        tracer: Tracer,
+        name: str,
+        trace_id: str,
+        parent_span_id: str | None,
+        attributes: dict[str, Any],
+    ) -> None:
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent_span_id
+        self.attributes = attributes
+        self.status = "ok"
+        self.start_time_ns = 0
+        self.duration_ns = 0
+        self._perf_start_ns = 0
+        self._token: Token[Span | _Unsampled | None] | None = None
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration_ns / 1_000_000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the span in OpenTelemetry span field naming."""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "start_time_unix_nano": self.start_time_ns,
+            "end_time_unix_nano": self.start_time_ns + self.duration_ns,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+    def __enter__(self) -> Self:
+        self.start_time_ns = time.time_ns()
+        self._perf_start_ns = time.perf_counter_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.duration_ns = time.perf_counter_ns() - self._perf_start_ns
+        if exc is not None:
+            self.status = "error"
+            self.attributes["error"] = f"{type(exc).__name__}: {exc}"
+        if self._token is not None:
+            _current_span.reset(self._token)
+        self._tracer._export(self)
+
+
+class _NoopSpan:
+    """Shared span returned when tracing is disabled or inside unsampled traces."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        return None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        return None
+
+
+class _Unsampled(_NoopSpan):
+    """Root of a trace dropped by sampling; silences its child spans."""
+
+    __slots__ = ("_token",)
+
+    def __enter__(self) -> Self:
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        _current_span.reset(self._token)
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: ContextVar[Span | _Unsampled | None] = ContextVar(
+    "policygate_current_span", default=None
+)
+
+
+class Tracer:
+    """Create spans and hand finished ones to an exporter.
+
+    While disabled, ``span`` returns one shared no-op object, so instrumented
+    code pays a single attribute check per span. Sampling is decided once per
+    trace at its root span. Every finished span goes to all exporters.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._exporters: tuple[SpanExporter, ...] = ()
+        self._sample_rate = 1.0
+        self._random: Callable[[], float] = random.random
+
+    def configure(
+        self,
+        exporter: SpanExporter,
+        sample_rate: float = 1.0,
+        random_source: Callable[[], float] | None = None,
+    ) -> None:
+        """Enable tracing with the given exporter and root sampling rate."""
+        self._exporters = (exporter,)
+        self._sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self._random = random_source or random.random
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+        self._exporters = ()
+        self._sample_rate = 1.0
+
+    def add_exporter(self, exporter: SpanExporter) -> None:
+        """Send spans to one more exporter, enabling tracing if needed."""
+        if exporter not in self._exporters:
+            self._exporters = (*self._exporters, exporter)
+        self.enabled = True
+
+    def remove_exporter(self, exporter: SpanExporter) -> None:
+        """Stop sending spans to an exporter; tracing ends with the last one."""
+        self._exporters = tuple(item for item in self._exporters if item != exporter)
+        if not self._exporters:
+            self.disable()
+
+    def span(self, name: str, **attributes: Any) -> Span | _NoopSpan:
+        """Return a context manager timing one operation."""
+        if not self.enabled:
+            return _NOOP_SPAN
+
+        parent = _current_span.get()
+        if isinstance(parent, _Unsampled):
+            return _NOOP_SPAN
+        if parent is None:
+            if self._sample_rate < 1.0 and self._random() >= self._sample_rate:
+                return _Unsampled()
+            return Span(
+                tracer=self,
+                name=name,
+                trace_id=f"{random.getrandbits(128):032x}",
+                parent_span_id=None,
+                attributes=attributes,
+            )
+        return Span(
+            tracer=self,
+            name=name,
+            trace_id=parent.trace_id,
+            parent_span_id=parent.span_id,
+            attributes=attributes,
+        )
+
+    def _export(self, span: Span) -> None:
+        for exporter in self._exporters:
+            exporter.export(span)
+
+
+class InMemorySpanExporter:
+    """Keep finished spans in memory, for tests and interactive inspection."""
+
+    def __init__(self, max_spans: int = 10_000) -> None:
+        self._max_spans = max_spans
+        self._lock = threading.Lock()
+        self._spans: list[Span] = []
+
+    @property
+    def spans(self) -> list[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+            if len(self._spans) > self._max_spans:
+                del self._spans[: len(self._spans) - self._max_spans]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class JsonLinesSpanExporter:
+    """Append finished spans to a file as one JSON object per line."""
+
+    def __init__(self, file_path: str) -> None:
+        self._file_path = Path(file_path).expanduser().resolve()
+        self._file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock, self._file_path.open("a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+
+
+tracer = Tracer()
+
+
+def setup_tracing(settings: Settings) -> None:
+    """Configure the process-wide tracer from settings."""
+    if not settings.tracing_enabled:
+        tracer.disable()
+        return
+    exporter: SpanExporter
+    if settings.tracing_exporter == "memory":
+        exporter = InMemorySpanExporter()
+    else:
+        exporter = JsonLinesSpanExporter(settings.tracing_file_path)
+    tracer.configure(exporter=exporter, sample_rate=settings.tracing_sample_rate)
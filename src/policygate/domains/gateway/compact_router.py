@@ -0,0 +1,139 @@
+"""Compact immutable router representation built once per snapshot."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
+
+from policygate.domains.gateway.models import RouterConfig
+
+
+@dataclass(frozen=True, slots=True)
+class CompactTask:
+    """Task entry with rule and script aliases stored as tuples."""
+
+    description: str
+    rules: tuple[str, ...]
+    scripts: tuple[str, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class CompactAsset:
+    """Rule or script entry of the router; only rules have includes."""
+
+    path: str
+    description: str
+    includes: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class CompactRouter:
+    """Read-only router with interned strings and slotted entries.
+
+    Aliases, paths and descriptions are interned in a per-snapshot pool, so
+    an alias referenced by many tasks and repeated descriptions are stored
+    once and released together with the snapshot. Field names match the
+    pydantic models, which are only used to validate ``router.yaml``.
+    """
+
+    tasks: Mapping[str, CompactTask]
+    rules: Mapping[str, CompactAsset]
+    scripts: Mapping[str, CompactAsset]
+
+    @classmethod
+    def from_config(cls, config: RouterConfig) -> CompactRouter:
+        """Convert a validated router model into the compact form."""
+        return cls._build(
+            tasks=(
+                (name, task.description, task.rules, task.scripts)
+                for name, task in config.tasks.items()
+            ),
+            rules=(
+                (name, rule.path, rule.description, rule.includes)
+                for name, rule in config.rules.items()
+            ),
+            scripts=(
+                (name, script.path, script.description)
+                for name, script in config.scripts.items()
+            ),
+        )
+
+    @classmethod
+    def from_document(cls, document: Mapping[str, Any]) -> CompactRouter:
+        """Rebuild a router from ``to_document`` output without validation."""
+        return cls._build(
+            tasks=(
+                (name, description, rules, scripts)
+                for name, (description, rules, scripts) in document["tasks"].items()
+            ),
+            rules=(
+                (name, path, description, includes)
+                for name, (path, description, includes) in document["rules"].items()
+            ),
+            scripts=(
+                (name, path, description)
+                for name, (path, description) in document["scripts"].items()
+            ),
+        )
+
+    def to_document(self) -> dict[str, Any]:
+        """Return a JSON-compatible document accepted by ``from_document``."""
+        return {
+            "tasks": {
+                name: [task.description, list(task.rules), list(task.scripts)]
+                for name, task in self.tasks.items()
+            },
+            "rules": {
+                name: [rule.path, rule.description, list(rule.includes)]
+                for name, rule in self.rules.items()
+            },
+            "scripts": {
+                name: [script.path, script.description]
+                for name, script in self.scripts.items()
+            },
+        }
+
+    @classmethod
+    def _build(
+        cls,
+        tasks: Iterable[tuple[str, str, Iterable[str], Iterable[str]]],
+        rules: Iterable[tuple[str, str, str, Iterable[str]]],
+        scripts: Iterable[tuple[str, str, str]],
+    ) -> CompactRouter:
+        pool: dict[str, str] = {}
+
+        def _intern(value: str) -> str:
+            return pool.setdefault(value, value)
+
+        def _assets(
+            entries: Iterable[tuple[str, str, str, Iterable[str]]],
+        ) -> dict[str, CompactAsset]:
+            return {
+                _intern(name): CompactAsset(
+                    path=_intern(path),
+                    description=_intern(description),
+                    includes=tuple(_intern(alias) for alias in includes),
+                )
+                for name, path, description, includes in entries
+            }
+
+        # Rules and scripts first, so task references share the alias keys.
+        rule_assets = _assets(rules)
+        script_assets = _assets(
+            (name, path, description, ()) for name, path, description in scripts
+        )
+        task_entries = {
+            _intern(name): CompactTask(
+                description=_intern(description),
+                rules=tuple(_intern(alias) for alias in task_rules),
+                scripts=tuple(_intern(alias) for alias in task_scripts),
+            )
+            for name, description, task_rules, task_scripts in tasks
+        }
+        return cls(
+            tasks=MappingProxyType(task_entries),
+            rules=MappingProxyType(rule_assets),
+            scripts=MappingProxyType(script_assets),
+        )
@@ -0,0 +1,303 @@
+"""Router parsing and referential integrity compilation."""
+
+from __future__ import annotations
+
+import json
+import posixpath
+from collections.abc import Collection, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import yaml
+from pydantic import ValidationError
+
+from policygate.domains.gateway.compact_router import CompactRouter
+from policygate.domains.gateway.exceptions import RouterValidationError
+from policygate.domains.gateway.models import RouterConfig
+
+ROUTER_PATH = "router.yaml"
+ROUTER_CACHE_FORMAT = 2
+RULE_HASH_LENGTH = 16
+
+# libyaml-backed loader is several times faster; PyYAML may be built without it.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@dataclass(frozen=True)
+class FileEntry:
+    """Size and content hash of a file in a repository snapshot."""
+
+    size: int
+    sha256: str
+
+
+@dataclass(frozen=True)
+class CompiledAsset:
+    """Rule or script alias resolved to an existing snapshot file."""
+
+    alias: str
+    path: str
+    description: str
+    size: int
+    sha256: str
+
+    @property
+    def content_hash(self) -> str:
+        """Short content hash handed to clients to detect changed files."""
+        return self.sha256[:RULE_HASH_LENGTH]
+
+
+@dataclass(frozen=True)
+class CompiledRouter:
+    """Validated router with every alias resolved to file metadata.
+
+    ``rule_includes`` lists the rules each rule includes, directly or
+    transitively, in reading order: every rule comes after its own includes.
+    """
+
+    router: CompactRouter
+    rules: Mapping[str, CompiledAsset]
+    scripts: Mapping[str, CompiledAsset]
+    rule_includes: Mapping[str, tuple[str, ...]]
+
+
+def normalize_path(relative_path: str) -> str:
+    """Return the manifest key used for a router-relative path."""
+    return posixpath.normpath(relative_path.replace("\\", "/"))
+
+
+def parse_router(router_raw: str) -> CompactRouter:
+    """Parse router.yaml text, validate its shape and return the compact form."""
+    try:
+        parsed = yaml.load(router_raw, Loader=_YAML_LOADER)
+    except yaml.YAMLError as error:
+        raise RouterValidationError(
+            f"router.yaml is not valid YAML: {error}"
+        ) from error
+    if not isinstance(parsed, dict):
+        raise RouterValidationError("router.yaml must contain a top-level object")
+    try:
+        config = RouterConfig.model_validate(parsed)
+    except ValidationError as error:
+        raise RouterValidationError(str(error)) from error
+    return CompactRouter.from_config(config)
+
+
+def dump_router_cache(
+    router: CompactRouter,
+    router_sha256: str,
+    rule_includes: Mapping[str, tuple[str, ...]] | None = None,
+) -> str:
+    """Serialize a validated router for loading without YAML parsing.
+
+    ``rule_includes`` of a router compiled against its snapshot is stored as
+    well, so ``load_compiled_router_cache`` can skip validation.
+    """
+    payload: dict[str, object] = {
+        "format": ROUTER_CACHE_FORMAT,
+        "router_sha256": router_sha256,
+        "router": router.to_document(),
+    }
+    if rule_includes is not None:
+        payload["rule_includes"] = {
+            alias: list(included) for alias, included in rule_includes.items()
+        }
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_router_cache(raw: str, router_sha256: str) -> CompactRouter | None:
+    """Return cached router if it was built from this router.yaml content.
+
+    ``None`` means the cache is unusable and router.yaml has to be parsed.
+    """
+    try:
+        payload = json.loads(raw)
+        if (
+            payload.get("format") != ROUTER_CACHE_FORMAT
+            or payload.get("router_sha256") != router_sha256
+        ):
+            return None
+        return CompactRouter.from_document(payload["router"])
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return None
+
+
+def load_compiled_router_cache(
+    raw: str,
+    router_sha256: str,
+    manifest: Mapping[str, FileEntry],
+) -> CompiledRouter | None:
+    """Return the router compiled at sync time, linked to ``manifest``.
+
+    ``None`` means the cache holds no compiled router for this router.yaml
+    content or a file is missing, and ``compile_router`` has to run.
+    """
+    try:
+        payload = json.loads(raw)
+        if (
+            payload.get("format") != ROUTER_CACHE_FORMAT
+            or payload.get("router_sha256") != router_sha256
+            or not isinstance(payload.get("rule_includes"), dict)
+        ):
+            return None
+        router = CompactRouter.from_document(payload["router"])
+        rule_includes = {
+            alias: tuple(included)
+            for alias, included in payload["rule_includes"].items()
+        }
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return None
+    if rule_includes.keys() != router.rules.keys():
+        return None
+    return link_router(router, manifest, rule_includes)
+
+
+def link_router(
+    router: CompactRouter,
+    manifest: Mapping[str, FileEntry],
+    rule_includes: Mapping[str, tuple[str, ...]],
+) -> CompiledRouter | None:
+    """Resolve aliases of a router validated before against a new manifest.
+
+    Skips the reference and include checks of ``compile_router``. Returns
+    ``None`` when a file is missing, so that ``compile_router`` reports it.
+    """
+    problems: list[str] = []
+    compiled = _link(router, manifest, rule_includes, problems)
+    return None if problems else compiled
+
+
+def referenced_paths(
+    router: CompactRouter,
+    tasks: Collection[str] | None = None,
+) -> set[str]:
+    """Return manifest keys of rule and script files the router points to.
+
+    With ``tasks`` only files of those tasks and of the rules they include are
+    returned; unknown task and alias names are ignored, since
+    ``compile_router`` reports them.
+    """
+    if tasks is None:
+        assets = [*router.rules.values(), *router.scripts.values()]
+        return {normalize_path(asset.path) for asset in assets}
+
+    rule_names: set[str] = set()
+    script_names: set[str] = set()
+    pending: list[str] = []
+    for task_name in tasks:
+        task = router.tasks.get(task_name)
+        if task is not None:
+            pending.extend(task.rules)
+            script_names.update(task.scripts)
+    while pending:
+        rule_name = pending.pop()
+        if rule_name in rule_names or rule_name not in router.rules:
+            continue
+        rule_names.add(rule_name)
+        pending.extend(router.rules[rule_name].includes)
+    assets = [router.rules[name] for name in rule_names]
+    assets += [router.scripts[name] for name in script_names if name in router.scripts]
+    return {normalize_path(asset.path) for asset in assets}
+
+
+def compile_router(
+    router: CompactRouter,
+    manifest: Mapping[str, FileEntry],
+) -> CompiledRouter:
+    """Check task references, rule includes and file paths, and resolve aliases.
+
+    All problems, including include cycles, are collected and reported
+    together in one ``RouterValidationError``.
+    """
+    problems: list[str] = []
+
+    for task_name, task in router.tasks.items():
+        for rule_name in task.rules:
+            if rule_name not in router.rules:
+                problems.append(
+                    f"task '{task_name}' references unknown rule '{rule_name}'"
+                )
+        for script_name in task.scripts:
+            if script_name not in router.scripts:
+                problems.append(
+                    f"task '{task_name}' references unknown script '{script_name}'"
+                )
+    for rule_name, rule in router.rules.items():
+        for included in rule.includes:
+            if included not in router.rules:
+                problems.append(
+                    f"rule '{rule_name}' includes unknown rule '{included}'"
+                )
+    rule_includes = _expand_includes(router, problems)
+    compiled = _link(router, manifest, rule_includes, problems)
+    if problems:
+        raise RouterValidationError("; ".join(problems))
+    return compiled
+
+
+def _link(
+    router: CompactRouter,
+    manifest: Mapping[str, FileEntry],
+    rule_includes: Mapping[str, tuple[str, ...]],
+    problems: list[str],
+) -> CompiledRouter:
+    """Resolve rule and script aliases to manifest entries, reporting gaps."""
+
+    def _resolve(kind: str, alias: str, path: str, description: str) -> CompiledAsset:
+        entry = manifest.get(normalize_path(path))
+        if entry is None:
+            problems.append(f"{kind} '{alias}' points to missing file '{path}'")
+            entry = FileEntry(size=0, sha256="")
+        return CompiledAsset(
+            alias=alias,
+            path=path,
+            description=description,
+            size=entry.size,
+            sha256=entry.sha256,
+        )
+
+    rules = {
+        name: _resolve("rule", name, rule.path, rule.description)
+        for name, rule in router.rules.items()
+    }
+    scripts = {
+        name: _resolve("script", name, script.path, script.description)
+        for name, script in router.scripts.items()
+    }
+    return CompiledRouter(
+        router=router,
+        rules=MappingProxyType(rules),
+        scripts=MappingProxyType(scripts),
+        rule_includes=MappingProxyType(dict(rule_includes)),
+    )
+
+
+def _expand_includes(
+    router: CompactRouter,
+    problems: list[str],
+) -> dict[str, tuple[str, ...]]:
+    """Return transitive includes per rule and report include cycles."""
+    expanded: dict[str, tuple[str, ...]] = {}
+    visiting: list[str] = []
+
+    def _visit(alias: str) -> tuple[str, ...]:
+        if alias in expanded:
+            return expanded[alias]
+        if alias in visiting:
+            cycle = [*visiting[visiting.index(alias) :], alias]
+            problems.append(f"rule include cycle: {' -> '.join(cycle)}")
+            return ()
+        visiting.append(alias)
+        ordered: dict[str, None] = {}
+        for included in router.rules[alias].includes:
+            if included in router.rules:
+                ordered.update(dict.fromkeys(_visit(included)))
+                ordered[included] = None
+        visiting.pop()
+        ordered.pop(alias, None)
+        expanded[alias] = tuple(ordered)
+        return expanded[alias]
+
+    for alias in router.rules:
+        _visit(alias)
+    return expanded
@@ -15,3 +15,7 @@ class RouterReferenceError(PolicyGateError):
 
 class RepositorySyncError(PolicyGateError):
     """Raised when repository sync cannot complete."""
+
+
+class InvalidCursorError(PolicyGateError):
+    """Raised when a continuation cursor is malformed or belongs to another snapshot."""
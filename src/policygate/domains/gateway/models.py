@@ -1,6 +1,10 @@
 """Domain models for repository routing configuration."""
 
-from pydantic import BaseModel, Field
+from typing import Literal
+
+from pydantic import BaseModel, Field, computed_field
+
+UsageKind = Literal["rule", "script", "task"]
 
 
 class TaskConfig(BaseModel):
@@ -16,6 +20,9 @@ class RuleConfig(BaseModel):
 
     path: str = Field(description="Relative path to markdown rule file")
     description: str = Field(description="Rule description")
+    includes: list[str] = Field(
+        default_factory=list, description="Aliases of rules this rule builds on"
+    )
 
 
 class ScriptConfig(BaseModel):
@@ -38,3 +45,66 @@ class CopiedScriptsResult(BaseModel):
 
     destination_directory: str
     copied_files: list[str] = Field(default_factory=list)
+
+
+class SyncStatus(BaseModel):
+    """Synchronization state of the local repository snapshot."""
+
+    sha: str | None = None
+    synced_at: int | None = None
+    stale: bool = False
+    last_error: str | None = None
+
+
+class CacheVerification(BaseModel):
+    """Result of checking the local snapshot against its file manifest."""
+
+    sha: str | None = None
+    checked_files: int = 0
+    full: bool = True
+    corrupted_files: list[str] = Field(default_factory=list)
+    repaired_files: list[str] = Field(default_factory=list)
+
+
+class RuleHashes(BaseModel):
+    """Content hashes of rules in one snapshot."""
+
+    sha: str | None = None
+    hashes: dict[str, str] = Field(default_factory=dict)
+
+
+class SnapshotChanges(BaseModel):
+    """Rules whose content differs from an earlier snapshot.
+
+    ``complete`` is false when the earlier snapshot is no longer known; every
+    rule is listed as changed then.
+    """
+
+    sha: str | None = None
+    since: str
+    complete: bool = True
+    changed: dict[str, str] = Field(default_factory=dict)
+
+
+class AliasUsage(BaseModel):
+    """Recorded use of one rule, script or task alias."""
+
+    kind: UsageKind
+    alias: str
+    hits: int = 0
+    bytes_served: int = 0
+    total_ms: float = 0.0
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def mean_ms(self) -> float:
+        """Mean latency of the calls that used the alias."""
+        return round(self.total_ms / self.hits, 3) if self.hits else 0.0
+
+
+class UsageStats(BaseModel):
+    """Usage per alias, most used first, and router aliases never used."""
+
+    sha: str | None = None
+    entries: list[AliasUsage] = Field(default_factory=list)
+    unused: dict[str, list[str]] = Field(default_factory=dict)
@@ -0,0 +1,197 @@
+"""Precomputed router outline with section, prefix, and page selection."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Literal
+
+from policygate.domains.gateway.compact_router import (
+    CompactAsset,
+    CompactRouter,
+    CompactTask,
+)
+from policygate.domains.gateway.exceptions import InvalidCursorError
+
+OutlineSection = Literal["tasks", "rules", "scripts"]
+OutlineField = Literal["description", "rules", "scripts", "path"]
+
+SECTIONS: tuple[OutlineSection, ...] = ("tasks", "rules", "scripts")
+_SECTION_TITLES: dict[OutlineSection, str] = {
+    "tasks": "Tasks",
+    "rules": "Rules",
+    "scripts": "Scripts",
+}
+_ALL_FIELDS: frozenset[str] = frozenset({"description", "rules", "scripts", "path"})
+
+
+@dataclass(frozen=True)
+class _SectionIndex:
+    aliases: tuple[str, ...]
+    sorted_aliases: tuple[str, ...]
+    positions_by_sorted: tuple[int, ...]
+
+    @classmethod
+    def build(cls, aliases: list[str]) -> _SectionIndex:
+        ordered = sorted(range(len(aliases)), key=aliases.__getitem__)
+        return cls(
+            aliases=tuple(aliases),
+            sorted_aliases=tuple(aliases[position] for position in ordered),
+            positions_by_sorted=tuple(ordered),
+        )
+
+    def select(self, prefix: str | None) -> tuple[str, ...]:
+        if not prefix:
+            return self.aliases
+        start = bisect_left(self.sorted_aliases, prefix)
+        positions: list[int] = []
+        for offset in range(start, len(self.sorted_aliases)):
+            if not self.sorted_aliases[offset].startswith(prefix):
+                break
+            positions.append(self.positions_by_sorted[offset])
+        positions.sort()
+        return tuple(self.aliases[position] for position in positions)
+
+
+class RouterOutline:
+    """Per-snapshot outline renderer backed by per-section alias indexes.
+
+    Entries keep router.yaml order inside each section, and sections are
+    concatenated as tasks, rules, scripts. Offsets therefore address the same
+    entries for as long as the snapshot revision stays the same, and a page
+    requested for another ``snapshot`` is rejected.
+    """
+
+    def __init__(self, router: CompactRouter, revision: str | None = None) -> None:
+        self.revision = revision
+        self._router = router
+        self._sections: dict[OutlineSection, _SectionIndex] = {
+            "tasks": _SectionIndex.build(list(router.tasks)),
+            "rules": _SectionIndex.build(list(router.rules)),
+            "scripts": _SectionIndex.build(list(router.scripts)),
+        }
+        self._full_markdown: str | None = None
+
+    def render(
+        self,
+        section: OutlineSection | None = None,
+        prefix: str | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+        fields: list[OutlineField] | None = None,
+        snapshot: str | None = None,
+    ) -> str:
+        """Render the selected slice of the outline as markdown text."""
+        current = self.revision or "unknown"
+        if snapshot is not None and snapshot != current:
+            raise InvalidCursorError(
+                f"outline page belongs to snapshot {snapshot}, "
+                f"current snapshot is {current}"
+            )
+        is_default = (
+            section is None
+            and not prefix
+            and offset == 0
+            and limit is None
+            and fields is None
+        )
+        if is_default:
+            if self._full_markdown is None:
+                self._full_markdown = self._render_page(
+                    selected=SECTIONS,
+                    entries=[
+                        (name, alias)
+                        for name in SECTIONS
+                        for alias in self._sections[name].aliases
+                    ],
+                    fields=_ALL_FIELDS,
+                )
+            return self._full_markdown
+
+        selected = SECTIONS if section is None else (section,)
+        matches = [
+            (name, alias)
+            for name in selected
+            for alias in self._sections[name].select(prefix)
+        ]
+        start = max(offset, 0)
+        end = len(matches) if limit is None else min(start + limit, len(matches))
+        page = matches[start:end]
+
+        text = self._render_page(
+            selected=selected,
+            entries=page,
+            fields=_ALL_FIELDS if fields is None else frozenset(fields),
+        )
+        footer = f"_Entries {start + 1}-{end} of {len(matches)}"
+        if not page:
+            footer = f"_Entries 0 of {len(matches)}"
+        if end < len(matches):
+            footer += f"; next offset: {end}"
+        footer += f"; snapshot: {current}_"
+        return f"{text}\n\n{footer}"
+
+    def _render_page(
+        self,
+        selected: tuple[OutlineSection, ...],
+        entries: list[tuple[OutlineSection, str]],
+        fields: frozenset[str],
+    ) -> str:
+        by_section: dict[OutlineSection, list[str]] = {name: [] for name in selected}
+        for name, alias in entries:
+            by_section[name].append(alias)
+
+        sections: list[str] = ["# Router"]
+        for name in selected:
+            sections.append(f"## {_SECTION_TITLES[name]}")
+            aliases = by_section[name]
+            if not aliases:
+                sections.append("- _none_")
+                continue
+            for alias in aliases:
+                if name == "tasks":
+                    sections.extend(
+                        _task_lines(alias, self._router.tasks[alias], fields)
+                    )
+                elif name == "rules":
+                    sections.append(
+                        _rule_line(alias, self._router.rules[alias], fields)
+                    )
+                else:
+                    sections.append(
+                        _script_line(alias, self._router.scripts[alias], fields)
+                    )
+        return "\n".join(sections)
+
+
+def _task_lines(name: str, task: CompactTask, fields: frozenset[str]) -> list[str]:
+    lines = [f"### {name}"]
+    if "description" in fields:
+        lines.append(f"- Description: {task.description}")
+    if "rules" in fields:
+        lines.append(f"- Rules: {', '.join(task.rules) if task.rules else '_none_'}")
+    if "scripts" in fields:
+        lines.append(
+            f"- Scripts: {', '.join(task.scripts) if task.scripts else '_none_'}"
+        )
+    return lines
+
+
+def _rule_line(name: str, rule: CompactAsset, fields: frozenset[str]) -> str:
+    line = f"- **{name}**"
+    if "description" in fields:
+        line += f": {rule.description}"
+    if "rules" in fields and rule.includes:
+        line += f" (includes: {', '.join(rule.includes)})"
+    return line
+
+
+def _script_line(name: str, script: CompactAsset, fields: frozenset[str]) -> str:
+    parts: list[str] = []
+    if "path" in fields:
+        parts.append(f"`{script.path}`")
+    if "description" in fields:
+        parts.append(script.description)
+    if not parts:
+        return f"- **{name}**"
+    return f"- **{name}**: {' — '.join(parts)}"
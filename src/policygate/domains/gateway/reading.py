@@ -0,0 +1,168 @@
+"""Budgeted, incrementally assembled rules documents with continuation cursors."""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Callable, Iterator, Mapping
+from dataclasses import dataclass
+
+from policygate.domains.gateway.compiler import RULE_HASH_LENGTH
+from policygate.domains.gateway.exceptions import InvalidCursorError
+
+SECTION_SEPARATOR = "\n\n"
+
+
+def render_rule_section(alias: str, content: str) -> str:
+    """Wrap rule content in alias tags used by the combined rules document.
+
+    The opening tag carries the hash of exactly this content, so clients can
+    pass it back in ``known_hashes`` even if a sync raced the read.
+    """
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return (
+        f'<{alias} hash="{content_hash[:RULE_HASH_LENGTH]}">\n'
+        f"{content.rstrip()}\n</{alias}>"
+    )
+
+
+def render_unchanged_section(alias: str, content_hash: str) -> str:
+    """Return the marker sent instead of a rule the client already holds."""
+    return f'<{alias} unchanged="{content_hash}" />'
+
+
+def render_snapshot_marker(revision: str | None) -> str:
+    """Return the marker naming the snapshot a rules document was read from."""
+    return f'<snapshot sha="{revision or "unknown"}" />'
+
+
+def encode_rules_cursor(
+    revision: str | None,
+    rule_names: list[str],
+    section_index: int,
+    section_offset: int,
+) -> str:
+    """Build continuation cursor bound to snapshot revision and requested aliases."""
+    return (
+        f"{revision or 'unknown'}:{_aliases_digest(rule_names)}:"
+        f"{section_index}:{section_offset}"
+    )
+
+
+def decode_rules_cursor(
+    cursor: str,
+    revision: str | None,
+    rule_names: list[str],
+) -> tuple[int, int]:
+    """Return ``(section_index, section_offset)`` for a cursor of this request."""
+    try:
+        cursor_revision, digest, raw_index, raw_offset = cursor.rsplit(":", 3)
+        section_index = int(raw_index)
+        section_offset = int(raw_offset)
+    except ValueError as error:
+        raise InvalidCursorError(f"malformed cursor: {cursor}") from error
+
+    if cursor_revision != (revision or "unknown"):
+        raise InvalidCursorError(
+            f"cursor belongs to snapshot {cursor_revision}, "
+            f"current snapshot is {revision or 'unknown'}"
+        )
+    if digest != _aliases_digest(rule_names) or section_index < 0 or section_offset < 0:
+        raise InvalidCursorError("cursor does not match requested rule aliases")
+    return section_index, section_offset
+
+
+@dataclass(frozen=True)
+class RuleChunk:
+    """Piece of the rules document emitted while reading rules one by one."""
+
+    alias: str
+    text: str
+    position: int
+    total: int
+
+
+class RulesPage:
+    """Lazily read slice of the combined rules document.
+
+    Rules are read one at a time and emitted as soon as they fit into the
+    character budget, so callers can forward them before the remaining files
+    are read. A page ends at the last whole rule that fits; a single rule
+    larger than the budget is cut at its last line break inside the budget.
+    After iteration ``next_cursor`` holds the continuation cursor, if any.
+    Rules listed in ``unchanged`` are not read and yield a short marker.
+    The finalized page ends with the marker of snapshot ``revision``.
+    """
+
+    def __init__(
+        self,
+        sections: list[tuple[str, str]],
+        read_text: Callable[[str], str],
+        start: tuple[int, int] = (0, 0),
+        max_chars: int | None = None,
+        make_cursor: Callable[[int, int], str] | None = None,
+        unchanged: Mapping[str, str] | None = None,
+        revision: str | None = None,
+    ) -> None:
+        self._sections = sections
+        self._read_text = read_text
+        self._unchanged = unchanged or {}
+        self._start = start
+        self._max_chars = max_chars if max_chars is None else max(max_chars, 1)
+        self._make_cursor = make_cursor
+        self._revision = revision
+        self.next_cursor: str | None = None
+
+    def __iter__(self) -> Iterator[RuleChunk]:
+        self.next_cursor = None
+        section_index, section_offset = self._start
+        remaining = self._max_chars
+        emitted = False
+        total = len(self._sections)
+
+        for position in range(section_index, total):
+            alias, path = self._sections[position]
+            if alias in self._unchanged:
+                section = render_unchanged_section(alias, self._unchanged[alias])
+            else:
+                section = render_rule_section(alias, self._read_text(path))
+            text = section[section_offset:]
+            separator = SECTION_SEPARATOR if emitted else ""
+
+            if remaining is not None and len(separator) + len(text) > remaining:
+                if emitted:
+                    self._set_next_cursor(position, section_offset)
+                    return
+                cut = text.rfind("\n", 0, remaining) + 1 or remaining
+                yield RuleChunk(
+                    alias=alias, text=text[:cut], position=position, total=total
+                )
+                self._set_next_cursor(position, section_offset + cut)
+                return
+
+            yield RuleChunk(
+                alias=alias, text=separator + text, position=position, total=total
+            )
+            emitted = True
+            section_offset = 0
+            if remaining is not None:
+                remaining -= len(separator) + len(text)
+
+    def render(self) -> str:
+        """Consume the page and return its text with a continuation footer."""
+        return self.finalize("".join(chunk.text for chunk in self))
+
+    def finalize(self, text: str) -> str:
+        """Append the snapshot marker and, if truncated, the continuation footer."""
+        text = f"{text}{SECTION_SEPARATOR}{render_snapshot_marker(self._revision)}"
+        if self.next_cursor is None:
+            return text
+        return f"{text}\n\n_Truncated; next cursor: {self.next_cursor}_"
+
+    def _set_next_cursor(self, section_index: int, section_offset: int) -> None:
+        if self._make_cursor is not None:
+            self.next_cursor = self._make_cursor(section_index, section_offset)
+
+
+def _aliases_digest(rule_names: list[str]) -> str:
+    joined = "\x00".join(rule_names).encode("utf-8")
+    return hashlib.blake2b(joined, digest_size=6).hexdigest()
@@ -0,0 +1,190 @@
+"""Keyword search index over router rules using BM25 ranking."""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_METADATA_WEIGHT = 3
+_SNIPPET_RADIUS = 80
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase alphanumeric tokens."""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if len(token) > 1]
+
+
+@dataclass(frozen=True)
+class SearchDocument:
+    """Searchable representation of a single rule.
+
+    ``content_hash`` identifies the file ``body`` was read from, so the next
+    build can take unchanged bodies from the previous index.
+    """
+
+    alias: str
+    description: str
+    metadata_text: str
+    body: str
+    content_hash: str = ""
+
+    @property
+    def fingerprint(self) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (self.alias, self.metadata_text, self.body):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """Ranked search match."""
+
+    alias: str
+    score: float
+    description: str
+    snippet: str
+
+
+@dataclass(frozen=True)
+class _IndexedDocument:
+    document: SearchDocument
+    fingerprint: str
+    term_frequencies: dict[str, int]
+    length: int
+
+
+class RuleSearchIndex:
+    """Immutable inverted index with BM25 scoring.
+
+    Building from a previous index reuses tokenized documents whose content
+    fingerprint did not change, so snapshot updates only re-tokenize the rules
+    that were actually modified.
+    """
+
+    def __init__(
+        self,
+        documents: list[SearchDocument],
+        revision: str | None = None,
+        previous: RuleSearchIndex | None = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> None:
+        self.revision = revision
+
+        reusable = previous._by_fingerprint if previous is not None else {}
+        indexed: list[_IndexedDocument] = []
+        for document in documents:
+            fingerprint = document.fingerprint
+            cached = reusable.get(fingerprint)
+            if cached is not None and cached.document.alias == document.alias:
+                indexed.append(cached)
+                continue
+            indexed.append(self._index_document(document, fingerprint))
+
+        self._documents = indexed
+        self._by_fingerprint = {item.fingerprint: item for item in indexed}
+        self.reused_count = sum(
+            1 for item in indexed if reusable.get(item.fingerprint) is item
+        )
+
+        postings: dict[str, list[tuple[int, int]]] = {}
+        total_length = 0
+        for position, item in enumerate(indexed):
+            total_length += item.length
+            for term, frequency in item.term_frequencies.items():
+                postings.setdefault(term, []).append((position, frequency))
+
+        document_count = len(indexed)
+        average_length = total_length / document_count if document_count else 0.0
+        self._weights: dict[str, list[tuple[int, float]]] = {}
+        for term, entries in postings.items():
+            idf = math.log(
+                1 + (document_count - len(entries) + 0.5) / (len(entries) + 0.5)
+            )
+            weighted: list[tuple[int, float]] = []
+            for position, frequency in entries:
+                length_ratio = indexed[position].length / average_length
+                denominator = frequency + k1 * (1 - b + b * length_ratio)
+                weighted.append((position, idf * frequency * (k1 + 1) / denominator))
+            self._weights[term] = weighted
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def bodies_by_hash(self) -> dict[str, str]:
+        """Return indexed rule bodies keyed by their content hash."""
+        return {
+            item.document.content_hash: item.document.body
+            for item in self._documents
+            if item.document.content_hash
+        }
+
+    def search(self, query: str, limit: int = 10) -> list[SearchHit]:
+        """Return up to ``limit`` best matching rules for ``query``."""
+        terms = set(tokenize(query))
+        if not terms or limit <= 0 or not self._documents:
+            return []
+
+        scores: dict[int, float] = {}
+        for term in terms:
+            for position, weight in self._weights.get(term, ()):
+                scores[position] = scores.get(position, 0.0) + weight
+
+        best = heapq.nlargest(
+            limit, scores.items(), key=lambda item: (item[1], -item[0])
+        )
+        hits: list[SearchHit] = []
+        for position, score in best:
+            document = self._documents[position].document
+            hits.append(
+                SearchHit(
+                    alias=document.alias,
+                    score=round(score, 4),
+                    description=document.description,
+                    snippet=_build_snippet(document, terms),
+                )
+            )
+        return hits
+
+    def _index_document(
+        self,
+        document: SearchDocument,
+        fingerprint: str,
+    ) -> _IndexedDocument:
+        frequencies = Counter(tokenize(document.body))
+        for token in tokenize(f"{document.alias} {document.metadata_text}"):
+            frequencies[token] += _METADATA_WEIGHT
+        return _IndexedDocument(
+            document=document,
+            fingerprint=fingerprint,
+            term_frequencies=dict(frequencies),
+            length=sum(frequencies.values()),
+        )
+
+
+def _build_snippet(document: SearchDocument, terms: set[str]) -> str:
+    lowered = document.body.lower()
+    first_match = -1
+    for match in _TOKEN_PATTERN.finditer(lowered):
+        if match.group(0) in terms:
+            first_match = match.start()
+            break
+
+    if first_match < 0:
+        return document.description
+
+    start = max(first_match - _SNIPPET_RADIUS, 0)
+    end = min(first_match + _SNIPPET_RADIUS, len(document.body))
+    snippet = " ".join(document.body[start:end].split())
+    if start > 0:
+        snippet = f"…{snippet}"
+    if end < len(document.body):
+        snippet = f"{snippet}…"
+    return snippet
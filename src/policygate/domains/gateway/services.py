@@ -3,18 +3,61 @@
 from __future__ import annotations
 
 import tempfile
+import threading
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
 from typing import Protocol
 
-import yaml
-from pydantic import ValidationError
-
 from policygate.config.logging import logger
+from policygate.config.tracing import tracer
+from policygate.domains.gateway.compact_router import CompactRouter
+from policygate.domains.gateway.compiler import (
+    ROUTER_PATH,
+    CompiledRouter,
+    FileEntry,
+    compile_router,
+    link_router,
+    load_compiled_router_cache,
+    load_router_cache,
+    normalize_path,
+    parse_router,
+)
 from policygate.domains.gateway.exceptions import (
     RepositorySyncError,
     RouterReferenceError,
     RouterValidationError,
 )
-from policygate.domains.gateway.models import CopiedScriptsResult, RouterConfig
+from policygate.domains.gateway.models import (
+    CacheVerification,
+    CopiedScriptsResult,
+    RuleHashes,
+    SnapshotChanges,
+    SyncStatus,
+    UsageKind,
+    UsageStats,
+)
+from policygate.domains.gateway.outline import (
+    OutlineField,
+    OutlineSection,
+    RouterOutline,
+)
+from policygate.domains.gateway.reading import (
+    SECTION_SEPARATOR,
+    RulesPage,
+    decode_rules_cursor,
+    encode_rules_cursor,
+    render_rule_section,
+    render_snapshot_marker,
+    render_unchanged_section,
+)
+from policygate.domains.gateway.search import (
+    RuleSearchIndex,
+    SearchDocument,
+    SearchHit,
+)
+from policygate.domains.gateway.usage import UsageRecorder
+
+_WARM_UP_BATCH_SIZE = 16
 
 
 class RepositoryGateway(Protocol):
@@ -24,6 +67,26 @@ class RepositoryGateway(Protocol):
 
     def force_refresh(self) -> None: ...
 
+    def current_revision(self) -> str | None: ...
+
+    def file_manifest(self) -> Mapping[str, FileEntry]: ...
+
+    def manifest_at(self, revision: str) -> Mapping[str, FileEntry] | None: ...
+
+    def sync_status(self) -> SyncStatus: ...
+
+    def read_router_cache(self) -> str | None: ...
+
+    def lazy_files(self) -> frozenset[str]: ...
+
+    def add_sync_listener(self, listener: Callable[[str | None], None]) -> None: ...
+
+    def verify_cache(
+        self,
+        full: bool = True,
+        repair: bool = True,
+    ) -> CacheVerification: ...
+
     def read_text(self, relative_path: str) -> str: ...
 
     def read_many_texts(self, relative_paths: list[str]) -> dict[str, str]: ...
@@ -35,17 +98,62 @@ class RepositoryGateway(Protocol):
     ) -> list[str]: ...
 
 
+@dataclass(frozen=True)
+class _RouterSnapshot:
+    """Parsed router and derived indexes for one repository revision."""
+
+    revision: str | None
+    router_sha256: str | None
+    compiled: CompiledRouter
+    outline: RouterOutline
+    tasks_by_first_rule: Mapping[str, tuple[str, ...]]
+
+    @property
+    def router(self) -> CompactRouter:
+        return self.compiled.router
+
+
 class PolicyGatewayService:
     """Use-case service for router outline, rules reading, and scripts copying."""
 
-    def __init__(self, repository_gateway: RepositoryGateway) -> None:
+    def __init__(
+        self,
+        repository_gateway: RepositoryGateway,
+        usage: UsageRecorder | None = None,
+    ) -> None:
         self._repository_gateway = repository_gateway
+        self._usage = usage or UsageRecorder()
+        self._snapshot: _RouterSnapshot | None = None
+        self._search_index: RuleSearchIndex | None = None
+        self._preloaded_rules: Mapping[str, tuple[str, str]] = {}
+        self._search_lock = threading.Lock()
 
-    def outline_router(self) -> str:
-        """Return parsed and validated router.yaml content as markdown text."""
+    def outline_router(
+        self,
+        section: OutlineSection | None = None,
+        prefix: str | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+        fields: list[OutlineField] | None = None,
+        snapshot: str | None = None,
+    ) -> str:
+        """Return parsed and validated router.yaml content as markdown text.
+
+        Without arguments the whole router is returned. ``section``, ``prefix``,
+        ``offset``, ``limit`` and ``fields`` select a page of entries whose
+        offsets stay stable for the same snapshot revision; pass the footer's
+        ``snapshot`` with the next offset to have a changed snapshot rejected.
+        """
         logger.info("Generating router outline")
-        router = self._load_router()
-        return self._router_to_markdown(router)
+        outline = self._load_snapshot().outline
+        return outline.render(
+            section=section,
+            prefix=prefix,
+            offset=offset,
+            limit=limit,
+            fields=fields,
+            snapshot=snapshot,
+        )
 
     def sync_repository(self) -> dict[str, str]:
         """Force synchronization of remote repository to local cache."""
@@ -53,32 +161,180 @@ class PolicyGatewayService:
         self._repository_gateway.force_refresh()
         return {"status": "synced"}
 
-    def read_rules(self, rule_names: list[str]) -> str:
-        """Return rule markdown content by aliases from router.yaml as markdown text."""
+    def repository_status(self) -> SyncStatus:
+        """Return snapshot SHA and whether it is stale after failed refreshes."""
+        logger.debug("Reading repository sync status")
+        return self._repository_gateway.sync_status()
+
+    def snapshot_revision(self) -> str | None:
+        """Refresh if due and return the revision responses are built from."""
+        return self._load_snapshot().revision
+
+    def verify_cache(self, full: bool = True, repair: bool = True) -> CacheVerification:
+        """Check local files against the snapshot manifest and repair damage."""
+        logger.info("Verifying local repository cache", extra={"full": full})
+        result = self._repository_gateway.verify_cache(full=full, repair=repair)
+        if result.repaired_files:
+            # Bodies preloaded or indexed before the repair may hold damaged content.
+            repaired = set(result.repaired_files)
+            self._preloaded_rules = {
+                path: entry
+                for path, entry in self._preloaded_rules.items()
+                if path not in repaired
+            }
+            with self._search_lock:
+                self._search_index = None
+        return result
+
+    def rule_hashes(self, rule_names: list[str] | None = None) -> RuleHashes:
+        """Return snapshot SHA and content hashes of the given or all rules."""
+        logger.debug("Reading rule hashes")
+        snapshot = self._load_snapshot()
+        rules = snapshot.compiled.rules
+        names = list(rules) if rule_names is None else rule_names
+        self._check_rule_aliases(snapshot.compiled, names)
+        return RuleHashes(
+            sha=snapshot.revision,
+            hashes={name: rules[name].content_hash for name in names},
+        )
+
+    def changed_since(self, sha: str) -> SnapshotChanges:
+        """Return rules whose content differs from the snapshot ``sha``.
+
+        The comparison uses the file manifest the gateway kept for that
+        snapshot and the current router paths of each alias.
+        """
+        logger.info("Comparing snapshots", extra={"since": sha})
+        snapshot = self._load_snapshot()
+        rules = snapshot.compiled.rules
+        if sha == snapshot.revision:
+            return SnapshotChanges(sha=snapshot.revision, since=sha)
+
+        previous = self._repository_gateway.manifest_at(sha)
+        if previous is None:
+            logger.info("Earlier snapshot is not known", extra={"since": sha})
+            changed = dict(rules)
+        else:
+            changed = {
+                name: rule
+                for name, rule in rules.items()
+                if (entry := previous.get(normalize_path(rule.path))) is None
+                or entry.sha256 != rule.sha256
+            }
+        return SnapshotChanges(
+            sha=snapshot.revision,
+            since=sha,
+            complete=previous is not None,
+            changed={name: rule.content_hash for name, rule in changed.items()},
+        )
+
+    def read_rules(
+        self,
+        rule_names: list[str],
+        max_chars: int | None = None,
+        cursor: str | None = None,
+        known_hashes: Mapping[str, str] | None = None,
+    ) -> str:
+        """Return rule markdown content by aliases from router.yaml as markdown text.
+
+        Rules included by requested rules are emitted once, before the first
+        rule including them. Rules whose hash in ``known_hashes`` is current
+        are not read and appear as ``<alias unchanged="hash" />`` markers;
+        other sections open with ``<alias hash="hash">``. The document ends
+        with a ``<snapshot sha="..." />`` marker. With ``max_chars`` the document is cut deterministically and ends with
+        a continuation cursor; pass it back with the same aliases to read on.
+        """
         if not rule_names:
             logger.debug("No rules requested")
             return ""
 
+        if max_chars is not None or cursor is not None:
+            return self.open_rules_page(
+                rule_names=rule_names,
+                max_chars=max_chars,
+                cursor=cursor,
+                known_hashes=known_hashes,
+            ).render()
+
         logger.info("Reading rules", extra={"rule_count": len(rule_names)})
 
-        router = self._load_router()
-        missing = [name for name in rule_names if name not in router.rules]
-        if missing:
-            joined = ", ".join(missing)
-            logger.warning("Unknown rule aliases requested", extra={"aliases": joined})
-            raise RouterReferenceError(f"unknown rule aliases: {joined}")
+        snapshot = self._load_snapshot()
+        compiled = snapshot.compiled
+        names_to_paths = self._resolve_rule_paths(compiled, rule_names)
+        unchanged = self._unchanged_rules(compiled, names_to_paths, known_hashes)
+        contents_by_path = self._read_rule_texts(
+            compiled, [name for name in names_to_paths if name not in unchanged]
+        )
+        with tracer.span("rules.render"):
+            return SECTION_SEPARATOR.join(
+                [
+                    *(
+                        render_unchanged_section(name, unchanged[name])
+                        if name in unchanged
+                        else render_rule_section(name, contents_by_path[path])
+                        for name, path in names_to_paths.items()
+                    ),
+                    render_snapshot_marker(snapshot.revision),
+                ]
+            )
+
+    def open_rules_page(
+        self,
+        rule_names: list[str],
+        max_chars: int | None = None,
+        cursor: str | None = None,
+        known_hashes: Mapping[str, str] | None = None,
+    ) -> RulesPage:
+        """Prepare a lazily read rules page that yields rules as they are read."""
+        logger.info(
+            "Reading rules page",
+            extra={"rule_count": len(rule_names), "max_chars": max_chars},
+        )
+        snapshot = self._load_snapshot()
+        compiled = snapshot.compiled
+        names_to_paths = self._resolve_rule_paths(compiled, rule_names)
+        unchanged = self._unchanged_rules(compiled, names_to_paths, known_hashes)
+        # Markers change section lengths, so cursors are bound to them as well.
+        cursor_key = [
+            *names_to_paths,
+            *(f"{name}={content_hash}" for name, content_hash in unchanged.items()),
+        ]
+        revision = snapshot.revision
+        start = (0, 0)
+        if cursor is not None:
+            start = decode_rules_cursor(
+                cursor, revision=revision, rule_names=cursor_key
+            )
 
-        names_to_paths = {name: router.rules[name].path for name in rule_names}
-        contents_by_path = self._repository_gateway.read_many_texts(
-            list(names_to_paths.values())
+        hashes = {
+            path: compiled.rules[name].sha256 for name, path in names_to_paths.items()
+        }
+        preloaded = self._preloaded_rules
+
+        def _read_text(path: str) -> str:
+            hit = preloaded.get(path)
+            if hit is not None and hit[0] == hashes[path]:
+                return hit[1]
+            return self._repository_gateway.read_text(path)
+
+        return RulesPage(
+            sections=list(names_to_paths.items()),
+            read_text=_read_text,
+            start=start,
+            max_chars=max_chars,
+            make_cursor=lambda index, offset: encode_rules_cursor(
+                revision, cursor_key, index, offset
+            ),
+            unchanged=unchanged,
+            revision=revision,
         )
-        sections: list[str] = []
-        for name, path in names_to_paths.items():
-            if path not in contents_by_path:
-                continue
-            sections.append(f"<{name}>\n{contents_by_path[path].rstrip()}\n</{name}>")
 
-        return "\n\n".join(sections)
+    def search_rules(self, query: str, limit: int = 10) -> list[SearchHit]:
+        """Rank rules by keyword relevance to query using the snapshot index."""
+        logger.info("Searching rules", extra={"limit": limit})
+        index = self._get_search_index(self._load_snapshot())
+        with tracer.span("search.query", limit=limit):
+            return index.search(query=query, limit=limit)
 
     def copy_scripts(self, script_names: list[str]) -> CopiedScriptsResult:
         """Copy script files by aliases to a temporary directory."""
@@ -95,8 +351,8 @@ class PolicyGatewayService:
 
         logger.info("Copying scripts", extra={"script_count": len(script_names)})
 
-        router = self._load_router()
-        missing = [name for name in script_names if name not in router.scripts]
+        scripts = self._load_snapshot().compiled.scripts
+        missing = [name for name in script_names if name not in scripts]
         if missing:
             joined = ", ".join(missing)
             logger.warning(
@@ -105,7 +361,7 @@ class PolicyGatewayService:
             raise RouterReferenceError(f"unknown script aliases: {joined}")
 
         destination = tempfile.mkdtemp(prefix="policygate-scripts-")
-        paths = [router.scripts[name].path for name in script_names]
+        paths = [scripts[name].path for name in script_names]
         copied_files = self._repository_gateway.copy_many_files(
             relative_paths=paths,
             destination_directory=destination,
@@ -116,53 +372,378 @@ class PolicyGatewayService:
             copied_files=copied_files,
         )
 
-    def _load_router(self) -> RouterConfig:
-        try:
-            logger.debug("Loading router configuration")
-            self._repository_gateway.refresh_if_needed()
-            router_raw = self._repository_gateway.read_text("router.yaml")
-            parsed = yaml.safe_load(router_raw)
-            if not isinstance(parsed, dict):
-                raise RouterValidationError(
-                    "router.yaml must contain a top-level object"
+    def record_rule_reads(
+        self,
+        rule_names: list[str],
+        seconds: float,
+        known_hashes: Mapping[str, str] | None = None,
+    ) -> None:
+        """Record a completed rules read, its included rules and covered tasks.
+
+        Uses the snapshot of the latest call rather than checking for changes.
+        Rules answered with an unchanged marker count as hits serving no bytes,
+        and a task counts when one read requested all of its rules.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return
+        compiled = snapshot.compiled
+        if any(name not in compiled.rules for name in rule_names):
+            return
+        names = self._resolve_rule_paths(compiled, rule_names)
+        unchanged = self._unchanged_rules(compiled, names, known_hashes)
+        record = self._usage.record
+        for name in names:
+            size = 0 if name in unchanged else compiled.rules[name].size
+            record("rule", name, size, seconds)
+        requested = set(rule_names)
+        for name in requested:
+            for task_name in snapshot.tasks_by_first_rule.get(name, ()):
+                task_rules = snapshot.router.tasks[task_name].rules
+                if requested.issuperset(task_rules):
+                    size = sum(compiled.rules[rule].size for rule in task_rules)
+                    record("task", task_name, size, seconds)
+
+    def record_script_copies(self, script_names: list[str], seconds: float) -> None:
+        """Record a completed script copy using the snapshot of the latest call."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return
+        scripts = snapshot.compiled.scripts
+        if any(name not in scripts for name in script_names):
+            return
+        for name in script_names:
+            self._usage.record("script", name, scripts[name].size, seconds)
+
+    def usage_stats(
+        self,
+        kind: UsageKind | None = None,
+        limit: int | None = None,
+    ) -> UsageStats:
+        """Return recorded usage per alias and current aliases never used.
+
+        Entries are ordered by hits and may name aliases that were removed
+        from the router since; ``limit`` caps them, not the unused lists.
+        """
+        logger.info("Collecting usage stats", extra={"kind": kind, "limit": limit})
+        snapshot = self._load_snapshot()
+        entries = self._usage.totals(kind)
+        used = {(usage.kind, usage.alias) for usage in entries}
+        router = snapshot.router
+        aliases: dict[UsageKind, Iterable[str]] = {
+            "rule": router.rules,
+            "script": router.scripts,
+            "task": router.tasks,
+        }
+        return UsageStats(
+            sha=snapshot.revision,
+            entries=entries[:limit] if limit is not None else entries,
+            unused={
+                alias_kind: [name for name in names if (alias_kind, name) not in used]
+                for alias_kind, names in aliases.items()
+                if kind is None or kind == alias_kind
+            },
+        )
+
+    def warm_up(
+        self,
+        top_rules: int = 0,
+        cancelled: Callable[[], bool] = lambda: False,
+    ) -> int:
+        """Prepare the current snapshot before requests need it.
+
+        Loads and compiles the router, renders the full outline, preloads up
+        to ``top_rules`` of the most read rules into memory, replacing the
+        previously preloaded set, and builds the search index, so the first
+        ``search_rules`` call does not pay for it. Stops early, keeping the
+        previous set, when ``cancelled`` returns true or the revision changes
+        meanwhile. Returns the number of preloaded rules.
+        """
+        with tracer.span("service.warm_up", top_rules=top_rules) as span:
+            snapshot = self._load_snapshot()
+            snapshot.outline.render()
+            rules = snapshot.compiled.rules
+            previous = self._preloaded_rules
+            preloaded: dict[str, tuple[str, str]] = {}
+            stale: list[str] = []
+            for name in self._usage.top("rule", top_rules, known=rules):
+                rule = rules[name]
+                hit = previous.get(rule.path)
+                if hit is not None and hit[0] == rule.sha256:
+                    preloaded[rule.path] = hit
+                else:
+                    stale.append(name)
+
+            def _stopped() -> bool:
+                if (
+                    cancelled()
+                    or self._repository_gateway.current_revision() != snapshot.revision
+                ):
+                    logger.debug("Warm-up cancelled", extra={"sha": snapshot.revision})
+                    span.set_attribute("cancelled", True)
+                    return True
+                return False
+
+            for start in range(0, len(stale), _WARM_UP_BATCH_SIZE):
+                if _stopped():
+                    return 0
+                batch = [
+                    rules[name] for name in stale[start : start + _WARM_UP_BATCH_SIZE]
+                ]
+                contents = self._repository_gateway.read_many_texts(
+                    [rule.path for rule in batch]
                 )
-            return RouterConfig.model_validate(parsed)
-        except ValidationError as error:
-            logger.error("Router validation failed", exc_info=error)
-            raise RouterValidationError(str(error)) from error
-        except OSError as error:
-            logger.error("Repository sync error while loading router", exc_info=error)
-            raise RepositorySyncError(str(error)) from error
-
-    def _router_to_markdown(self, router: RouterConfig) -> str:
-        sections: list[str] = ["# Router"]
-
-        sections.append("## Tasks")
-        if not router.tasks:
-            sections.append("- _none_")
-        else:
-            for name, task in router.tasks.items():
-                sections.append(f"### {name}")
-                sections.append(f"- Description: {task.description}")
-                sections.append(
-                    f"- Rules: {', '.join(task.rules) if task.rules else '_none_'}"
+                for rule in batch:
+                    preloaded[rule.path] = (rule.sha256, contents[rule.path])
+
+            self._preloaded_rules = preloaded
+            span.set_attribute("preloaded", len(preloaded))
+            if _stopped():
+                return len(preloaded)
+            self._get_search_index(snapshot)
+            logger.info(
+                "Snapshot warmed up",
+                extra={
+                    "sha": snapshot.revision,
+                    "preloaded_rules": len(preloaded),
+                    "read": len(stale),
+                },
+            )
+            return len(preloaded)
+
+    def _load_snapshot(self) -> _RouterSnapshot:
+        with tracer.span("service.load_snapshot") as span:
+            try:
+                with tracer.span("gateway.refresh_if_needed"):
+                    self._repository_gateway.refresh_if_needed()
+                revision = self._repository_gateway.current_revision()
+                cached = self._snapshot
+                if (
+                    cached is not None
+                    and revision is not None
+                    and cached.revision == revision
+                ):
+                    span.set_attribute("cache_hit", True)
+                    return cached
+
+                span.set_attribute("cache_hit", False)
+                manifest = self._repository_gateway.file_manifest()
+                router_entry = manifest.get(ROUTER_PATH)
+                router_sha256 = router_entry.sha256 if router_entry else None
+                if (
+                    cached is not None
+                    and router_sha256 is not None
+                    and cached.router_sha256 == router_sha256
+                ):
+                    logger.debug("Reusing parsed router", extra={"sha": revision})
+                    compiled = link_router(
+                        cached.router, manifest, cached.compiled.rule_includes
+                    ) or self._compile(cached.router, manifest)
+                else:
+                    logger.debug(
+                        "Loading router configuration", extra={"sha": revision}
+                    )
+                    compiled = self._read_compiled_router(router_sha256, manifest)
+                router = compiled.router
+                outline = RouterOutline(router=router, revision=revision)
+                tasks_by_first_rule: dict[str, tuple[str, ...]] = {}
+                for task_name, task in router.tasks.items():
+                    if task.rules:
+                        first = task.rules[0]
+                        tasks_by_first_rule[first] = (
+                            *tasks_by_first_rule.get(first, ()),
+                            task_name,
+                        )
+                snapshot = _RouterSnapshot(
+                    revision=revision,
+                    router_sha256=router_sha256,
+                    compiled=compiled,
+                    outline=outline,
+                    tasks_by_first_rule=tasks_by_first_rule,
                 )
-                sections.append(
-                    f"- Scripts: {', '.join(task.scripts) if task.scripts else '_none_'}"
+                self._snapshot = snapshot
+                return snapshot
+            except RouterValidationError as error:
+                logger.error("Router validation failed", exc_info=error)
+                raise
+            except OSError as error:
+                logger.error(
+                    "Repository sync error while loading router", exc_info=error
                 )
+                raise RepositorySyncError(str(error)) from error
 
-        sections.append("## Rules")
-        if not router.rules:
-            sections.append("- _none_")
-        else:
-            for name, rule in router.rules.items():
-                sections.append(f"- **{name}**: {rule.description}")
+    def _read_compiled_router(
+        self,
+        router_sha256: str | None,
+        manifest: Mapping[str, FileEntry],
+    ) -> CompiledRouter:
+        """Load the router compiled at sync time, validating only without one."""
+        router: CompactRouter | None = None
+        if router_sha256 is not None:
+            with tracer.span("router.load_cache") as span:
+                raw = self._repository_gateway.read_router_cache()
+                compiled = (
+                    load_compiled_router_cache(raw, router_sha256, manifest)
+                    if raw
+                    else None
+                )
+                if compiled is None and raw:
+                    router = load_router_cache(raw, router_sha256)
+                span.set_attribute(
+                    "cache_hit", compiled is not None or router is not None
+                )
+            if compiled is not None:
+                return compiled
+        if router is None:
+            logger.debug("Router cache unavailable, parsing router.yaml")
+            with tracer.span("router.parse_yaml"):
+                router = parse_router(self._repository_gateway.read_text(ROUTER_PATH))
+        return self._compile(router, manifest)
+
+    def _compile(
+        self,
+        router: CompactRouter,
+        manifest: Mapping[str, FileEntry],
+    ) -> CompiledRouter:
+        with tracer.span("router.compile"):
+            return compile_router(router, manifest=manifest)
 
-        sections.append("## Scripts")
-        if not router.scripts:
-            sections.append("- _none_")
-        else:
-            for name, script in router.scripts.items():
-                sections.append(f"- **{name}**: `{script.path}` — {script.description}")
+    def _check_rule_aliases(
+        self,
+        compiled: CompiledRouter,
+        rule_names: list[str],
+    ) -> None:
+        missing = [name for name in rule_names if name not in compiled.rules]
+        if missing:
+            joined = ", ".join(missing)
+            logger.warning("Unknown rule aliases requested", extra={"aliases": joined})
+            raise RouterReferenceError(f"unknown rule aliases: {joined}")
 
-        return "\n".join(sections)
+    def _resolve_rule_paths(
+        self,
+        compiled: CompiledRouter,
+        rule_names: list[str],
+    ) -> dict[str, str]:
+        """Map aliases to paths, with included rules once before their first user."""
+        self._check_rule_aliases(compiled, rule_names)
+        paths: dict[str, str] = {}
+        for name in rule_names:
+            for alias in (*compiled.rule_includes[name], name):
+                paths.setdefault(alias, compiled.rules[alias].path)
+        return paths
+
+    def _unchanged_rules(
+        self,
+        compiled: CompiledRouter,
+        rule_names: Iterable[str],
+        known_hashes: Mapping[str, str] | None,
+    ) -> dict[str, str]:
+        """Return content hashes of the rules the client already holds."""
+        if not known_hashes:
+            return {}
+        rules = compiled.rules
+        return {
+            name: rules[name].content_hash
+            for name in rule_names
+            if known_hashes.get(name) == rules[name].content_hash
+        }
+
+    def _read_rule_texts(
+        self,
+        compiled: CompiledRouter,
+        rule_names: list[str],
+    ) -> dict[str, str]:
+        """Return rule contents by path, serving current preloaded rules from memory."""
+        preloaded = self._preloaded_rules
+        contents: dict[str, str] = {}
+        missing: list[str] = []
+        for name in rule_names:
+            rule = compiled.rules[name]
+            hit = preloaded.get(rule.path)
+            if hit is not None and hit[0] == rule.sha256:
+                contents[rule.path] = hit[1]
+            else:
+                missing.append(rule.path)
+        if missing:
+            contents.update(self._repository_gateway.read_many_texts(missing))
+        return contents
+
+    def _get_search_index(self, snapshot: _RouterSnapshot) -> RuleSearchIndex:
+        router = snapshot.router
+        revision = snapshot.revision
+        with self._search_lock:
+            current = self._search_index
+            if (
+                current is not None
+                and revision is not None
+                and current.revision == revision
+            ):
+                return current
+
+            logger.info("Building rule search index", extra={"sha": revision})
+            task_descriptions: dict[str, list[str]] = {}
+            for task in router.tasks.values():
+                for rule_name in task.rules:
+                    task_descriptions.setdefault(rule_name, []).append(task.description)
+
+            compiled_rules = snapshot.compiled.rules
+            contents_by_path = self._read_rule_bodies(snapshot.compiled, current)
+            documents = [
+                SearchDocument(
+                    alias=name,
+                    description=rule.description,
+                    metadata_text=" ".join(
+                        [rule.description, *task_descriptions.get(name, [])]
+                    ),
+                    body=contents_by_path.get(rule.path, ""),
+                    content_hash=(
+                        compiled_rules[name].sha256
+                        if rule.path in contents_by_path
+                        else ""
+                    ),
+                )
+                for name, rule in router.rules.items()
+            ]
+            with tracer.span("search.build_index", document_count=len(documents)):
+                index = RuleSearchIndex(
+                    documents=documents,
+                    revision=revision,
+                    previous=current,
+                )
+            logger.debug(
+                "Rule search index built",
+                extra={"document_count": len(index), "reused": index.reused_count},
+            )
+            self._search_index = index
+            return index
+
+    def _read_rule_bodies(
+        self,
+        compiled: CompiledRouter,
+        previous: RuleSearchIndex | None,
+    ) -> dict[str, str]:
+        """Return rule contents by path, reading only bodies the index lacks.
+
+        Bodies are held once, by the search index; unchanged ones are taken
+        from the previous index or the preloaded rules by content hash. Files a sparse sync left out
+        are not fetched for the index, so those rules match on metadata only.
+        """
+        lazy_files = self._repository_gateway.lazy_files()
+        hashes = {
+            rule.path: rule.sha256
+            for rule in compiled.rules.values()
+            if normalize_path(rule.path) not in lazy_files
+        }
+        reusable = previous.bodies_by_hash() if previous is not None else {}
+        for sha, body in self._preloaded_rules.values():
+            reusable.setdefault(sha, body)
+        stale = [path for path, sha in hashes.items() if sha not in reusable]
+        fresh = self._repository_gateway.read_many_texts(stale) if stale else {}
+        logger.debug(
+            "Rule bodies loaded",
+            extra={"read": len(stale), "reused": len(hashes) - len(stale)},
+        )
+        return {
+            path: fresh[path] if path in fresh else reusable[sha]
+            for path, sha in hashes.items()
+        }
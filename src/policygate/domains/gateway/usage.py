@@ -0,0 +1,85 @@
+"""In-process usage counters for rules, scripts and tasks."""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from collections.abc import Container, Iterable
+
+from policygate.domains.gateway.models import AliasUsage, UsageKind
+
+_UsageKey = tuple[UsageKind, str]
+_BUFFER_LIMIT = 10_000
+
+
+class UsageRecorder:
+    """Per-alias hits, bytes served and latency, buffered between collections.
+
+    ``record`` only appends to a thread-safe buffer, so the request path pays
+    for one tuple and one append. Buffered hits are folded into the totals
+    when they are read, and the part not yet handed to a store is kept
+    separately until ``take_unsaved`` returns it for one batched write.
+    """
+
+    def __init__(self, totals: Iterable[AliasUsage] = ()) -> None:
+        self._buffer: deque[tuple[UsageKind, str, int, float]] = deque()
+        self._lock = threading.Lock()
+        self._totals: dict[_UsageKey, list[float]] = {}
+        self._unsaved: dict[_UsageKey, list[float]] = {}
+        for usage in totals:
+            self._totals[(usage.kind, usage.alias)] = [
+                usage.hits,
+                usage.bytes_served,
+                usage.total_ms / 1000,
+            ]
+
+    def record(self, kind: UsageKind, alias: str, size: int, seconds: float) -> None:
+        """Count one hit of an alias that served ``size`` bytes."""
+        self._buffer.append((kind, alias, size, seconds))
+        if len(self._buffer) >= _BUFFER_LIMIT:
+            with self._lock:
+                self._collect()
+
+    def totals(self, kind: UsageKind | None = None) -> list[AliasUsage]:
+        """Return totals per alias, most hit first."""
+        with self._lock:
+            self._collect()
+            items = [
+                _to_usage(key, values)
+                for key, values in self._totals.items()
+                if kind is None or key[0] == kind
+            ]
+        return sorted(items, key=lambda usage: (-usage.hits, usage.kind, usage.alias))
+
+    def top(self, kind: UsageKind, limit: int, known: Container[str]) -> list[str]:
+        """Return up to ``limit`` of the ``known`` aliases, most hit first."""
+        ranked = [usage.alias for usage in self.totals(kind) if usage.alias in known]
+        return ranked[:limit]
+
+    def take_unsaved(self) -> list[AliasUsage]:
+        """Return and forget the hits recorded since the previous call."""
+        with self._lock:
+            self._collect()
+            unsaved, self._unsaved = self._unsaved, {}
+        return [_to_usage(key, values) for key, values in unsaved.items()]
+
+    def _collect(self) -> None:
+        # popleft is atomic, so hits appended meanwhile stay for the next pass.
+        for _ in range(len(self._buffer)):
+            kind, alias, size, seconds = self._buffer.popleft()
+            for table in (self._totals, self._unsaved):
+                values = table.setdefault((kind, alias), [0, 0, 0.0])
+                values[0] += 1
+                values[1] += size
+                values[2] += seconds
+
+
+def _to_usage(key: _UsageKey, values: list[float]) -> AliasUsage:
+    hits, served, seconds = values
+    return AliasUsage(
+        kind=key[0],
+        alias=key[1],
+        hits=int(hits),
+        bytes_served=int(served),
+        total_ms=round(seconds * 1000, 3),
+    )
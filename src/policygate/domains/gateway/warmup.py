@@ -0,0 +1,65 @@
+"""Background runner for snapshot warm-up."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from functools import partial
+
+from policygate.config.logging import logger
+from policygate.domains.gateway.exceptions import PolicyGateError
+
+
+class WarmUpRunner:
+    """Run a warm-up job on a worker thread, restarting it for newer requests.
+
+    ``schedule`` returns immediately. A job still running when ``schedule`` is
+    called again sees its ``cancelled`` callback turn true, and one fresh run
+    follows, however many requests arrived in the meantime.
+    """
+
+    def __init__(self, job: Callable[[Callable[[], bool]], object]) -> None:
+        self._job = job
+        self._lock = threading.Lock()
+        self._requested = 0
+        self._thread: threading.Thread | None = None
+
+    def schedule(self) -> None:
+        """Request a warm-up run, cancelling the one in progress."""
+        with self._lock:
+            self._requested += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._worker,
+                    name="policygate-warm-up",
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def join(self, timeout: float | None = None) -> None:
+        """Wait until no warm-up is running or requested."""
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _worker(self) -> None:
+        completed = 0
+        while True:
+            with self._lock:
+                generation = self._requested
+                if generation == completed:
+                    self._thread = None
+                    return
+            try:
+                self._job(partial(self._is_superseded, generation))
+            except (PolicyGateError, OSError) as error:
+                logger.warning("Warm-up failed", extra={"error": str(error)})
+            except BaseException:
+                with self._lock:
+                    self._thread = None
+                raise
+            completed = generation
+
+    def _is_superseded(self, generation: int) -> bool:
+        return self._requested != generation
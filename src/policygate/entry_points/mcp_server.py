@@ -2,33 +2,74 @@
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+from collections.abc import Callable, Mapping
 from dataclasses import asdict, is_dataclass
 from functools import lru_cache
-from typing import Annotated, Any
+from pathlib import Path
+from typing import Annotated, Any, TypeVar
 
-from fastmcp import FastMCP
-from pydantic import Field
+from fastmcp import Context, FastMCP
+from pydantic import BaseModel, Field
 
 from policygate.config.logging import logger, setup_logging
+from policygate.config.profiling import ProfilingMode, profiler, setup_profiling
 from policygate.config.settings import get_settings
-from policygate.domains.gateway.services import PolicyGatewayService
+from policygate.config.tracing import setup_tracing, tracer
+from policygate.domains.gateway.exceptions import RepositorySyncError
+from policygate.domains.gateway.models import UsageKind
+from policygate.domains.gateway.outline import OutlineField, OutlineSection
+from policygate.domains.gateway.services import (
+    PolicyGatewayService,
+    RepositoryGateway,
+)
+from policygate.domains.gateway.usage import UsageRecorder
+from policygate.domains.gateway.warmup import WarmUpRunner
+from policygate.entry_points.push_webhook import PushWebhookServer
+from policygate.entry_points.response_cache import ToolResponseCache
+from policygate.entry_points.usage_recording import ToolUsageRecording
+from policygate.infrastructure.repository.archive_extraction import ArchiveLimits
 from policygate.infrastructure.repository.github_repository_gateway import (
     GitHubRepositoryGateway,
 )
+from policygate.infrastructure.repository.local_directory_gateway import (
+    LocalDirectoryRepositoryGateway,
+)
+from policygate.infrastructure.usage.usage_store import (
+    SqliteUsageStore,
+    UsageStatsWriter,
+)
 
 settings = get_settings()
 setup_logging(settings)
+setup_tracing(settings)
+setup_profiling(settings)
+
+_T = TypeVar("_T")
+
+
+def _serialize_response(value: Any) -> Any:
+    with tracer.span("mcp.serialize"):
+        return _to_serializable(value)
+
+
+def _profiled(tool_name: str, call: Callable[..., _T], /, **kwargs: Any) -> _T:
+    with profiler.profile(tool_name):
+        return call(**kwargs)
 
 
 def _to_serializable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, str | int | float | bool | None):
+        return value
     if isinstance(value, list):
         return [_to_serializable(item) for item in value]
     if isinstance(value, dict):
         return {key: _to_serializable(item) for key, item in value.items()}
     if is_dataclass(value):
         return _to_serializable(asdict(value))
-    if hasattr(value, "model_dump"):
-        return value.model_dump(mode="json")
     return value
 
 
@@ -42,21 +83,140 @@ mcp = FastMCP(
     on_duplicate="error",
     mask_error_details=False,
 )
+response_cache = ToolResponseCache(
+    revision=lambda: build_service().snapshot_revision(),
+    tool_names=("outline_router", "read_rules", "search_rules"),
+    max_chars=settings.response_cache_max_chars,
+    # Chunked reads report progress while reading, which a cached result skips.
+    bypass=lambda _, arguments: bool(arguments.get("chunked")),
+)
+mcp.add_middleware(
+    ToolUsageRecording(
+        record=lambda name, arguments, seconds: _record_usage(name, arguments, seconds),
+        tool_names=("read_rules", "copy_scripts"),
+    )
+)
+mcp.add_middleware(response_cache)
 
 
 @lru_cache(maxsize=1)
-def build_service() -> PolicyGatewayService:
-    """Build service graph with GitHub-backed repository gateway."""
+def build_repository_gateway() -> RepositoryGateway:
+    """Build configured repository gateway shared by service and webhook."""
     settings = get_settings()
+    if settings.repository_backend == "local":
+        return LocalDirectoryRepositoryGateway(
+            root_dir=settings.local_repository_dir,
+            poll_interval_seconds=settings.local_repository_poll_interval_seconds,
+            io_workers=settings.repository_io_workers,
+        )
+    return GitHubRepositoryGateway(
+        repository_url=settings.github_repository_url,
+        access_token=settings.github_access_token,
+        local_repo_data_dir=settings.local_repo_data_dir,
+        refresh_interval_seconds=settings.repository_refresh_interval_seconds,
+        min_refresh_interval_seconds=settings.repository_refresh_min_interval_seconds,
+        max_refresh_interval_seconds=settings.repository_refresh_max_interval_seconds,
+        api_base_url=settings.github_api_url,
+        io_workers=settings.repository_io_workers,
+        max_sync_retries=settings.repository_sync_max_retries,
+        sync_retry_backoff_seconds=settings.repository_sync_retry_backoff_seconds,
+        background_refresh=settings.repository_background_refresh,
+        invalidate_file=settings.repository_invalidate_file or None,
+        cold_blob_min_bytes=settings.repository_cold_blob_min_bytes,
+        cold_blob_promote_reads=settings.repository_cold_blob_promote_reads,
+        sparse_sync=settings.repository_sparse_sync,
+        sparse_tasks=[
+            task.strip()
+            for task in settings.repository_sparse_tasks.split(",")
+            if task.strip()
+        ],
+        archive_limits=ArchiveLimits(
+            max_file_bytes=settings.repository_archive_max_file_bytes,
+            max_total_bytes=settings.repository_archive_max_total_bytes,
+            max_files=settings.repository_archive_max_files,
+        ),
+    )
+
+
+@lru_cache(maxsize=1)
+def build_service() -> PolicyGatewayService:
+    """Build service graph with the configured repository gateway."""
     logger.info("Building policy gateway service")
     return PolicyGatewayService(
-        repository_gateway=GitHubRepositoryGateway(
-            repository_url=settings.github_repository_url,
-            access_token=settings.github_access_token,
-            local_repo_data_dir=settings.local_repo_data_dir,
-            refresh_interval_seconds=settings.repository_refresh_interval_seconds,
+        repository_gateway=build_repository_gateway(),
+        usage=build_usage_recorder(),
+    )
+
+
+@lru_cache(maxsize=1)
+def build_usage_recorder() -> UsageRecorder:
+    """Build alias usage counters, starting from the stored totals."""
+    store = _build_usage_store()
+    return UsageRecorder(store.load() if store else ())
+
+
+@lru_cache(maxsize=1)
+def build_usage_writer() -> UsageStatsWriter:
+    """Build the writer that periodically stores recorded usage."""
+    return UsageStatsWriter(
+        recorder=build_usage_recorder(),
+        store=_build_usage_store(),
+        interval_seconds=get_settings().usage_flush_interval_seconds,
+    )
+
+
+@lru_cache(maxsize=1)
+def build_warm_up_runner() -> WarmUpRunner:
+    """Build the runner that warms the service up after each sync."""
+    top_rules = get_settings().warmup_top_rules
+    service = build_service()
+    runner = WarmUpRunner(
+        lambda cancelled: service.warm_up(top_rules=top_rules, cancelled=cancelled)
+    )
+    build_repository_gateway().add_sync_listener(lambda _: runner.schedule())
+    return runner
+
+
+def _build_usage_store() -> SqliteUsageStore | None:
+    raw = get_settings().usage_stats_file
+    return SqliteUsageStore(Path(raw).expanduser()) if raw else None
+
+
+def _record_usage(tool_name: str, arguments: Mapping[str, Any], seconds: float) -> None:
+    service = build_service()
+    if tool_name == "copy_scripts":
+        service.record_script_copies(list(arguments["script_names"]), seconds)
+    elif arguments.get("cursor") is None:
+        # Later pages continue a read that is already counted.
+        service.record_rule_reads(
+            list(arguments["rule_names"]),
+            seconds,
+            known_hashes=arguments.get("known_hashes"),
         )
+
+
+def start_push_webhook() -> PushWebhookServer | None:
+    """Start push webhook endpoint when a webhook port is configured."""
+    settings = get_settings()
+    if settings.webhook_port is None:
+        return None
+    if not settings.webhook_secret:
+        raise RepositorySyncError("webhook_secret is not configured")
+
+    gateway = build_repository_gateway()
+    if not isinstance(gateway, GitHubRepositoryGateway):
+        logger.warning("Push webhook is only used with the GitHub repository backend")
+        return None
+    server = PushWebhookServer(
+        secret=settings.webhook_secret,
+        on_push=lambda event: gateway.notify_push(
+            event.repository, event.sha, before=event.before
+        ),
+        host=settings.webhook_host,
+        port=settings.webhook_port,
     )
+    server.start()
+    return server
 
 
 @mcp.tool(
@@ -66,10 +226,54 @@ def build_service() -> PolicyGatewayService:
         "openWorldHint": False,
     }
 )
-def outline_router() -> str:
-    """Parse and return router.yaml contents as markdown text."""
+def outline_router(
+    section: Annotated[
+        OutlineSection | None,
+        Field(description="Return only one router section."),
+    ] = None,
+    prefix: Annotated[
+        str | None,
+        Field(description="Return only entries whose alias starts with this prefix."),
+    ] = None,
+    offset: Annotated[
+        int,
+        Field(ge=0, description="Number of matching entries to skip."),
+    ] = 0,
+    limit: Annotated[
+        int | None,
+        Field(ge=1, description="Maximum number of entries to return."),
+    ] = None,
+    fields: Annotated[
+        list[OutlineField] | None,
+        Field(description="Entry fields to include. Empty list returns aliases only."),
+    ] = None,
+    snapshot: Annotated[
+        str | None,
+        Field(
+            description=(
+                "Snapshot SHA from the footer of the previous page. The call fails "
+                "if another snapshot is current, so pages never skip or repeat."
+            )
+        ),
+    ] = None,
+) -> str:
+    """Parse and return router.yaml contents as markdown text.
+
+    Paged responses end with a footer holding the next offset and snapshot SHA.
+    """
     logger.debug("Tool call: outline_router")
-    return build_service().outline_router()
+    with (
+        tracer.span("tool.outline_router"),
+        profiler.profile("outline_router"),
+    ):
+        return build_service().outline_router(
+            section=section,
+            prefix=prefix,
+            offset=offset,
+            limit=limit,
+            fields=fields,
+            snapshot=snapshot,
+        )
 
 
 @mcp.tool(
@@ -82,7 +286,11 @@ def outline_router() -> str:
 def sync_repository() -> dict[str, str]:
     """Force repository synchronization to refresh local cache now."""
     logger.info("Tool call: sync_repository")
-    return build_service().sync_repository()
+    with (
+        tracer.span("tool.sync_repository"),
+        profiler.profile("sync_repository"),
+    ):
+        return build_service().sync_repository()
 
 
 @mcp.tool(
@@ -92,7 +300,51 @@ def sync_repository() -> dict[str, str]:
         "openWorldHint": False,
     }
 )
-def read_rules(
+def repository_status() -> dict[str, Any]:
+    """Return local snapshot SHA, sync time, and staleness after failed refreshes."""
+    logger.debug("Tool call: repository_status")
+    with (
+        tracer.span("tool.repository_status"),
+        profiler.profile("repository_status"),
+    ):
+        return _serialize_response(build_service().repository_status())
+
+
+@mcp.tool(
+    annotations={
+        "readOnlyHint": False,
+        "idempotentHint": True,
+        "openWorldHint": True,
+    }
+)
+def verify_cache(
+    full: Annotated[
+        bool,
+        Field(description="Compare SHA-256 hashes; false only checks sizes."),
+    ] = True,
+    repair: Annotated[
+        bool,
+        Field(description="Download damaged files of the synced commit again."),
+    ] = True,
+) -> dict[str, Any]:
+    """Check the local cache against its file manifest and repair damaged files."""
+    logger.info("Tool call: verify_cache", extra={"full": full, "repair": repair})
+    with tracer.span("tool.verify_cache"), profiler.profile("verify_cache"):
+        result = build_service().verify_cache(full=full, repair=repair)
+    if result.repaired_files:
+        # Responses cached before the repair may carry damaged file content.
+        response_cache.invalidate()
+    return _serialize_response(result)
+
+
+@mcp.tool(
+    annotations={
+        "readOnlyHint": True,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    }
+)
+async def read_rules(
     rule_names: Annotated[
         list[str],
         Field(
@@ -102,10 +354,148 @@ def read_rules(
             )
         ),
     ],
+    ctx: Context,
+    max_chars: Annotated[
+        int | None,
+        Field(
+            ge=1,
+            description=(
+                "Character budget for the response (about 4 characters per token). "
+                "Truncated responses end with a continuation cursor."
+            ),
+        ),
+    ] = None,
+    cursor: Annotated[
+        str | None,
+        Field(description="Continuation cursor from a previous truncated response."),
+    ] = None,
+    chunked: Annotated[
+        bool,
+        Field(description="Emit progress notifications with each rule as it is read."),
+    ] = False,
+    known_hashes: Annotated[
+        dict[str, str] | None,
+        Field(
+            description=(
+                "Content hashes of rules already read, by alias, as given in "
+                '<alias hash="hash"> tags. Rules whose hash is current are '
+                'returned as <alias unchanged="hash" /> markers.'
+            )
+        ),
+    ] = None,
 ) -> str:
     """Read selected rules and return a combined markdown document."""
     logger.debug("Tool call: read_rules", extra={"rule_count": len(rule_names)})
-    return build_service().read_rules(rule_names=rule_names)
+    with tracer.span("tool.read_rules", rule_count=len(rule_names)):
+        return await _read_rules(
+            rule_names, ctx, max_chars, cursor, chunked, known_hashes
+        )
+
+
+async def _read_rules(
+    rule_names: list[str],
+    ctx: Context,
+    max_chars: int | None,
+    cursor: str | None,
+    chunked: bool,
+    known_hashes: dict[str, str] | None,
+) -> str:
+    service = build_service()
+    if not chunked:
+        return await asyncio.to_thread(
+            _profiled,
+            "read_rules",
+            service.read_rules,
+            rule_names=rule_names,
+            max_chars=max_chars,
+            cursor=cursor,
+            known_hashes=known_hashes,
+        )
+
+    page = await asyncio.to_thread(
+        service.open_rules_page,
+        rule_names=rule_names,
+        max_chars=max_chars,
+        cursor=cursor,
+        known_hashes=known_hashes,
+    )
+    chunks = iter(page)
+    parts: list[str] = []
+    while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+        parts.append(chunk.text)
+        await ctx.report_progress(
+            progress=chunk.position + 1,
+            total=chunk.total,
+            message=chunk.text.lstrip("\n"),
+        )
+
+    return page.finalize("".join(parts))
+
+
+@mcp.tool(
+    annotations={
+        "readOnlyHint": True,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    }
+)
+def rule_hashes(
+    rule_names: Annotated[
+        list[str] | None,
+        Field(description="Rule aliases to return hashes for; all rules if omitted."),
+    ] = None,
+) -> dict[str, Any]:
+    """Return the snapshot SHA and content hashes of rules, for read_rules."""
+    logger.debug("Tool call: rule_hashes")
+    with tracer.span("tool.rule_hashes"), profiler.profile("rule_hashes"):
+        return _serialize_response(build_service().rule_hashes(rule_names=rule_names))
+
+
+@mcp.tool(
+    annotations={
+        "readOnlyHint": True,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    }
+)
+def changed_since(
+    sha: Annotated[
+        str,
+        Field(description="Snapshot SHA the client's rules were read from."),
+    ],
+) -> dict[str, Any]:
+    """Return aliases and new hashes of rules changed since an earlier snapshot."""
+    logger.debug("Tool call: changed_since", extra={"since": sha})
+    with tracer.span("tool.changed_since"), profiler.profile("changed_since"):
+        return _serialize_response(build_service().changed_since(sha=sha))
+
+
+@mcp.tool(
+    annotations={
+        "readOnlyHint": True,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    }
+)
+def search_rules(
+    query: Annotated[
+        str,
+        Field(description="Keywords describing the task or topic to find rules for."),
+    ],
+    limit: Annotated[
+        int,
+        Field(ge=1, le=100, description="Maximum number of ranked rules to return."),
+    ] = 10,
+) -> list[dict[str, Any]]:
+    """Search rules by keywords and return ranked aliases with snippets."""
+    logger.debug("Tool call: search_rules", extra={"limit": limit})
+    with (
+        tracer.span("tool.search_rules", limit=limit),
+        profiler.profile("search_rules"),
+    ):
+        return _serialize_response(
+            build_service().search_rules(query=query, limit=limit)
+        )
 
 
 @mcp.tool(
@@ -123,10 +513,88 @@ def copy_scripts(
 ) -> dict[str, Any]:
     """Copy selected scripts to a temporary directory for execution."""
     logger.info("Tool call: copy_scripts", extra={"script_count": len(script_names)})
-    return _to_serializable(build_service().copy_scripts(script_names=script_names))
+    with (
+        tracer.span("tool.copy_scripts", script_count=len(script_names)),
+        profiler.profile("copy_scripts"),
+    ):
+        return _serialize_response(
+            build_service().copy_scripts(script_names=script_names)
+        )
+
+
+@mcp.tool(
+    annotations={
+        "readOnlyHint": True,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    }
+)
+def usage_stats(
+    kind: Annotated[
+        UsageKind | None,
+        Field(description="Return only rule, script, or task usage."),
+    ] = None,
+    limit: Annotated[
+        int | None,
+        Field(ge=1, description="Maximum number of most used aliases to return."),
+    ] = None,
+) -> dict[str, Any]:
+    """Return hits, bytes served and latency per alias, and aliases never used."""
+    logger.debug("Tool call: usage_stats", extra={"kind": kind, "limit": limit})
+    with tracer.span("tool.usage_stats"), profiler.profile("usage_stats"):
+        return _serialize_response(build_service().usage_stats(kind=kind, limit=limit))
+
+
+@mcp.tool(
+    annotations={
+        "readOnlyHint": False,
+        "idempotentHint": True,
+        "openWorldHint": False,
+    }
+)
+def configure_profiling(
+    next_calls: Annotated[
+        int,
+        Field(ge=0, description="Profile this many upcoming tool calls."),
+    ] = 0,
+    slow_call_threshold_ms: Annotated[
+        float | None,
+        Field(
+            ge=0,
+            description=(
+                "Log tool calls slower than this with a stage timing breakdown. "
+                "Null turns slow-call logging off."
+            ),
+        ),
+    ] = None,
+    profile_slow_calls: Annotated[
+        bool,
+        Field(description="Profile every call and keep profiles of slow calls."),
+    ] = False,
+    mode: Annotated[
+        ProfilingMode | None,
+        Field(description="cprofile for pstats files, sampling for collapsed stacks."),
+    ] = None,
+) -> dict[str, Any]:
+    """Change profiling of tool calls in the running server and return its state."""
+    logger.info("Tool call: configure_profiling")
+    return _serialize_response(
+        profiler.configure(
+            mode=mode,
+            next_calls=next_calls,
+            slow_call_threshold_ms=slow_call_threshold_ms,
+            profile_slow_calls=profile_slow_calls,
+        )
+    )
 
 
 def run() -> None:
     """Run MCP server."""
     logger.info("Starting MCP server", extra={"app_version": settings.app_version})
+    usage_writer = build_usage_writer()
+    usage_writer.start()
+    atexit.register(usage_writer.stop)
+    if settings.warmup_enabled:
+        build_warm_up_runner().schedule()
+    start_push_webhook()
     mcp.run()
@@ -0,0 +1,206 @@
+"""Local HTTP endpoint that turns GitHub push webhooks into targeted syncs."""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import threading
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from policygate.config.logging import logger
+
+SIGNATURE_HEADER = "x-hub-signature-256"
+EVENT_HEADER = "x-github-event"
+# Push payloads stay well below this; larger bodies are refused unread.
+_MAX_BODY_BYTES = 1024 * 1024
+# Clients that stall mid-request lose their connection instead of a thread.
+_REQUEST_TIMEOUT_SECONDS = 10.0
+_DELETED_SHA = "0" * 40
+
+
+@dataclass(frozen=True)
+class PushEvent:
+    """Fields of a GitHub push payload needed to sync the pushed commit."""
+
+    repository: str
+    ref: str
+    sha: str
+    default_branch: str | None
+    before: str | None = None
+
+    @property
+    def targets_default_branch(self) -> bool:
+        return (
+            self.default_branch is not None
+            and self.ref == f"refs/heads/{self.default_branch}"
+        )
+
+
+def verify_signature(secret: str, body: bytes, signature: str | None) -> bool:
+    """Check an ``X-Hub-Signature-256`` header against the raw request body."""
+    if not secret or not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature.removeprefix("sha256="))
+
+
+def parse_push_event(body: bytes) -> PushEvent:
+    """Extract repository, ref and the SHAs before and after a push."""
+    try:
+        payload = json.loads(body)
+        repository = payload["repository"]
+        before = payload.get("before")
+        return PushEvent(
+            repository=str(repository["full_name"]),
+            ref=str(payload["ref"]),
+            sha=str(payload["after"]),
+            default_branch=repository.get("default_branch"),
+            before=str(before) if before else None,
+        )
+    except (ValueError, TypeError, KeyError) as error:
+        raise ValueError(f"malformed push payload: {error}") from error
+
+
+class PushWebhookServer:
+    """Threaded HTTP server accepting signed GitHub push webhooks.
+
+    Verified pushes to the default branch are handed to ``on_push``, which
+    schedules the sync and returns immediately, so GitHub gets its response
+    well within the webhook delivery timeout.
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        on_push: Callable[[PushEvent], bool],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        path: str = "/webhook",
+        request_timeout_seconds: float = _REQUEST_TIMEOUT_SECONDS,
+    ) -> None:
+        self._secret = secret
+        self._on_push = on_push
+        self._host = host
+        self._port = port
+        self._path = path
+        self._request_timeout_seconds = request_timeout_seconds
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        if self._server is None:
+            return self._host, self._port
+        host, port = self._server.server_address[:2]
+        return str(host), int(port)
+
+    def handle(
+        self,
+        path: str,
+        headers: Mapping[str, str],
+        body: bytes,
+    ) -> tuple[int, str]:
+        """Process one webhook delivery and return HTTP status and message.
+
+        Header names are expected in lower case.
+        """
+        if path != self._path:
+            return 404, "not found"
+        if not verify_signature(self._secret, body, headers.get(SIGNATURE_HEADER)):
+            logger.warning("Rejected webhook with invalid signature")
+            return 401, "invalid signature"
+
+        event_type = headers.get(EVENT_HEADER, "")
+        if event_type == "ping":
+            return 200, "pong"
+        if event_type != "push":
+            return 202, f"ignored event: {event_type or 'unknown'}"
+
+        try:
+            event = parse_push_event(body)
+        except ValueError as error:
+            return 400, str(error)
+
+        if event.sha == _DELETED_SHA or not event.targets_default_branch:
+            logger.debug(
+                "Ignored push outside default branch", extra={"ref": event.ref}
+            )
+            return 202, f"ignored ref: {event.ref}"
+        if not self._on_push(event):
+            return 202, f"ignored repository: {event.repository}"
+
+        logger.info(
+            "Accepted push webhook",
+            extra={"repository": event.repository, "sha": event.sha},
+        )
+        return 202, f"sync scheduled: {event.sha}"
+
+    def start(self) -> None:
+        """Start serving on a daemon thread."""
+        webhook = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            timeout = webhook._request_timeout_seconds
+
+            def do_POST(self) -> None:
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    self._respond(400, "invalid Content-Length")
+                    return
+                if length > _MAX_BODY_BYTES:
+                    self._respond(413, "payload too large")
+                    return
+                try:
+                    body = self.rfile.read(length)
+                except TimeoutError:
+                    self.close_connection = True
+                    self._respond(408, "request body timed out")
+                    return
+                if len(body) < length:
+                    self._respond(400, "incomplete request body")
+                    return
+                headers = {key.lower(): value for key, value in self.headers.items()}
+                status, message = webhook.handle(self.path, headers, body)
+                self._respond(status, message)
+
+            def _respond(self, status: int, message: str) -> None:
+                data = message.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: object) -> None:
+                logger.debug("Webhook request", extra={"request": format % args})
+
+        self._server = ThreadingHTTPServer((self._host, self._port), _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="policygate-webhook",
+            daemon=True,
+        )
+        self._thread.start()
+        host, port = self.address
+        logger.info(
+            "Started push webhook endpoint",
+            extra={"host": host, "port": port, "path": self._path},
+        )
+
+    def stop(self) -> None:
+        """Stop serving and release the socket."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        self._server = None
+        self._thread = None
@@ -0,0 +1,132 @@
+"""Bounded cache of encoded MCP tool responses per repository revision."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+
+import mcp.types as mt
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools import ToolResult
+
+from policygate.config.logging import logger
+from policygate.config.tracing import tracer
+
+_CacheKey = tuple[str, str]
+
+
+class ToolResponseCache(Middleware):
+    """Serve repeated read-only tool calls from already encoded results.
+
+    Results are keyed by tool name and arguments and kept only for the
+    repository revision they were built from; the first call after a
+    revision change drops every older entry. ``revision`` runs the usual
+    refresh check, so cached calls still pick up repository changes. The
+    cache holds at most ``max_chars`` characters of response text, evicting
+    least recently used entries.
+    """
+
+    def __init__(
+        self,
+        revision: Callable[[], str | None],
+        tool_names: Iterable[str],
+        max_chars: int,
+        bypass: Callable[[str, Mapping[str, Any]], bool] | None = None,
+    ) -> None:
+        self._revision = revision
+        self._tool_names = frozenset(tool_names)
+        self._max_chars = max(max_chars, 0)
+        self._bypass = bypass
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[_CacheKey, tuple[ToolResult, int]] = OrderedDict()
+        self._cached_revision: str | None = None
+        self._used_chars = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[mt.CallToolRequestParams],
+        call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+    ) -> ToolResult:
+        name = context.message.name
+        arguments = context.message.arguments or {}
+        if (
+            self._max_chars == 0
+            or name not in self._tool_names
+            or (self._bypass is not None and self._bypass(name, arguments))
+        ):
+            return await call_next(context)
+
+        revision = await asyncio.to_thread(self._revision)
+        if revision is None:
+            return await call_next(context)
+        key = (name, json.dumps(arguments, sort_keys=True, default=str))
+        cached = self._get(revision, key)
+        if cached is not None:
+            with tracer.span(f"tool.{name}", cached=True):
+                return cached
+
+        result = await call_next(context)
+        if not result.is_error:
+            self._put(revision, key, result)
+        return result
+
+    def clear(self) -> None:
+        """Drop cached responses and reset hit counters."""
+        with self._lock:
+            self._entries.clear()
+            self._used_chars = 0
+            self.hits = 0
+            self.misses = 0
+
+    def invalidate(self) -> None:
+        """Drop cached responses of the current revision, keeping counters."""
+        with self._lock:
+            self._entries.clear()
+            self._used_chars = 0
+
+    def _get(self, revision: str, key: _CacheKey) -> ToolResult | None:
+        with self._lock:
+            if revision != self._cached_revision:
+                self._entries.clear()
+                self._used_chars = 0
+                self._cached_revision = revision
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def _put(self, revision: str, key: _CacheKey, result: ToolResult) -> None:
+        size = _result_chars(result)
+        if size > self._max_chars:
+            logger.debug(
+                "Tool response too large to cache",
+                extra={"tool": key[0], "chars": size},
+            )
+            return
+        with self._lock:
+            if revision != self._cached_revision:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._used_chars -= previous[1]
+            self._entries[key] = (result, size)
+            self._used_chars += size
+            while self._used_chars > self._max_chars:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._used_chars -= evicted_size
+
+
+def _result_chars(result: ToolResult) -> int:
+    """Approximate memory of a result by the text it carries."""
+    text_chars = sum(len(getattr(block, "text", "")) for block in result.content)
+    # Structured content repeats the text content in another form.
+    return text_chars * 2 if result.structured_content is not None else text_chars
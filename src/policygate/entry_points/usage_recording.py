@@ -0,0 +1,44 @@
+"""Timing of MCP tool calls for alias usage statistics."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+
+import mcp.types as mt
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools import ToolResult
+
+
+class ToolUsageRecording(Middleware):
+    """Hand the arguments and duration of successful tool calls to ``record``.
+
+    Added before the response cache, so calls answered from the cache are
+    counted as well. ``record`` runs on the event loop and has to be cheap.
+    """
+
+    def __init__(
+        self,
+        record: Callable[[str, Mapping[str, Any], float], None],
+        tool_names: Iterable[str],
+    ) -> None:
+        self._record = record
+        self._tool_names = frozenset(tool_names)
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[mt.CallToolRequestParams],
+        call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+    ) -> ToolResult:
+        name = context.message.name
+        if name not in self._tool_names:
+            return await call_next(context)
+
+        started = time.perf_counter()
+        result = await call_next(context)
+        if not result.is_error:
+            self._record(
+                name, context.message.arguments or {}, time.perf_counter() - started
+            )
+        return result
@@ -0,0 +1,162 @@
+"""Retrying, resumable, and verified repository archive downloads."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import random
+import re
+import time
+import zlib
+from collections.abc import Callable
+from pathlib import Path
+from typing import TypeVar
+
+import httpx
+
+from policygate.config.logging import logger
+from policygate.domains.gateway.exceptions import RepositorySyncError
+
+_R = TypeVar("_R")
+_CONTENT_RANGE_PATTERN = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+_CHUNK_SIZE = 1024 * 1024
+
+
+class _CorruptArchiveError(RepositorySyncError):
+    """Raised when a downloaded archive fails size or checksum verification."""
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Return whether retrying the same request may succeed."""
+    if isinstance(error, _CorruptArchiveError | httpx.TransportError):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return False
+
+
+def call_with_retries(
+    operation: Callable[[], _R],
+    description: str,
+    max_retries: int,
+    backoff_seconds: float,
+    sleep: Callable[[float], None] = time.sleep,
+) -> _R:
+    """Run operation, retrying transient failures with full-jitter backoff."""
+    attempt = 0
+    while True:
+        try:
+            return operation()
+        except Exception as error:
+            if attempt >= max_retries or not is_transient_error(error):
+                raise
+            attempt += 1
+            delay = random.uniform(0, backoff_seconds * 2 ** (attempt - 1))
+            logger.warning(
+                "Transient repository sync error, retrying",
+                extra={
+                    "operation": description,
+                    "attempt": attempt,
+                    "delay_seconds": round(delay, 3),
+                    "error": str(error),
+                },
+            )
+            sleep(delay)
+
+
+def download_archive(
+    client: httpx.Client,
+    url: str,
+    target: Path,
+    max_retries: int,
+    backoff_seconds: float,
+    sleep: Callable[[float], None] = time.sleep,
+) -> str:
+    """Download a gzip archive to target and return its SHA-256.
+
+    Interrupted transfers resume with an HTTP ``Range`` request when the server
+    supports it. The result is verified against the announced length and the
+    gzip CRC before it is accepted; a corrupt file is discarded and fetched
+    again within the same retry budget.
+    """
+
+    def _attempt() -> None:
+        try:
+            _download_once(client=client, url=url, target=target)
+            _verify_gzip(target)
+        except _CorruptArchiveError:
+            target.unlink(missing_ok=True)
+            raise
+
+    call_with_retries(
+        _attempt,
+        description="download archive",
+        max_retries=max_retries,
+        backoff_seconds=backoff_seconds,
+        sleep=sleep,
+    )
+
+    digest = hashlib.sha256()
+    with target.open("rb") as handle:
+        while chunk := handle.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _download_once(client: httpx.Client, url: str, target: Path) -> None:
+    offset = target.stat().st_size if target.exists() else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    with client.stream("GET", url, headers=headers) as response:
+        if response.status_code == 416:
+            target.unlink(missing_ok=True)
+            raise _CorruptArchiveError("archive resume offset was rejected")
+        response.raise_for_status()
+
+        resumed = offset > 0 and response.status_code == 206
+        expected_size = _expected_size(response, resumed=resumed, offset=offset)
+        if offset and not resumed:
+            logger.info("Server ignored range request, restarting download")
+        elif resumed:
+            logger.info("Resuming archive download", extra={"offset": offset})
+
+        with target.open("ab" if resumed else "wb") as handle:
+            for chunk in response.iter_bytes():
+                handle.write(chunk)
+
+    if expected_size is not None and target.stat().st_size != expected_size:
+        raise _CorruptArchiveError(
+            f"archive size mismatch: expected {expected_size} bytes, "
+            f"got {target.stat().st_size}"
+        )
+
+
+def _expected_size(
+    response: httpx.Response,
+    resumed: bool,
+    offset: int,
+) -> int | None:
+    if resumed:
+        match = _CONTENT_RANGE_PATTERN.fullmatch(
+            response.headers.get("content-range", "")
+        )
+        if match is None or int(match.group(1)) != offset:
+            raise _CorruptArchiveError("unexpected Content-Range in resumed download")
+        total = match.group(3)
+        return None if total == "*" else int(total)
+
+    if "content-encoding" in response.headers:
+        return None
+    length = response.headers.get("content-length")
+    return int(length) if length and length.isdigit() else None
+
+
+def _verify_gzip(target: Path) -> None:
+    try:
+        with gzip.open(target, "rb") as handle:
+            while handle.read(_CHUNK_SIZE):
+                pass
+    except (OSError, EOFError, zlib.error) as error:
+        raise _CorruptArchiveError(
+            f"archive checksum verification failed: {error}"
+        ) from error
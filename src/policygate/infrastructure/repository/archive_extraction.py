@@ -0,0 +1,149 @@
+"""Streaming extraction of policy files from a repository archive."""
+
+from __future__ import annotations
+
+import posixpath
+import tarfile
+from dataclasses import dataclass
+from pathlib import Path
+
+from policygate.config.logging import logger
+from policygate.domains.gateway.exceptions import RepositorySyncError
+from policygate.infrastructure.repository.snapshot_files import POLICY_ENTRIES
+
+# Extraction filters arrived in Python 3.11.4; older interpreters extract
+# only regular files of policy paths, without links.
+_HAS_EXTRACTION_FILTERS = hasattr(tarfile, "data_filter")
+
+
+@dataclass(frozen=True)
+class ArchiveLimits:
+    """Bounds for the policy files taken from one archive; ``0`` disables one."""
+
+    max_file_bytes: int = 0
+    max_total_bytes: int = 0
+    max_files: int = 0
+
+
+@dataclass(frozen=True)
+class ExtractedArchive:
+    """Repository root extracted from an archive and what it took to get it."""
+
+    root: Path
+    extracted_files: int
+    extracted_bytes: int
+    skipped_members: int
+
+
+def extract_policy_files(
+    archive_path: Path,
+    target: Path,
+    limits: ArchiveLimits,
+) -> ExtractedArchive:
+    """Stream a gzip repository archive and extract only its policy files.
+
+    GitHub archives hold one top-level directory. Below it, ``router.yaml`` and
+    members under ``rules/`` and ``scripts/`` are extracted through tarfile's
+    ``data`` filter, which rejects absolute paths, links leaving the target
+    and special files; every other member is skipped before anything is
+    written. A link pointing at a skipped member of the repository would be
+    left dangling, so it fails the sync instead. Limits are checked against member headers, so an oversized file
+    is never decompressed to disk, and exceeding one fails the whole sync.
+    """
+    root_name: str | None = None
+    extracted_files = 0
+    extracted_bytes = 0
+    skipped_members = 0
+    with tarfile.open(archive_path, mode="r|gz") as archive:
+        for member in archive:
+            top, _, relative = member.name.partition("/")
+            if root_name is None:
+                root_name = top
+                # Members are extracted below target/root_name, also without filters.
+                if root_name in ("", ".", ".."):
+                    raise RepositorySyncError(
+                        f"archive entry {member.name} is outside a top-level directory"
+                    )
+            if member.isdir():
+                continue
+            if top != root_name or not _is_policy_path(relative):
+                skipped_members += 1
+                continue
+            link_target = _link_target(member, relative, root_name)
+            if link_target is not None and not _is_policy_path(link_target):
+                raise RepositorySyncError(
+                    f"archive link {relative} points to {link_target}, "
+                    "which is not extracted from the archive"
+                )
+            if not member.isreg() and not _HAS_EXTRACTION_FILTERS:
+                logger.warning(
+                    "Skipped archive link, extraction filters are unavailable",
+                    extra={"relative_path": relative},
+                )
+                skipped_members += 1
+                continue
+
+            if limits.max_file_bytes and member.size > limits.max_file_bytes:
+                raise RepositorySyncError(
+                    f"archive file {relative} has {member.size} bytes, "
+                    f"over the limit of {limits.max_file_bytes}"
+                )
+            extracted_files += 1
+            extracted_bytes += member.size
+            if limits.max_files and extracted_files > limits.max_files:
+                raise RepositorySyncError(
+                    f"archive has more than {limits.max_files} policy files"
+                )
+            if limits.max_total_bytes and extracted_bytes > limits.max_total_bytes:
+                raise RepositorySyncError(
+                    f"archive policy files exceed {limits.max_total_bytes} bytes"
+                )
+            if _HAS_EXTRACTION_FILTERS:
+                archive.extract(member, path=target, filter="data")
+            else:
+                archive.extract(member, path=target)
+
+    if not root_name:
+        raise RepositorySyncError("unable to extract repository archive")
+    root = target / root_name
+    root.mkdir(parents=True, exist_ok=True)
+    return ExtractedArchive(
+        root=root,
+        extracted_files=extracted_files,
+        extracted_bytes=extracted_bytes,
+        skipped_members=skipped_members,
+    )
+
+
+def _link_target(
+    member: tarfile.TarInfo,
+    relative_path: str,
+    root_name: str,
+) -> str | None:
+    """Return the repository path a link points to, if it stays in the root.
+
+    Links leaving the root are left to the extraction filter.
+    """
+    if member.issym():
+        if member.linkname.startswith("/"):
+            return None
+        target = posixpath.normpath(
+            posixpath.join(posixpath.dirname(relative_path), member.linkname)
+        )
+    elif member.islnk():
+        top, _, target = member.linkname.partition("/")
+        if top != root_name:
+            return None
+        target = posixpath.normpath(target)
+    else:
+        return None
+    return None if target.startswith("..") else target
+
+
+def _is_policy_path(relative_path: str) -> bool:
+    if not relative_path or relative_path.startswith("/"):
+        return False
+    normalized = posixpath.normpath(relative_path)
+    if normalized.startswith(".."):
+        return False
+    return normalized.split("/", 1)[0] in POLICY_ENTRIES
@@ -0,0 +1,58 @@
+"""Gzip-compressed storage of large, rarely read files inside a snapshot."""
+
+from __future__ import annotations
+
+import gzip
+import os
+import struct
+import zlib
+from pathlib import Path
+
+COLD_BLOB_DIR = ".policygate_cold"
+_SIZE_MODULUS = 1 << 32
+
+
+def cold_blob_path(snapshot_root: Path, relative_path: str) -> Path:
+    """Return where the compressed copy of a snapshot file is stored."""
+    return snapshot_root / COLD_BLOB_DIR / f"{relative_path}.gz"
+
+
+def cold_blob_relative_path(snapshot_root: Path, blob_path: Path) -> str | None:
+    """Return the snapshot path stored in a blob, or ``None`` for other files."""
+    try:
+        relative = blob_path.relative_to(snapshot_root / COLD_BLOB_DIR)
+    except ValueError:
+        return None
+    return relative.as_posix().removesuffix(".gz")
+
+
+def write_cold_blob(data: bytes, target: Path) -> None:
+    """Compress data into a blob file, replacing it atomically."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    write_file_atomically(target, gzip.compress(data, compresslevel=6, mtime=0))
+
+
+def read_cold_blob(path: Path) -> bytes:
+    """Decompress a blob; corrupted blobs raise ``OSError``."""
+    try:
+        return gzip.decompress(path.read_bytes())
+    except (EOFError, zlib.error) as error:
+        raise OSError(f"corrupted cold blob {path}: {error}") from error
+
+
+def cold_blob_matches_size(path: Path, size: int) -> bool:
+    """Compare the uncompressed size recorded in the gzip trailer."""
+    with path.open("rb") as handle:
+        handle.seek(0, os.SEEK_END)
+        if handle.tell() < 4:
+            return False
+        handle.seek(-4, os.SEEK_END)
+        (stored_size,) = struct.unpack("<I", handle.read(4))
+    return stored_size == size % _SIZE_MODULUS
+
+
+def write_file_atomically(target: Path, data: bytes) -> None:
+    """Write bytes next to the target and rename them into place."""
+    temp_path = target.with_name(f".{target.name}.tmp")
+    temp_path.write_bytes(data)
+    os.replace(temp_path, target)
@@ -2,23 +2,74 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
+import math
+import re
 import shutil
 import tarfile
 import tempfile
 import threading
 import time
-from io import BytesIO
+from collections import Counter
+from collections.abc import Collection
 from pathlib import Path
-from urllib.parse import urlparse
+from typing import Any
+from urllib.parse import quote, urlparse
 
 import httpx
 
 from policygate.config.logging import logger
-from policygate.domains.gateway.exceptions import RepositorySyncError
+from policygate.config.tracing import tracer
+from policygate.domains.gateway.compact_router import CompactRouter
+from policygate.domains.gateway.compiler import (
+    ROUTER_PATH,
+    CompiledRouter,
+    FileEntry,
+    compile_router,
+    dump_router_cache,
+    normalize_path,
+    parse_router,
+    referenced_paths,
+)
+from policygate.domains.gateway.exceptions import (
+    PolicyGateError,
+    RepositorySyncError,
+    RouterValidationError,
+)
+from policygate.domains.gateway.models import CacheVerification, SyncStatus
+from policygate.infrastructure.repository.archive_download import (
+    call_with_retries,
+    download_archive,
+)
+from policygate.infrastructure.repository.archive_extraction import (
+    ArchiveLimits,
+    extract_policy_files,
+)
+from policygate.infrastructure.repository.cold_blobs import (
+    cold_blob_matches_size,
+    cold_blob_path,
+    cold_blob_relative_path,
+    read_cold_blob,
+    write_cold_blob,
+    write_file_atomically,
+)
+from policygate.infrastructure.repository.refresh_scheduler import (
+    AdaptiveRefreshScheduler,
+    RateLimitBudget,
+    shared_rate_limit_budget,
+)
+from policygate.infrastructure.repository.snapshot_files import (
+    SnapshotFileAccess,
+    hash_file,
+)
 
+_COLD_BLOB_PREFIX = "rules/"
+_MANIFEST_HISTORY_LIMIT = 20
+_REVISION_PATTERN = re.compile(r"[0-9A-Za-z._-]+")
 
-class GitHubRepositoryGateway:
+
+class GitHubRepositoryGateway(SnapshotFileAccess):
     """Synchronize a GitHub repository and expose files from local cache."""
 
     def __init__(
@@ -27,6 +78,21 @@ class GitHubRepositoryGateway:
         access_token: str,
         local_repo_data_dir: str,
         refresh_interval_seconds: int = 60,
+        io_workers: int = 8,
+        min_refresh_interval_seconds: int | None = None,
+        max_refresh_interval_seconds: int | None = None,
+        api_base_url: str = "https://api.github.com",
+        rate_limit_budget: RateLimitBudget | None = None,
+        transport: httpx.BaseTransport | None = None,
+        max_sync_retries: int = 3,
+        sync_retry_backoff_seconds: float = 0.5,
+        background_refresh: bool = False,
+        invalidate_file: str | None = None,
+        cold_blob_min_bytes: int = 0,
+        cold_blob_promote_reads: int = 3,
+        sparse_sync: bool = False,
+        sparse_tasks: Collection[str] | None = None,
+        archive_limits: ArchiveLimits | None = None,
     ) -> None:
         if not repository_url:
             raise RepositorySyncError("github_repository_url is not configured")
@@ -36,12 +102,51 @@ class GitHubRepositoryGateway:
         self._repository_url = repository_url
         self._access_token = access_token
         self._local_repo_data_dir = Path(local_repo_data_dir).expanduser().resolve()
+        super().__init__(snapshot_root=self._local_repo_data_dir, io_workers=io_workers)
         self._refresh_interval_seconds = max(refresh_interval_seconds, 1)
-        self._last_refresh_check_at = 0.0
+        self._scheduler = AdaptiveRefreshScheduler(
+            initial_interval_seconds=self._refresh_interval_seconds,
+            min_interval_seconds=min_refresh_interval_seconds
+            or self._refresh_interval_seconds,
+            max_interval_seconds=max_refresh_interval_seconds
+            or self._refresh_interval_seconds,
+        )
+        self._api_base_url = api_base_url.rstrip("/")
+        self._rate_limit_budget = rate_limit_budget or shared_rate_limit_budget()
+        self._transport = transport
+        self._max_sync_retries = max(max_sync_retries, 0)
+        self._sync_retry_backoff_seconds = max(sync_retry_backoff_seconds, 0.0)
+        self._background_refresh = background_refresh
+        self._background_thread: threading.Thread | None = None
+        self._invalidate_file = (
+            Path(invalidate_file).expanduser() if invalidate_file else None
+        )
+        self._invalidate_mtime_ns = self._invalidate_signal_mtime()
+        self._push_lock = threading.Lock()
+        self._pending_push: tuple[str | None, str | None] | None = None
+        self._push_thread: threading.Thread | None = None
         self._refresh_lock = threading.Lock()
+        self._cold_blob_min_bytes = max(cold_blob_min_bytes, 0)
+        self._cold_blob_promote_reads = max(cold_blob_promote_reads, 1)
+        self._cold_files: frozenset[str] | None = None
+        self._cold_reads: Counter[str] = Counter()
+        self._cold_lock = threading.Lock()
+        self._promoted_files: set[str] = set()
+        self._sparse_tasks = frozenset(sparse_tasks) if sparse_tasks else None
+        self._sparse_sync = sparse_sync or self._sparse_tasks is not None
+        self._lazy_files: frozenset[str] | None = None
+        self._lazy_lock = threading.Lock()
+        self._fetched_files: set[str] = set()
+        self._archive_limits = archive_limits or ArchiveLimits()
+        self._stale = False
+        self._last_sync_error: str | None = None
 
         self._owner, self._repo = self._parse_owner_repo(repository_url)
         self._metadata_file = self._local_repo_data_dir / ".policygate_sync.json"
+        self._router_cache_file = self._local_repo_data_dir / ".policygate_router.json"
+        self._cached_sha: str | None = None
+        self._manifest: dict[str, FileEntry] | None = None
+        self._recover_interrupted_swap()
 
         logger.info(
             "Initialized GitHub repository gateway",
@@ -49,119 +154,660 @@ class GitHubRepositoryGateway:
                 "repository": f"{self._owner}/{self._repo}",
                 "local_repo_data_dir": str(self._local_repo_data_dir),
                 "refresh_interval_seconds": self._refresh_interval_seconds,
+                "io_workers": self._io_workers,
+                "sparse_sync": self._sparse_sync,
             },
         )
 
     def refresh_if_needed(self) -> None:
-        """Refresh local cache if check interval elapsed and commit changed."""
-        with self._refresh_lock:
+        """Refresh local cache if a check is due and the commit changed.
+
+        Checks are skipped while the adaptive schedule is not due or while the
+        shared GitHub rate-limit budget is exhausted, as long as a local cache
+        exists to serve from. Touching the invalidate file makes a check due
+        immediately. With a cache present, failed refreshes keep the
+        last good snapshot and mark it stale instead of raising, and with
+        background refresh enabled the check runs off the request path.
+        While a sync is running, requests with a cache present return at once
+        and keep serving the current snapshot.
+        """
+        if not self._refresh_lock.acquire(blocking=not self._has_snapshot()):
+            logger.debug("Skipped refresh check, a sync is already running")
+            return
+        try:
             now = time.time()
+            has_cache = self._has_snapshot()
+            invalidated = self._consume_invalidate_signal()
+            if has_cache and not invalidated and not self._scheduler.is_due(now):
+                logger.debug("Skipped refresh check, next check is not due yet")
+                return
+            if has_cache and self._rate_limit_budget.blocked_for(now) > 0:
+                logger.debug("Skipped refresh check due to GitHub rate limit")
+                return
+            if not has_cache:
+                logger.info("Running initial repository sync")
+                self._run_refresh(force=True)
+                return
+            if not self._background_refresh:
+                logger.info("Running conditional repository refresh")
+                self._refresh_keeping_last_good()
+                return
             if (
-                now - self._last_refresh_check_at < self._refresh_interval_seconds
-                and self._local_repo_data_dir.exists()
+                self._background_thread is not None
+                and self._background_thread.is_alive()
             ):
-                logger.debug("Skipped refresh check due to interval")
                 return
 
-            self._last_refresh_check_at = now
-            logger.info("Running conditional repository refresh")
-            self._refresh(force=not self._local_repo_data_dir.exists())
+            logger.info("Starting background repository refresh")
+            self._background_thread = threading.Thread(
+                target=self._background_refresh_worker,
+                name="policygate-refresh",
+                daemon=True,
+            )
+            self._background_thread.start()
+        finally:
+            self._refresh_lock.release()
 
     def force_refresh(self) -> None:
         """Force synchronization regardless of refresh interval and cached SHA."""
         with self._refresh_lock:
             logger.info("Running forced repository refresh")
-            self._refresh(force=True)
-            self._last_refresh_check_at = time.time()
+            self._run_refresh(force=True)
 
-    def read_text(self, relative_path: str) -> str:
-        """Read text file from synchronized local repository cache."""
-        logger.debug("Reading text file", extra={"relative_path": relative_path})
-        target = self._resolve_relative_path(relative_path)
-        return target.read_text(encoding="utf-8")
+    def notify_push(
+        self,
+        repository: str,
+        sha: str,
+        before: str | None = None,
+    ) -> bool:
+        """Schedule a sync of a commit pushed to this repository.
 
-    def read_many_texts(self, relative_paths: list[str]) -> dict[str, str]:
-        """Read multiple files from local repository cache."""
-        logger.debug(
-            "Reading multiple files", extra={"file_count": len(relative_paths)}
+        A push whose ``before`` SHA is the synced commit downloads the pushed
+        archive directly, without the API calls of a conditional check.
+        GitHub does not order deliveries, so any other push resolves the
+        branch head through the API instead, and a late delivery of an older
+        push cannot sync backwards. Syncs run on a worker thread one at a
+        time, and pushes arriving meanwhile are chained into one sync.
+        Returns whether the push belongs to this repository.
+        """
+        if repository.casefold() != f"{self._owner}/{self._repo}".casefold():
+            logger.warning(
+                "Ignored push notification for another repository",
+                extra={"repository": repository},
+            )
+            return False
+
+        with self._push_lock:
+            self._pending_push = _chain_push(self._pending_push, before, sha)
+            if self._push_thread is None:
+                self._push_thread = threading.Thread(
+                    target=self._push_sync_worker,
+                    name="policygate-push-sync",
+                    daemon=True,
+                )
+                self._push_thread.start()
+        return True
+
+    def sync_status(self) -> SyncStatus:
+        """Return SHA, sync time and staleness of the local snapshot."""
+        payload = self._read_metadata()
+        synced_at = payload.get("synced_at")
+        return SyncStatus(
+            sha=self.current_revision(),
+            synced_at=synced_at if isinstance(synced_at, int) else None,
+            stale=self._stale,
+            last_error=self._last_sync_error,
+        )
+
+    def current_revision(self) -> str | None:
+        """Return commit SHA of the synchronized local snapshot."""
+        if self._cached_sha is None:
+            self._cached_sha = self._read_cached_sha()
+        return self._cached_sha
+
+    def file_manifest(self) -> dict[str, FileEntry]:
+        """Return size and SHA-256 of every policy file in the local snapshot."""
+        manifest = self._manifest
+        if manifest is not None:
+            return manifest
+
+        payload = self._read_metadata()
+        files = payload.get("files")
+        if isinstance(files, dict):
+            manifest = self._parse_manifest(files)
+        else:
+            logger.info("Sync metadata has no file manifest, building from cache")
+            manifest = self._build_manifest(self._local_repo_data_dir)
+            if payload:
+                payload["files"] = self._serialize_manifest(manifest)
+                self._write_metadata(payload)
+
+        self._manifest = manifest
+        return manifest
+
+    def manifest_at(self, revision: str) -> dict[str, FileEntry] | None:
+        """Return the file manifest of the current or a recently synced commit.
+
+        Manifests of the last synced commits are kept next to the cache, so
+        they survive snapshot swaps and restarts.
+        """
+        if revision == self.current_revision():
+            return self.file_manifest()
+        if not _REVISION_PATTERN.fullmatch(revision):
+            return None
+        try:
+            files = json.loads(
+                (self._sibling_dir("manifests") / f"{revision}.json").read_text(
+                    encoding="utf-8"
+                )
+            )
+            return self._parse_manifest(files)
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            return None
+
+    def read_router_cache(self) -> str | None:
+        """Return the validated router in JSON form written at sync time.
+
+        Caches synced before the router cache existed get it built once from
+        router.yaml.
+        """
+        try:
+            return self._router_cache_file.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return None
+
+        router_entry = self.file_manifest().get(ROUTER_PATH)
+        if router_entry is None:
+            return None
+        try:
+            router = parse_router(self.read_text(ROUTER_PATH))
+        except (RouterValidationError, RepositorySyncError, OSError):
+            return None
+
+        logger.info("Writing router cache for existing snapshot")
+        raw = dump_router_cache(router, router_sha256=router_entry.sha256)
+        try:
+            self._router_cache_file.write_text(raw, encoding="utf-8")
+        except OSError as error:
+            logger.warning("Unable to write router cache", extra={"error": str(error)})
+        return raw
+
+    def verify_cache(self, full: bool = True, repair: bool = True) -> CacheVerification:
+        """Check cached files against the sync manifest and repair damaged ones.
+
+        Without ``full`` only presence and sizes are compared, from stat calls
+        and gzip trailers of cold blobs. Damaged files are downloaded one by
+        one for the synced commit instead of the whole archive.
+        """
+        with self._refresh_lock:
+            sha = self.current_revision()
+            if sha is None or not self._has_snapshot():
+                raise RepositorySyncError("no local snapshot to verify")
+
+            manifest = self.file_manifest()
+            paths = list(manifest)
+            with tracer.span("github.verify_cache", full=full) as span:
+                intact = self._map_io(
+                    lambda path: self._file_is_intact(path, manifest[path], full),
+                    paths,
+                )
+                corrupted = [
+                    path for path, ok in zip(paths, intact, strict=True) if not ok
+                ]
+                span.set_attribute("corrupted_files", len(corrupted))
+                repaired = (
+                    self._repair_files(sha, corrupted, manifest)
+                    if repair and corrupted
+                    else []
+                )
+
+        if corrupted:
+            logger.warning(
+                "Local repository cache is damaged",
+                extra={"corrupted_files": corrupted, "repaired_files": repaired},
+            )
+        return CacheVerification(
+            sha=sha,
+            checked_files=len(paths),
+            full=full,
+            corrupted_files=corrupted,
+            repaired_files=repaired,
+        )
+
+    def lazy_files(self) -> frozenset[str]:
+        """Return files left out by a sparse sync that no read fetched yet."""
+        lazy_files = self._get_lazy_files()
+        if not lazy_files:
+            return lazy_files
+        with self._lazy_lock:
+            return lazy_files.difference(self._fetched_files)
+
+    def _ensure_local(self, relative_paths: list[str]) -> None:
+        """Download files left out by a sparse sync on first access.
+
+        Fetched files are checked against the manifest and stored in the live
+        snapshot, unless a sync swapped in another snapshot meanwhile.
+        """
+        lazy_files = self._get_lazy_files()
+        if not lazy_files:
+            return
+        missing = sorted(
+            {
+                path
+                for path in map(normalize_path, relative_paths)
+                if path in lazy_files
+                and not (self._local_repo_data_dir / path).is_file()
+            }
         )
-        content_by_path: dict[str, str] = {}
-        for relative_path in relative_paths:
-            target = self._resolve_relative_path(relative_path)
-            content_by_path[relative_path] = target.read_text(encoding="utf-8")
-        return content_by_path
+        if not missing:
+            return
+
+        sha = self.current_revision()
+        if sha is None:
+            return
+        manifest = self.file_manifest()
+        logger.info("Fetching files left out by sparse sync", extra={"paths": missing})
+        with (
+            tracer.span("github.fetch_lazy_files", file_count=len(missing)),
+            self._http_client(timeout=30.0) as client,
+        ):
+
+            def _fetch(relative_path: str) -> bytes:
+                try:
+                    return self._download_verified(
+                        client, sha, relative_path, manifest[relative_path]
+                    )
+                except httpx.HTTPError as error:
+                    raise RepositorySyncError(
+                        f"unable to fetch {relative_path}: {error}"
+                    ) from error
+
+            contents = self._map_io(_fetch, missing)
+
+        with self._lazy_lock:
+            if self.current_revision() != sha:
+                return
+            for relative_path, data in zip(missing, contents, strict=True):
+                target = self._local_repo_data_dir / relative_path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                write_file_atomically(target, data)
+                self._fetched_files.add(relative_path)
+
+    def _resolve_relative_path(self, relative_path: str) -> Path:
+        try:
+            return super()._resolve_relative_path(relative_path)
+        except RepositorySyncError:
+            if relative_path not in self._get_cold_files():
+                raise
+        blob = cold_blob_path(self._local_repo_data_dir, relative_path)
+        if not blob.is_file():
+            raise RepositorySyncError(f"file not found: {relative_path}")
+        return blob
 
-    def copy_many_files(
+    def _read_file_text(self, source: Path) -> str:
+        relative_path = cold_blob_relative_path(self._local_repo_data_dir, source)
+        if relative_path is None:
+            return super()._read_file_text(source)
+        data = read_cold_blob(source)
+        self._record_cold_read(relative_path, data)
+        return data.decode("utf-8")
+
+    def _copy_file(self, source: Path, target: Path) -> None:
+        if cold_blob_relative_path(self._local_repo_data_dir, source) is None:
+            super()._copy_file(source, target)
+            return
+        target.write_bytes(read_cold_blob(source))
+
+    def _get_cold_files(self) -> frozenset[str]:
+        cold_files = self._cold_files
+        if cold_files is None:
+            listed = self._read_metadata().get("cold_files")
+            cold_files = frozenset(listed) if isinstance(listed, list) else frozenset()
+            self._cold_files = cold_files
+        return cold_files
+
+    def _get_lazy_files(self) -> frozenset[str]:
+        lazy_files = self._lazy_files
+        if lazy_files is None:
+            listed = self._read_metadata().get("lazy_files")
+            lazy_files = frozenset(listed) if isinstance(listed, list) else frozenset()
+            self._lazy_files = lazy_files
+        return lazy_files
+
+    def _record_cold_read(self, relative_path: str, data: bytes) -> None:
+        """Promote a cold file to a plain file once it is read often enough."""
+        with self._cold_lock:
+            self._cold_reads[relative_path] += 1
+            if self._cold_reads[relative_path] < self._cold_blob_promote_reads:
+                return
+        # A running sync may swap snapshots; promotion waits for a later read.
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            entry = self.file_manifest().get(relative_path)
+            if entry is None or hashlib.sha256(data).hexdigest() != entry.sha256:
+                return
+            write_file_atomically(self._local_repo_data_dir / relative_path, data)
+            self._promoted_files.add(relative_path)
+            logger.info("Promoted cold rule file", extra={"path": relative_path})
+        except OSError as error:
+            logger.warning(
+                "Unable to promote cold rule file",
+                extra={"path": relative_path, "error": str(error)},
+            )
+        finally:
+            self._refresh_lock.release()
+
+    def _select_lazy_files(
         self,
+        manifest: dict[str, FileEntry],
+        router: CompactRouter,
+    ) -> list[str]:
+        """Return files a sparse sync leaves out of the staged snapshot.
+
+        Files fetched on demand earlier stay materialized in later snapshots.
+        """
+        if not self._sparse_sync:
+            return []
+        if self._sparse_tasks is not None:
+            unknown = sorted(self._sparse_tasks.difference(router.tasks))
+            if unknown:
+                logger.warning(
+                    "Sparse sync task allowlist names unknown tasks",
+                    extra={"tasks": unknown},
+                )
+        needed = referenced_paths(router, tasks=self._sparse_tasks)
+        return sorted(
+            path
+            for path in manifest
+            if path != ROUTER_PATH
+            and path not in needed
+            and path not in self._fetched_files
+        )
+
+    def _select_cold_files(
+        self,
+        manifest: dict[str, FileEntry],
+        lazy_files: Collection[str] = (),
+    ) -> list[str]:
+        if self._cold_blob_min_bytes == 0:
+            return []
+        skipped = {*self._promoted_files, *lazy_files}
+        return sorted(
+            path
+            for path, entry in manifest.items()
+            if path.startswith(_COLD_BLOB_PREFIX)
+            and entry.size >= self._cold_blob_min_bytes
+            and path not in skipped
+        )
+
+    def _file_is_intact(self, relative_path: str, entry: FileEntry, full: bool) -> bool:
+        plain = self._local_repo_data_dir / relative_path
+        try:
+            if plain.is_file():
+                if plain.stat().st_size != entry.size:
+                    return False
+                return not full or hash_file(plain).sha256 == entry.sha256
+            if relative_path in self._get_lazy_files():
+                return True
+            if relative_path not in self._get_cold_files():
+                return False
+            blob = cold_blob_path(self._local_repo_data_dir, relative_path)
+            if not cold_blob_matches_size(blob, entry.size):
+                return False
+            if not full:
+                return True
+            return hashlib.sha256(read_cold_blob(blob)).hexdigest() == entry.sha256
+        except OSError:
+            return False
+
+    def _repair_files(
+        self,
+        sha: str,
         relative_paths: list[str],
-        destination_directory: str,
+        manifest: dict[str, FileEntry],
     ) -> list[str]:
-        """Copy files from local cache to destination directory."""
-        logger.info(
-            "Copying files from cache",
-            extra={
-                "file_count": len(relative_paths),
-                "destination_directory": destination_directory,
-            },
+        repaired: list[str] = []
+        with self._http_client(timeout=30.0) as client:
+            for relative_path in relative_paths:
+                try:
+                    data = self._download_verified(
+                        client, sha, relative_path, manifest[relative_path]
+                    )
+                    self._store_repaired_file(relative_path, data)
+                except (PolicyGateError, httpx.HTTPError, OSError) as error:
+                    logger.warning(
+                        "Unable to repair cached file",
+                        extra={"path": relative_path, "error": str(error)},
+                    )
+                    continue
+                repaired.append(relative_path)
+        return repaired
+
+    def _download_verified(
+        self,
+        client: httpx.Client,
+        sha: str,
+        relative_path: str,
+        entry: FileEntry,
+    ) -> bytes:
+        data = self._download_file(client, sha, relative_path)
+        if len(data) != entry.size or hashlib.sha256(data).hexdigest() != entry.sha256:
+            raise RepositorySyncError(
+                f"downloaded content of {relative_path} does not match manifest"
+            )
+        return data
+
+    def _download_file(
+        self,
+        client: httpx.Client,
+        sha: str,
+        relative_path: str,
+    ) -> bytes:
+        url = (
+            f"{self._api_base_url}/repos/{self._owner}/{self._repo}"
+            f"/contents/{quote(relative_path)}"
+        )
+
+        def _request() -> bytes:
+            with tracer.span("github.download_file", path=relative_path) as span:
+                response = client.get(
+                    url,
+                    params={"ref": sha},
+                    headers={"Accept": "application/vnd.github.raw+json"},
+                )
+                span.set_attribute("status_code", response.status_code)
+                response.raise_for_status()
+                return response.content
+
+        return call_with_retries(
+            _request,
+            description="GitHub file download",
+            max_retries=self._max_sync_retries,
+            backoff_seconds=self._sync_retry_backoff_seconds,
+        )
+
+    def _store_repaired_file(self, relative_path: str, data: bytes) -> None:
+        plain = self._local_repo_data_dir / relative_path
+        if relative_path in self._get_cold_files() and not plain.is_file():
+            write_cold_blob(
+                data, cold_blob_path(self._local_repo_data_dir, relative_path)
+            )
+            return
+        plain.parent.mkdir(parents=True, exist_ok=True)
+        write_file_atomically(plain, data)
+
+    def _background_refresh_worker(self) -> None:
+        with self._refresh_lock:
+            self._refresh_keeping_last_good()
+
+    def _push_sync_worker(self) -> None:
+        while True:
+            with self._push_lock:
+                pending = self._pending_push
+                self._pending_push = None
+                if pending is None:
+                    self._push_thread = None
+                    return
+            before, sha = pending
+            with self._refresh_lock:
+                cached_sha = self._read_cached_sha()
+                if sha is not None and sha == cached_sha:
+                    logger.debug("Pushed commit is already synced", extra={"sha": sha})
+                    continue
+                if sha is not None and cached_sha is not None and before == cached_sha:
+                    logger.info("Syncing pushed commit", extra={"sha": sha})
+                    self._refresh_keeping_last_good(target_sha=sha)
+                    continue
+                logger.info(
+                    "Push does not follow the synced commit, resolving branch head",
+                    extra={"sha": sha, "before": before},
+                )
+                self._refresh_keeping_last_good()
+
+    def _consume_invalidate_signal(self) -> bool:
+        mtime_ns = self._invalidate_signal_mtime()
+        if mtime_ns is None or mtime_ns == self._invalidate_mtime_ns:
+            return False
+        self._invalidate_mtime_ns = mtime_ns
+        logger.info("Invalidate signal received, checking for repository changes")
+        return True
+
+    def _invalidate_signal_mtime(self) -> int | None:
+        if self._invalidate_file is None:
+            return None
+        try:
+            return self._invalidate_file.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _refresh_keeping_last_good(self, target_sha: str | None = None) -> None:
+        try:
+            self._run_refresh(force=False, target_sha=target_sha)
+        except (PolicyGateError, httpx.HTTPError, OSError, tarfile.TarError) as error:
+            self._stale = True
+            self._last_sync_error = str(error)
+            logger.warning(
+                "Repository refresh failed, serving last known good snapshot",
+                extra={"sha": self.current_revision(), "error": str(error)},
+            )
+
+    def _run_refresh(self, force: bool, target_sha: str | None = None) -> None:
+        now = time.time()
+        blocked_for = self._rate_limit_budget.blocked_for(now)
+        if blocked_for > 0:
+            self._scheduler.record_throttled(now, retry_at=now + blocked_for)
+            raise RepositorySyncError(
+                f"GitHub API rate limit exceeded, retry in {math.ceil(blocked_for)}s"
+            )
+
+        try:
+            with tracer.span("github.refresh", force=force) as span:
+                changed = self._refresh(force=force, target_sha=target_sha)
+                span.set_attribute("changed", changed)
+        except Exception:
+            now = time.time()
+            blocked_for = self._rate_limit_budget.blocked_for(now)
+            if blocked_for > 0:
+                self._scheduler.record_throttled(now, retry_at=now + blocked_for)
+            else:
+                self._scheduler.record_error(now)
+            raise
+
+        self._stale = False
+        self._last_sync_error = None
+        if changed:
+            self._notify_synced(self.current_revision())
+        # Pushed commits keep polling relaxed; it only backs up webhooks then.
+        if changed and target_sha is None:
+            self._scheduler.record_changed(time.time())
+        else:
+            self._scheduler.record_unchanged(time.time())
+        logger.debug(
+            "Scheduled next refresh check",
+            extra={"next_check_at": int(self._scheduler.next_check_at)},
         )
-        destination = Path(destination_directory).resolve()
-        destination.mkdir(parents=True, exist_ok=True)
-
-        copied: list[str] = []
-        for relative_path in relative_paths:
-            source = self._resolve_relative_path(relative_path)
-            target = destination / Path(relative_path).name
-            shutil.copy2(source, target)
-            copied.append(str(target))
-        return copied
-
-    def _refresh(self, force: bool = False) -> None:
-        default_branch, latest_sha, tarball_url = self._get_repository_state()
+
+    def _refresh(self, force: bool = False, target_sha: str | None = None) -> bool:
         cached_sha = self._read_cached_sha()
+        if target_sha is None:
+            default_branch, latest_sha, tarball_url = self._get_repository_state()
+        else:
+            default_branch = self._read_metadata().get("default_branch")
+            latest_sha = target_sha
+            tarball_url = (
+                f"{self._api_base_url}/repos/{self._owner}/{self._repo}"
+                f"/tarball/{target_sha}"
+            )
 
         if not force and cached_sha == latest_sha:
             logger.debug("Repository cache is up to date", extra={"sha": latest_sha})
-            return
+            return False
 
         logger.info(
             "Refreshing local repository cache",
             extra={"default_branch": default_branch, "sha": latest_sha},
         )
-        self._download_and_extract(tarball_url=tarball_url)
-        self._write_metadata(
-            {
+        self._download_and_extract(
+            tarball_url=tarball_url,
+            metadata={
                 "repository": f"{self._owner}/{self._repo}",
                 "default_branch": default_branch,
                 "sha": latest_sha,
                 "synced_at": int(time.time()),
-            }
+            },
         )
+        return cached_sha != latest_sha
 
     def _get_repository_state(self) -> tuple[str, str, str]:
-        headers = self._build_headers()
         logger.debug("Fetching repository state from GitHub")
 
-        with httpx.Client(timeout=30.0, headers=headers) as client:
-            repository_response = client.get(
-                f"https://api.github.com/repos/{self._owner}/{self._repo}"
+        with self._http_client(timeout=30.0) as client:
+            repository_payload = self._get_json(
+                client, f"{self._api_base_url}/repos/{self._owner}/{self._repo}"
             )
-            repository_response.raise_for_status()
-            repository_payload = repository_response.json()
 
-            default_branch = repository_payload["default_branch"]
+            default_branch = _payload_text(repository_payload, "default_branch")
             tarball_url = self._resolve_tarball_url(
                 repository_payload=repository_payload,
                 default_branch=default_branch,
             )
 
-            commit_response = client.get(
-                f"https://api.github.com/repos/{self._owner}/{self._repo}/commits/{default_branch}"
+            commit_payload = self._get_json(
+                client,
+                f"{self._api_base_url}/repos/{self._owner}/{self._repo}/commits/{default_branch}",
             )
-            commit_response.raise_for_status()
-            latest_sha = commit_response.json()["sha"]
+            latest_sha = _payload_text(commit_payload, "sha")
 
         return default_branch, latest_sha, tarball_url
 
+    def _get_json(self, client: httpx.Client, url: str) -> dict[str, Any]:
+        def _request() -> dict[str, Any]:
+            with tracer.span("github.api_request", url=url) as span:
+                response = client.get(url)
+                span.set_attribute("status_code", response.status_code)
+                response.raise_for_status()
+                try:
+                    payload = response.json()
+                except ValueError as error:
+                    raise RepositorySyncError(
+                        f"GitHub API returned invalid JSON for {url}"
+                    ) from error
+                if not isinstance(payload, dict):
+                    raise RepositorySyncError(
+                        f"GitHub API returned an unexpected payload for {url}"
+                    )
+                return payload
+
+        return call_with_retries(
+            _request,
+            description="GitHub API request",
+            max_retries=self._max_sync_retries,
+            backoff_seconds=self._sync_retry_backoff_seconds,
+        )
+
     def _resolve_tarball_url(
         self,
         repository_payload: dict,
@@ -181,32 +827,152 @@ class GitHubRepositoryGateway:
                 return url.replace("{/ref}", f"/{default_branch}")
             return url.rstrip("/") + f"/{default_branch}"
 
-        return f"https://api.github.com/repos/{self._owner}/{self._repo}/tarball/{default_branch}"
+        return f"{self._api_base_url}/repos/{self._owner}/{self._repo}/tarball/{default_branch}"
 
-    def _download_and_extract(self, tarball_url: str) -> None:
+    def _download_and_extract(
+        self,
+        tarball_url: str,
+        metadata: dict[str, Any],
+    ) -> None:
         logger.info("Downloading repository archive")
-        headers = self._build_headers()
-        with httpx.Client(
-            timeout=60.0, headers=headers, follow_redirects=True
-        ) as client:
-            archive_response = client.get(tarball_url)
-            archive_response.raise_for_status()
-            archive_bytes = archive_response.content
-
         with tempfile.TemporaryDirectory(prefix="policygate-sync-") as temp_dir:
             temp_path = Path(temp_dir)
-            with tarfile.open(fileobj=BytesIO(archive_bytes), mode="r:gz") as archive:
-                archive.extractall(path=temp_path)
+            archive_path = temp_path / "archive.tar.gz"
+            with (
+                tracer.span("github.download_archive"),
+                self._http_client(timeout=60.0, follow_redirects=True) as client,
+            ):
+                archive_sha256 = download_archive(
+                    client=client,
+                    url=tarball_url,
+                    target=archive_path,
+                    max_retries=self._max_sync_retries,
+                    backoff_seconds=self._sync_retry_backoff_seconds,
+                )
 
-            extracted_roots = [child for child in temp_path.iterdir() if child.is_dir()]
-            if not extracted_roots:
-                raise RepositorySyncError("unable to extract repository archive")
+            with tracer.span("github.extract_archive") as span:
+                extracted = extract_policy_files(
+                    archive_path,
+                    target=temp_path / "extracted",
+                    limits=self._archive_limits,
+                )
+                span.set_attribute("extracted_files", extracted.extracted_files)
+                span.set_attribute("skipped_members", extracted.skipped_members)
+            logger.debug(
+                "Policy files extracted from archive",
+                extra={
+                    "extracted_files": extracted.extracted_files,
+                    "extracted_bytes": extracted.extracted_bytes,
+                    "skipped_members": extracted.skipped_members,
+                },
+            )
 
-            source_root = extracted_roots[0]
-            self._copy_repository_entries(source_root)
+            source_root = extracted.root
+            with tracer.span("github.compile_snapshot"):
+                manifest, compiled = self._compile_snapshot(source_root)
+            router = compiled.router
+            previous_sha = self.current_revision()
+            if previous_sha is not None and self._has_snapshot():
+                self._remember_manifest(previous_sha, self.file_manifest())
+            metadata["archive_sha256"] = archive_sha256
+            metadata["files"] = self._serialize_manifest(manifest)
+            metadata["lazy_files"] = self._select_lazy_files(manifest, router)
+            metadata["cold_files"] = self._select_cold_files(
+                manifest, lazy_files=metadata["lazy_files"]
+            )
+            with tracer.span("github.install_snapshot"):
+                self._copy_repository_entries(
+                    source_root,
+                    metadata=metadata,
+                    router_cache=dump_router_cache(
+                        router,
+                        router_sha256=manifest[ROUTER_PATH].sha256,
+                        rule_includes=compiled.rule_includes,
+                    ),
+                )
+            self._manifest = manifest
+            self._remember_manifest(metadata["sha"], manifest)
             logger.info("Repository archive extracted and copied")
 
-    def _copy_repository_entries(self, source_root: Path) -> None:
+    def _compile_snapshot(
+        self,
+        source_root: Path,
+    ) -> tuple[dict[str, FileEntry], CompiledRouter]:
+        """Validate router references against extracted files before going live."""
+        router_path = source_root / ROUTER_PATH
+        if not router_path.is_file():
+            raise RepositorySyncError(
+                f"repository is missing required entry: {ROUTER_PATH}"
+            )
+
+        manifest = self._build_manifest(source_root)
+        router = parse_router(router_path.read_text(encoding="utf-8"))
+        compiled = compile_router(router, manifest=manifest)
+        logger.info(
+            "Compiled router snapshot",
+            extra={
+                "rule_count": len(compiled.rules),
+                "script_count": len(compiled.scripts),
+                "file_count": len(manifest),
+            },
+        )
+        return manifest, compiled
+
+    def _serialize_manifest(
+        self,
+        manifest: dict[str, FileEntry],
+    ) -> dict[str, dict[str, Any]]:
+        return {
+            path: {"size": entry.size, "sha256": entry.sha256}
+            for path, entry in manifest.items()
+        }
+
+    def _parse_manifest(self, files: dict[str, Any]) -> dict[str, FileEntry]:
+        return {
+            path: FileEntry(size=entry["size"], sha256=entry["sha256"])
+            for path, entry in files.items()
+        }
+
+    def _remember_manifest(self, sha: str, manifest: dict[str, FileEntry]) -> None:
+        """Keep manifests of recent commits for snapshot comparisons."""
+        if not _REVISION_PATTERN.fullmatch(sha):
+            return
+        history_dir = self._sibling_dir("manifests")
+        target = history_dir / f"{sha}.json"
+        try:
+            history_dir.mkdir(parents=True, exist_ok=True)
+            if target.exists():
+                target.touch()
+            else:
+                write_file_atomically(
+                    target,
+                    json.dumps(self._serialize_manifest(manifest)).encode("utf-8"),
+                )
+            kept = sorted(
+                history_dir.glob("*.json"),
+                key=lambda path: path.stat().st_mtime_ns,
+                reverse=True,
+            )
+            for outdated in kept[_MANIFEST_HISTORY_LIMIT:]:
+                outdated.unlink(missing_ok=True)
+        except OSError as error:
+            logger.warning(
+                "Unable to store manifest history", extra={"error": str(error)}
+            )
+
+    def _copy_repository_entries(
+        self,
+        source_root: Path,
+        metadata: dict[str, Any] | None = None,
+        router_cache: str | None = None,
+    ) -> None:
+        """Stage a complete snapshot next to the cache, then swap it in.
+
+        The live cache is never modified in place, so an interrupted sync
+        leaves the previous snapshot intact. Metadata and the router cache are
+        written into the staged snapshot so they always switch with content.
+        Files listed as ``lazy_files`` in the metadata are not staged.
+        """
         required_entries = ["router.yaml", "rules"]
         optional_entries = ["scripts"]
 
@@ -214,64 +980,136 @@ class GitHubRepositoryGateway:
             "Copying repository entries", extra={"source_root": str(source_root)}
         )
 
-        self._local_repo_data_dir.mkdir(parents=True, exist_ok=True)
-        for child in list(self._local_repo_data_dir.iterdir()):
-            if child.name == self._metadata_file.name:
-                continue
-            if child.is_dir():
-                shutil.rmtree(child)
-            else:
-                child.unlink()
-
         for entry in required_entries:
-            source_path = source_root / entry
-            if not source_path.exists():
+            if not (source_root / entry).exists():
                 raise RepositorySyncError(
                     f"repository is missing required entry: {entry}"
                 )
-            self._copy_entry(source_path=source_path, target_name=entry)
 
-        for entry in optional_entries:
-            source_path = source_root / entry
-            if not source_path.exists():
-                continue
-            self._copy_entry(source_path=source_path, target_name=entry)
+        staging_dir = self._sibling_dir("staging")
+        if staging_dir.exists():
+            shutil.rmtree(staging_dir)
+        staging_dir.mkdir(parents=True)
+
+        lazy_files = set((metadata or {}).get("lazy_files") or [])
+        if lazy_files:
+            staged_files = [
+                path for path in (metadata or {})["files"] if path not in lazy_files
+            ]
+            self._map_io(
+                lambda relative_path: self._stage_file(
+                    source_root, staging_dir, relative_path
+                ),
+                staged_files,
+            )
+        else:
+            for entry in [*required_entries, *optional_entries]:
+                source_path = source_root / entry
+                if not source_path.exists():
+                    continue
+                self._copy_entry(
+                    source_path=source_path, target_path=staging_dir / entry
+                )
 
-    def _copy_entry(self, source_path: Path, target_name: str) -> None:
-        target_path = self._local_repo_data_dir / target_name
+        staged_metadata = staging_dir / self._metadata_file.name
+        if metadata is not None:
+            self._write_metadata(metadata, target=staged_metadata)
+        elif self._metadata_file.exists():
+            shutil.copy2(self._metadata_file, staged_metadata)
+        if router_cache is not None:
+            (staging_dir / self._router_cache_file.name).write_text(
+                router_cache, encoding="utf-8"
+            )
+        cold_files = (metadata or {}).get("cold_files") or []
+        self._map_io(
+            lambda relative_path: self._compress_cold_file(staging_dir, relative_path),
+            cold_files,
+        )
+
+        self._swap_in(staging_dir)
+
+    def _stage_file(
+        self,
+        source_root: Path,
+        staging_dir: Path,
+        relative_path: str,
+    ) -> None:
+        target = staging_dir / relative_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source_root / relative_path, target)
+
+    def _compress_cold_file(self, snapshot_root: Path, relative_path: str) -> None:
+        plain = snapshot_root / relative_path
+        write_cold_blob(
+            plain.read_bytes(), cold_blob_path(snapshot_root, relative_path)
+        )
+        plain.unlink()
+
+    def _swap_in(self, staging_dir: Path) -> None:
+        backup_dir = self._sibling_dir("previous")
+        if backup_dir.exists():
+            shutil.rmtree(backup_dir)
+        # Readers wait for both renames instead of finding no snapshot between.
+        with self._snapshot_lock.swapping(), self._lazy_lock:
+            if self._local_repo_data_dir.exists():
+                self._local_repo_data_dir.rename(backup_dir)
+            staging_dir.rename(self._local_repo_data_dir)
+            self._cached_sha = None
+            self._manifest = None
+            self._cold_files = None
+            self._lazy_files = None
+        with self._cold_lock:
+            self._cold_reads.clear()
+        if backup_dir.exists():
+            shutil.rmtree(backup_dir, ignore_errors=True)
+
+    def _recover_interrupted_swap(self) -> None:
+        backup_dir = self._sibling_dir("previous")
+        if not self._local_repo_data_dir.exists() and backup_dir.exists():
+            logger.warning("Restoring repository cache after interrupted sync")
+            backup_dir.rename(self._local_repo_data_dir)
+
+    def _sibling_dir(self, suffix: str) -> Path:
+        return self._local_repo_data_dir.with_name(
+            f".{self._local_repo_data_dir.name}.{suffix}"
+        )
+
+    def _has_snapshot(self) -> bool:
+        return self._local_repo_data_dir.exists()
+
+    def _copy_entry(self, source_path: Path, target_path: Path) -> None:
         if source_path.is_dir():
             shutil.copytree(source_path, target_path, dirs_exist_ok=True)
         else:
             shutil.copy2(source_path, target_path)
 
-    def _resolve_relative_path(self, relative_path: str) -> Path:
-        if not relative_path:
-            raise RepositorySyncError("relative path cannot be empty")
-
-        candidate = (self._local_repo_data_dir / relative_path).resolve()
-        base = self._local_repo_data_dir.resolve()
-        if base not in candidate.parents and candidate != base:
-            raise RepositorySyncError("path traversal is not allowed")
-        if not candidate.exists() or not candidate.is_file():
-            raise RepositorySyncError(f"file not found: {relative_path}")
-        return candidate
-
     def _read_cached_sha(self) -> str | None:
+        return self._read_metadata().get("sha")
+
+    def _read_metadata(self) -> dict[str, Any]:
         if not self._metadata_file.exists():
-            return None
+            return {}
         try:
             payload = json.loads(self._metadata_file.read_text(encoding="utf-8"))
-            return payload.get("sha")
         except (json.JSONDecodeError, OSError):
-            return None
+            return {}
+        return payload if isinstance(payload, dict) else {}
 
-    def _write_metadata(self, payload: dict[str, str | int]) -> None:
+    def _write_metadata(
+        self,
+        payload: dict[str, Any],
+        target: Path | None = None,
+    ) -> None:
         logger.debug("Writing sync metadata")
-        self._metadata_file.parent.mkdir(parents=True, exist_ok=True)
-        self._metadata_file.write_text(
+        metadata_file = target or self._metadata_file
+        metadata_file.parent.mkdir(parents=True, exist_ok=True)
+        metadata_file.write_text(
             json.dumps(payload, ensure_ascii=False, indent=2),
             encoding="utf-8",
         )
+        if target is None:
+            sha = payload.get("sha")
+            self._cached_sha = sha if isinstance(sha, str) else None
 
     def _parse_owner_repo(self, repository_url: str) -> tuple[str, str]:
         parsed = urlparse(repository_url)
@@ -286,9 +1124,57 @@ class GitHubRepositoryGateway:
             )
         return segments[0], segments[1]
 
+    def _http_client(
+        self,
+        timeout: float,
+        follow_redirects: bool = False,
+    ) -> httpx.Client:
+        return httpx.Client(
+            timeout=timeout,
+            headers=self._build_headers(),
+            follow_redirects=follow_redirects,
+            transport=self._transport,
+            event_hooks={"response": [self._observe_response]},
+        )
+
+    def _observe_response(self, response: httpx.Response) -> None:
+        self._rate_limit_budget.observe(
+            status_code=response.status_code,
+            headers=response.headers,
+            now=time.time(),
+        )
+
     def _build_headers(self) -> dict[str, str]:
         return {
             "Authorization": f"Bearer {self._access_token}",
             "Accept": "application/vnd.github+json",
             "X-GitHub-Api-Version": "2022-11-28",
         }
+
+
+def _chain_push(
+    pending: tuple[str | None, str | None] | None,
+    before: str | None,
+    after: str,
+) -> tuple[str | None, str | None]:
+    """Combine a push with the pending one into a single ``(before, after)`` step.
+
+    Pushes that do not continue each other leave ``(None, None)``, which
+    makes the sync resolve the branch head.
+    """
+    if pending is None:
+        return before, after
+    pending_before, pending_after = pending
+    if pending_after is not None and before == pending_after:
+        return pending_before, after
+    if pending_before is not None and after == pending_before:
+        return before, pending_after
+    return None, None
+
+
+def _payload_text(payload: dict[str, Any], key: str) -> str:
+    """Return a required string field of a GitHub API payload."""
+    value = payload.get(key)
+    if not isinstance(value, str) or not value:
+        raise RepositorySyncError(f"GitHub API payload has no valid '{key}' field")
+    return value
@@ -0,0 +1,193 @@
+"""Repository gateway serving policy files straight from a local directory."""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from policygate.config.logging import logger
+from policygate.config.tracing import tracer
+from policygate.domains.gateway.compiler import ROUTER_PATH, FileEntry
+from policygate.domains.gateway.exceptions import RepositorySyncError
+from policygate.domains.gateway.models import CacheVerification, SyncStatus
+from policygate.infrastructure.repository.snapshot_files import (
+    SnapshotFileAccess,
+    hash_file,
+    list_policy_files,
+)
+
+_FileStamp = tuple[int, int]
+_MANIFEST_HISTORY_LIMIT = 20
+
+
+class LocalDirectoryRepositoryGateway(SnapshotFileAccess):
+    """Serve router.yaml, rules and scripts from a working tree without copying.
+
+    Changes are detected by polling: every scan stats the policy files and
+    rehashes only files whose size or modification time changed. The revision
+    is derived from the file hashes, so services invalidate their caches only
+    when content changed, and per-file hashes let them keep caches of files
+    that did not.
+    """
+
+    def __init__(
+        self,
+        root_dir: str,
+        poll_interval_seconds: float = 1.0,
+        io_workers: int = 8,
+    ) -> None:
+        root = Path(root_dir).expanduser().resolve()
+        if not root_dir or not (root / ROUTER_PATH).is_file():
+            raise RepositorySyncError(
+                f"local repository directory has no {ROUTER_PATH}: {root}"
+            )
+        super().__init__(snapshot_root=root, io_workers=io_workers)
+
+        self._poll_interval_seconds = max(poll_interval_seconds, 0.0)
+        self._scan_lock = threading.Lock()
+        self._last_scan_at: float | None = None
+        self._stamps: dict[str, _FileStamp] = {}
+        self._manifest: dict[str, FileEntry] = {}
+        self._revision: str | None = None
+        self._history: OrderedDict[str, dict[str, FileEntry]] = OrderedDict()
+        self._changed_at: int | None = None
+        self._last_error: str | None = None
+
+        logger.info(
+            "Initialized local directory repository gateway",
+            extra={
+                "root_dir": str(root),
+                "poll_interval_seconds": self._poll_interval_seconds,
+                "io_workers": self._io_workers,
+            },
+        )
+
+    def refresh_if_needed(self) -> None:
+        """Rescan the directory when the poll interval has elapsed."""
+        with self._scan_lock:
+            now = time.monotonic()
+            if (
+                self._last_scan_at is not None
+                and now - self._last_scan_at < self._poll_interval_seconds
+            ):
+                return
+            with tracer.span("local.scan"):
+                self._scan(rehash_all=False)
+
+    def force_refresh(self) -> None:
+        """Rescan the directory and rehash every policy file."""
+        with self._scan_lock:
+            logger.info("Running forced local directory rescan")
+            self._scan(rehash_all=True)
+
+    def current_revision(self) -> str | None:
+        """Return content digest of the policy files."""
+        self._ensure_scanned()
+        return self._revision
+
+    def file_manifest(self) -> dict[str, FileEntry]:
+        """Return size and SHA-256 of every policy file."""
+        self._ensure_scanned()
+        return self._manifest
+
+    def manifest_at(self, revision: str) -> dict[str, FileEntry] | None:
+        """Return the manifest of a revision seen by this process, if still kept."""
+        self._ensure_scanned()
+        return self._history.get(revision)
+
+    def sync_status(self) -> SyncStatus:
+        """Return revision, last change time and scan errors."""
+        self._ensure_scanned()
+        return SyncStatus(
+            sha=self._revision,
+            synced_at=self._changed_at,
+            stale=self._last_error is not None,
+            last_error=self._last_error,
+        )
+
+    def read_router_cache(self) -> str | None:
+        """Return ``None``; router.yaml is parsed directly from the checkout."""
+        return None
+
+    def verify_cache(self, full: bool = True, repair: bool = True) -> CacheVerification:
+        """Rescan the directory; the working tree itself is the source of truth.
+
+        A full check rehashes every file, so the manifest matches the content
+        on disk afterwards. There is no separate copy that could be damaged.
+        """
+        with self._scan_lock:
+            self._scan(rehash_all=full)
+        return CacheVerification(
+            sha=self._revision,
+            checked_files=len(self._manifest),
+            full=full,
+        )
+
+    def _ensure_scanned(self) -> None:
+        if self._last_scan_at is None:
+            with self._scan_lock:
+                if self._last_scan_at is None:
+                    self._scan(rehash_all=False)
+
+    def _scan(self, rehash_all: bool) -> None:
+        self._last_scan_at = time.monotonic()
+        try:
+            stamps: dict[str, _FileStamp] = {}
+            paths_by_key: dict[str, Path] = {}
+            for path in list_policy_files(self._snapshot_root):
+                stat = path.stat()
+                key = path.relative_to(self._snapshot_root).as_posix()
+                stamps[key] = (stat.st_mtime_ns, stat.st_size)
+                paths_by_key[key] = path
+            if ROUTER_PATH not in stamps:
+                raise RepositorySyncError(f"{ROUTER_PATH} was removed")
+
+            dirty = [
+                key
+                for key, stamp in stamps.items()
+                if rehash_all or self._stamps.get(key) != stamp
+            ]
+            entries = self._map_io(hash_file, [paths_by_key[key] for key in dirty])
+        except (OSError, RepositorySyncError) as error:
+            self._last_error = str(error)
+            logger.warning(
+                "Local directory scan failed, serving last known files",
+                extra={"error": str(error)},
+            )
+            return
+
+        rehashed = dict(zip(dirty, entries, strict=True))
+        manifest = {
+            key: rehashed[key] if key in rehashed else self._manifest[key]
+            for key in sorted(stamps)
+        }
+        self._stamps = stamps
+        self._last_error = None
+
+        changed = [key for key in rehashed if self._manifest.get(key) != rehashed[key]]
+        changed.extend(key for key in self._manifest if key not in manifest)
+        if not changed and self._revision is not None:
+            return
+
+        self._manifest = manifest
+        self._revision = _manifest_revision(manifest)
+        self._changed_at = int(time.time())
+        self._history[self._revision] = manifest
+        self._history.move_to_end(self._revision)
+        while len(self._history) > _MANIFEST_HISTORY_LIMIT:
+            self._history.popitem(last=False)
+        logger.info(
+            "Local policy files changed",
+            extra={"revision": self._revision, "changed_files": len(changed)},
+        )
+        self._notify_synced(self._revision)
+
+
+def _manifest_revision(manifest: dict[str, FileEntry]) -> str:
+    digest = hashlib.blake2b(digest_size=10)
+    for path, entry in manifest.items():
+        digest.update(f"{path}\x00{entry.sha256}\x00".encode())
+    return f"local-{digest.hexdigest()}"
@@ -0,0 +1,146 @@
+"""Adaptive refresh scheduling and shared GitHub rate-limit budget."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Mapping
+
+from policygate.config.logging import logger
+
+_THROTTLE_STATUS_CODES = frozenset({403, 429})
+
+
+class RateLimitBudget:
+    """Process-wide view of the GitHub API rate limit.
+
+    The budget is updated from ``X-RateLimit-Remaining``/``X-RateLimit-Reset``
+    and ``Retry-After`` headers of every API response, and blocks further
+    requests until GitHub allows them again. All gateways in a process share
+    one instance by default, because they usually share one token.
+    """
+
+    def __init__(self, reserve: int = 5) -> None:
+        self._reserve = max(reserve, 0)
+        self._lock = threading.Lock()
+        self._remaining: int | None = None
+        self._reset_at = 0.0
+        self._blocked_until = 0.0
+
+    @property
+    def remaining(self) -> int | None:
+        return self._remaining
+
+    def blocked_for(self, now: float) -> float:
+        """Return seconds until requests are allowed again, or ``0.0``."""
+        with self._lock:
+            return max(self._blocked_until - now, 0.0)
+
+    def observe(
+        self,
+        status_code: int,
+        headers: Mapping[str, str],
+        now: float,
+    ) -> bool:
+        """Update budget from a response and return whether it was throttled."""
+        remaining = _parse_number(headers.get("x-ratelimit-remaining"))
+        reset_at = _parse_number(headers.get("x-ratelimit-reset"))
+        retry_after = _parse_number(headers.get("retry-after"))
+
+        with self._lock:
+            if remaining is not None:
+                self._remaining = int(remaining)
+            if reset_at is not None:
+                self._reset_at = reset_at
+
+            throttled = status_code in _THROTTLE_STATUS_CODES and (
+                status_code == 429 or retry_after is not None or remaining == 0
+            )
+            blocked_until = self._blocked_until
+            if retry_after is not None and status_code in _THROTTLE_STATUS_CODES:
+                blocked_until = max(blocked_until, now + retry_after)
+            if self._remaining is not None and self._remaining <= self._reserve:
+                blocked_until = max(blocked_until, self._reset_at)
+            if throttled and blocked_until <= now:
+                blocked_until = now + 60.0
+            self._blocked_until = blocked_until
+
+        if throttled or blocked_until > now:
+            logger.warning(
+                "GitHub rate limit reached",
+                extra={
+                    "status_code": status_code,
+                    "remaining": self._remaining,
+                    "blocked_seconds": round(blocked_until - now, 1),
+                },
+            )
+        return throttled
+
+
+_shared_budget = RateLimitBudget()
+
+
+def shared_rate_limit_budget() -> RateLimitBudget:
+    """Return the rate-limit budget shared by all gateways in this process."""
+    return _shared_budget
+
+
+class AdaptiveRefreshScheduler:
+    """Decide when the next remote change check is due.
+
+    The interval drops to the minimum right after a change, doubles up to
+    the maximum while the repository stays quiet, and backs off exponentially on
+    errors and throttled responses.
+    """
+
+    def __init__(
+        self,
+        initial_interval_seconds: float,
+        min_interval_seconds: float,
+        max_interval_seconds: float,
+    ) -> None:
+        self._min_interval = max(min_interval_seconds, 1.0)
+        self._max_interval = max(max_interval_seconds, self._min_interval)
+        self._interval = min(
+            max(initial_interval_seconds, self._min_interval), self._max_interval
+        )
+        self._next_check_at = 0.0
+        self._consecutive_errors = 0
+
+    @property
+    def interval_seconds(self) -> float:
+        return self._interval
+
+    @property
+    def next_check_at(self) -> float:
+        return self._next_check_at
+
+    def is_due(self, now: float) -> bool:
+        return now >= self._next_check_at
+
+    def record_changed(self, now: float) -> None:
+        self._consecutive_errors = 0
+        self._interval = self._min_interval
+        self._next_check_at = now + self._interval
+
+    def record_unchanged(self, now: float) -> None:
+        self._consecutive_errors = 0
+        self._next_check_at = now + self._interval
+        self._interval = min(self._interval * 2, self._max_interval)
+
+    def record_error(self, now: float) -> None:
+        self._consecutive_errors += 1
+        backoff = self._min_interval * 2 ** min(self._consecutive_errors, 16)
+        self._next_check_at = now + min(backoff, self._max_interval)
+
+    def record_throttled(self, now: float, retry_at: float) -> None:
+        self.record_error(now)
+        self._next_check_at = max(self._next_check_at, retry_at)
+
+
+def _parse_number(value: str | None) -> float | None:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
@@ -0,0 +1,222 @@
+"""Parallel file access and manifests for a policy repository snapshot on disk."""
+
+from __future__ import annotations
+
+import hashlib
+import shutil
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TypeVar
+
+from policygate.config.logging import logger
+from policygate.config.tracing import tracer
+from policygate.domains.gateway.compiler import ROUTER_PATH, FileEntry
+from policygate.domains.gateway.exceptions import RepositorySyncError
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+POLICY_ENTRIES = (ROUTER_PATH, "rules", "scripts")
+
+
+class _SnapshotLock:
+    """Lock shared by snapshot readers and held alone while the root is swapped.
+
+    A waiting swap holds back new readers, so it is not starved by a steady
+    stream of requests. Readers must not nest ``reading`` blocks.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._swaps_waiting = 0
+        self._swapping = False
+
+    @contextmanager
+    def reading(self) -> Iterator[None]:
+        with self._condition:
+            while self._swapping or self._swaps_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def swapping(self) -> Iterator[None]:
+        with self._condition:
+            self._swaps_waiting += 1
+            while self._swapping or self._readers:
+                self._condition.wait()
+            self._swaps_waiting -= 1
+            self._swapping = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._swapping = False
+                self._condition.notify_all()
+
+
+class SnapshotFileAccess:
+    """Read, copy and hash policy files below a snapshot root directory.
+
+    Batched operations run on a bounded thread pool shared by all calls of
+    one gateway. ``_read_file_text`` and ``_copy_file`` are the per-file hooks,
+    and ``_ensure_local`` can fetch missing files before paths are resolved.
+    Subclasses call ``_notify_synced`` whenever the snapshot revision changes,
+    and replace the snapshot root only inside ``_snapshot_lock.swapping()``.
+    """
+
+    def __init__(self, snapshot_root: Path, io_workers: int = 8) -> None:
+        self._snapshot_root = snapshot_root
+        self._io_workers = max(io_workers, 1)
+        self._io_executor: ThreadPoolExecutor | None = None
+        self._io_executor_lock = threading.Lock()
+        self._sync_listeners: list[Callable[[str | None], None]] = []
+        self._snapshot_lock = _SnapshotLock()
+
+    def add_sync_listener(self, listener: Callable[[str | None], None]) -> None:
+        """Call ``listener`` with the new revision after each snapshot change.
+
+        Listeners run on the syncing thread, so they should only hand work off.
+        """
+        self._sync_listeners.append(listener)
+
+    def lazy_files(self) -> frozenset[str]:
+        """Return manifest paths not stored locally; reading one fetches it."""
+        return frozenset()
+
+    def read_text(self, relative_path: str) -> str:
+        """Read text file from the snapshot."""
+        logger.debug("Reading text file", extra={"relative_path": relative_path})
+        with tracer.span("files.read_text"):
+            self._ensure_local([relative_path])
+            with self._snapshot_lock.reading():
+                return self._read_file_text(self._resolve_relative_path(relative_path))
+
+    def read_many_texts(self, relative_paths: list[str]) -> dict[str, str]:
+        """Read multiple files from the snapshot.
+
+        Paths are validated in order before any file is read, and reads run on a
+        bounded thread pool. The result keeps input order and the first failing
+        path in input order determines the raised error.
+        """
+        logger.debug(
+            "Reading multiple files", extra={"file_count": len(relative_paths)}
+        )
+        with tracer.span("files.read_many", file_count=len(relative_paths)):
+            self._ensure_local(relative_paths)
+            with self._snapshot_lock.reading():
+                targets = [self._resolve_relative_path(path) for path in relative_paths]
+                contents = self._map_io(self._read_file_text, targets)
+            return dict(zip(relative_paths, contents, strict=True))
+
+    def copy_many_files(
+        self,
+        relative_paths: list[str],
+        destination_directory: str,
+    ) -> list[str]:
+        """Copy files from the snapshot to destination directory.
+
+        When several sources share a file name the last one wins, as with
+        sequential copying, regardless of how copies are scheduled.
+        """
+        logger.info(
+            "Copying files from cache",
+            extra={
+                "file_count": len(relative_paths),
+                "destination_directory": destination_directory,
+            },
+        )
+        destination = Path(destination_directory).resolve()
+        destination.mkdir(parents=True, exist_ok=True)
+
+        with tracer.span("files.copy_many", file_count=len(relative_paths)):
+            self._ensure_local(relative_paths)
+            copied = [destination / Path(path).name for path in relative_paths]
+            with self._snapshot_lock.reading():
+                sources = [self._resolve_relative_path(path) for path in relative_paths]
+                source_by_target = dict(zip(copied, sources, strict=True))
+                self._map_io(
+                    lambda pair: self._copy_file(source=pair[1], target=pair[0]),
+                    list(source_by_target.items()),
+                )
+            return [str(target) for target in copied]
+
+    def _notify_synced(self, revision: str | None) -> None:
+        for listener in self._sync_listeners:
+            listener(revision)
+
+    def _ensure_local(self, relative_paths: list[str]) -> None:
+        """Make files available below the snapshot root; all are by default."""
+
+    def _read_file_text(self, source: Path) -> str:
+        return source.read_text(encoding="utf-8")
+
+    def _copy_file(self, source: Path, target: Path) -> None:
+        shutil.copy2(source, target)
+
+    def _map_io(self, operation: Callable[[_T], _R], items: list[_T]) -> list[_R]:
+        if self._io_workers == 1 or len(items) < 2:
+            return [operation(item) for item in items]
+        return list(self._get_io_executor().map(operation, items))
+
+    def _get_io_executor(self) -> ThreadPoolExecutor:
+        with self._io_executor_lock:
+            if self._io_executor is None:
+                self._io_executor = ThreadPoolExecutor(
+                    max_workers=self._io_workers,
+                    thread_name_prefix="policygate-io",
+                )
+            return self._io_executor
+
+    def _build_manifest(self, root: Path) -> dict[str, FileEntry]:
+        files = list_policy_files(root)
+        entries = self._map_io(hash_file, files)
+        return {
+            file.relative_to(root).as_posix(): entry
+            for file, entry in zip(files, entries, strict=True)
+        }
+
+    def _resolve_relative_path(self, relative_path: str) -> Path:
+        if not relative_path:
+            raise RepositorySyncError("relative path cannot be empty")
+
+        candidate = (self._snapshot_root / relative_path).resolve()
+        base = self._snapshot_root.resolve()
+        if base not in candidate.parents and candidate != base:
+            raise RepositorySyncError("path traversal is not allowed")
+        if not candidate.exists() or not candidate.is_file():
+            raise RepositorySyncError(f"file not found: {relative_path}")
+        return candidate
+
+
+def list_policy_files(root: Path) -> list[Path]:
+    """Return router.yaml and every file below rules/ and scripts/."""
+    files: list[Path] = []
+    for entry in POLICY_ENTRIES:
+        path = root / entry
+        if path.is_file():
+            files.append(path)
+        elif path.is_dir():
+            files.extend(sorted(item for item in path.rglob("*") if item.is_file()))
+    return files
+
+
+def hash_file(path: Path) -> FileEntry:
+    """Return size and SHA-256 of a file."""
+    digest = hashlib.sha256()
+    size = 0
+    with path.open("rb") as handle:
+        while chunk := handle.read(1024 * 1024):
+            digest.update(chunk)
+            size += len(chunk)
+    return FileEntry(size=size, sha256=digest.hexdigest())
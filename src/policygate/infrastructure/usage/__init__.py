@@ -0,0 +1 @@
+"""Usage statistics storage adapters."""
@@ -0,0 +1,141 @@
+"""SQLite file keeping alias usage totals across restarts."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections.abc import Iterable
+from contextlib import closing
+from pathlib import Path
+
+from policygate.config.logging import logger
+from policygate.domains.gateway.models import AliasUsage
+from policygate.domains.gateway.usage import UsageRecorder
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alias_usage (
+    kind TEXT NOT NULL,
+    alias TEXT NOT NULL,
+    hits INTEGER NOT NULL,
+    bytes_served INTEGER NOT NULL,
+    total_ms REAL NOT NULL,
+    PRIMARY KEY (kind, alias)
+)
+"""
+_UPSERT = """
+INSERT INTO alias_usage (kind, alias, hits, bytes_served, total_ms)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (kind, alias) DO UPDATE SET
+    hits = hits + excluded.hits,
+    bytes_served = bytes_served + excluded.bytes_served,
+    total_ms = total_ms + excluded.total_ms
+"""
+
+
+class SqliteUsageStore:
+    """Usage totals per alias in a small SQLite file, added to in batches."""
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+
+    def load(self) -> list[AliasUsage]:
+        """Return stored totals; a missing or unreadable file yields none."""
+        if not self._path.is_file():
+            return []
+        try:
+            with closing(self._connect()) as connection:
+                rows = connection.execute(
+                    "SELECT kind, alias, hits, bytes_served, total_ms FROM alias_usage"
+                ).fetchall()
+        except sqlite3.Error as error:
+            logger.warning(
+                "Ignoring unreadable usage stats file",
+                extra={"path": str(self._path), "error": str(error)},
+            )
+            return []
+        return [
+            AliasUsage(
+                kind=kind,
+                alias=alias,
+                hits=hits,
+                bytes_served=bytes_served,
+                total_ms=total_ms,
+            )
+            for kind, alias, hits, bytes_served, total_ms in rows
+            if kind in ("rule", "script", "task")
+        ]
+
+    def add(self, usages: Iterable[AliasUsage]) -> None:
+        """Add usage deltas to the stored totals in one transaction."""
+        rows = [
+            (usage.kind, usage.alias, usage.hits, usage.bytes_served, usage.total_ms)
+            for usage in usages
+        ]
+        if not rows:
+            return
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(_UPSERT, rows)
+
+    def _connect(self) -> sqlite3.Connection:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self._path, timeout=5)
+        connection.execute(_SCHEMA)
+        return connection
+
+
+class UsageStatsWriter:
+    """Move recorded usage into a store periodically and on demand.
+
+    Without a store the recorder is still collected, so its buffer stays
+    small. Deltas of a failed write are logged and dropped; in-memory totals
+    keep them.
+    """
+
+    def __init__(
+        self,
+        recorder: UsageRecorder,
+        store: SqliteUsageStore | None,
+        interval_seconds: float = 30.0,
+    ) -> None:
+        self._recorder = recorder
+        self._store = store
+        self._interval_seconds = max(interval_seconds, 0.1)
+        self._stopped = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start periodic flushing on a daemon thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run,
+            name="policygate-usage-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop periodic flushing and write what is left."""
+        self._stopped.set()
+        self.flush()
+
+    def flush(self) -> None:
+        """Write usage recorded since the previous flush in one batch."""
+        with self._flush_lock:
+            usages = self._recorder.take_unsaved()
+            if self._store is None or not usages:
+                return
+            try:
+                self._store.add(usages)
+            except (OSError, sqlite3.Error) as error:
+                logger.warning(
+                    "Could not write usage stats",
+                    extra={"aliases": len(usages), "error": str(error)},
+                )
+                return
+            logger.debug("Usage stats written", extra={"aliases": len(usages)})
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval_seconds):
+            self.flush()
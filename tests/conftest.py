@@ -9,7 +9,13 @@ from typing import Any
 import pytest
 from fastmcp import Client
 
-from policygate.entry_points.mcp_server import mcp
+from policygate.entry_points.mcp_server import mcp, response_cache
+
+
+@pytest.fixture(autouse=True)
+def _clear_response_cache() -> None:
+    """Keep cached tool responses from leaking between tests."""
+    response_cache.clear()
 
 
 @pytest.fixture
@@ -0,0 +1,188 @@
+"""Offline fake of the GitHub REST endpoints used by the repository gateway."""
+
+from __future__ import annotations
+
+import io
+import tarfile
+import threading
+from collections import deque
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from policygate.infrastructure.repository.github_repository_gateway import (
+    GitHubRepositoryGateway,
+)
+from policygate.infrastructure.repository.refresh_scheduler import RateLimitBudget
+
+DEFAULT_FILES = {
+    "router.yaml": (
+        "tasks:\n"
+        "  task1:\n"
+        "    description: Example task\n"
+        "    rules: [rule1]\n"
+        "    scripts: [script1]\n"
+        "rules:\n"
+        "  rule1:\n"
+        "    path: rules/rule1.md\n"
+        "    description: Rule one\n"
+        "scripts:\n"
+        "  script1:\n"
+        "    path: scripts/script1.py\n"
+        "    description: Script one\n"
+    ),
+    "rules/rule1.md": "# rule one\n",
+    "scripts/script1.py": "print('ok')\n",
+}
+
+
+class FakeGitHubApi:
+    """Serve repository metadata, commits, tarballs and files from memory.
+
+    Responses carry ``X-RateLimit-*`` headers, and queued failures let tests
+    simulate throttling and outages without network access.
+    """
+
+    def __init__(
+        self,
+        files: dict[str, str] | None = None,
+        sha: str = "sha-1",
+        rate_limit: int = 5000,
+    ) -> None:
+        self.files = dict(DEFAULT_FILES if files is None else files)
+        self.sha = sha
+        self.rate_limit_remaining = rate_limit
+        self.rate_limit_reset = 0
+        self.requests: list[str] = []
+        self.range_requests: list[str] = []
+        self.interrupt_tarball_after: int | None = None
+        self.commit_payload: object | None = None
+        self.tarball_gate: threading.Event | None = None
+        self._queued: deque[httpx.Response] = deque()
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def queue_response(
+        self,
+        status_code: int,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        """Return this response for the next request instead of the real one."""
+        self._queued.append(
+            httpx.Response(status_code, headers=headers or {}, json={"message": "x"})
+        )
+
+    def count(self, suffix: str) -> int:
+        return sum(1 for path in self.requests if path.endswith(suffix))
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.requests.append(path)
+        if self._queued:
+            return self._queued.popleft()
+
+        self.rate_limit_remaining = max(self.rate_limit_remaining - 1, 0)
+        headers = {
+            "X-RateLimit-Remaining": str(self.rate_limit_remaining),
+            "X-RateLimit-Reset": str(self.rate_limit_reset),
+        }
+        if path == "/repos/owner/repo":
+            return httpx.Response(
+                200,
+                headers=headers,
+                json={
+                    "default_branch": "main",
+                    "tarball_url": "https://api.github.com/repos/owner/repo/tarball{/ref}",
+                },
+            )
+        if path.startswith("/repos/owner/repo/commits/"):
+            payload = self.commit_payload
+            if payload is None:
+                payload = {"sha": self.sha}
+            return httpx.Response(200, headers=headers, json=payload)
+        if path.startswith("/repos/owner/repo/tarball/"):
+            return self._tarball_response(request, headers)
+        relative_path = path.removeprefix("/repos/owner/repo/contents/")
+        if relative_path != path and relative_path in self.files:
+            return httpx.Response(
+                200, headers=headers, content=self.files[relative_path].encode()
+            )
+        return httpx.Response(404, headers=headers, json={"message": "Not Found"})
+
+    def _tarball_response(
+        self,
+        request: httpx.Request,
+        headers: dict[str, str],
+    ) -> httpx.Response:
+        if self.tarball_gate is not None:
+            self.tarball_gate.wait(timeout=5)
+        data = self.tarball()
+        status_code = 200
+        range_header = request.headers.get("range")
+        if range_header:
+            self.range_requests.append(range_header)
+            start = int(range_header.removeprefix("bytes=").rstrip("-"))
+            headers["Content-Range"] = f"bytes {start}-{len(data) - 1}/{len(data)}"
+            data = data[start:]
+            status_code = 206
+        headers["Content-Length"] = str(len(data))
+
+        if self.interrupt_tarball_after is not None:
+            limit = self.interrupt_tarball_after
+            self.interrupt_tarball_after = None
+            return httpx.Response(
+                status_code,
+                headers=headers,
+                stream=_InterruptedStream(data[:limit]),
+            )
+        return httpx.Response(status_code, headers=headers, content=data)
+
+    def tarball(self) -> bytes:
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+            for relative_path, content in sorted(self.files.items()):
+                data = content.encode("utf-8")
+                member = tarfile.TarInfo(f"owner-repo-{self.sha}/{relative_path}")
+                member.size = len(data)
+                archive.addfile(member, io.BytesIO(data))
+        return buffer.getvalue()
+
+
+def build_gateway(
+    tmp_path: Path,
+    api: FakeGitHubApi,
+    *,
+    name: str = "cache",
+    sync: bool = False,
+    **options: Any,
+) -> GitHubRepositoryGateway:
+    """Build a gateway that talks to ``api`` and caches under ``tmp_path/name``.
+
+    ``options`` are passed through to the gateway; ``sync`` runs a first
+    forced refresh before returning.
+    """
+    options.setdefault("rate_limit_budget", RateLimitBudget())
+    gateway = GitHubRepositoryGateway(
+        repository_url="https://github.com/owner/repo",
+        access_token="token",
+        local_repo_data_dir=str(tmp_path / name),
+        transport=api.transport(),
+        **options,
+    )
+    if sync:
+        gateway.force_refresh()
+    return gateway
+
+
+class _InterruptedStream(httpx.SyncByteStream):
+    """Body stream that drops the connection after sending a prefix."""
+
+    def __init__(self, prefix: bytes) -> None:
+        self._prefix = prefix
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self._prefix
+        raise httpx.ReadError("connection reset by fake server")
@@ -0,0 +1,149 @@
+"""Tests for filtered, size-limited extraction of repository archives."""
+
+from __future__ import annotations
+
+import io
+import tarfile
+from pathlib import Path
+
+import pytest
+
+from policygate.domains.gateway.exceptions import RepositorySyncError
+from policygate.infrastructure.repository.archive_extraction import (
+    ArchiveLimits,
+    extract_policy_files,
+)
+from tests.fake_github import FakeGitHubApi, build_gateway
+
+FILES = {
+    "router.yaml": b"rules: {}\n",
+    "rules/style.md": b"# style\n",
+    "scripts/ship.sh": b"echo ship\n",
+    "docs/manual.pdf": b"x" * 4096,
+    "README.md": b"# readme\n",
+}
+
+
+def _archive(tmp_path: Path, links: dict[str, str] | None = None) -> Path:
+    path = tmp_path / "archive.tar.gz"
+    with tarfile.open(path, mode="w:gz") as archive:
+        archive.addfile(_member("owner-repo-sha/", tarfile.DIRTYPE))
+        for relative_path, data in FILES.items():
+            member = _member(f"owner-repo-sha/{relative_path}", tarfile.REGTYPE)
+            member.size = len(data)
+            member.mode = 0o755 if relative_path.endswith(".sh") else 0o644
+            archive.addfile(member, io.BytesIO(data))
+        for relative_path, target in (links or {}).items():
+            member = _member(f"owner-repo-sha/{relative_path}", tarfile.SYMTYPE)
+            member.linkname = target
+            archive.addfile(member)
+    return path
+
+
+def _member(name: str, kind: bytes) -> tarfile.TarInfo:
+    member = tarfile.TarInfo(name)
+    member.type = kind
+    return member
+
+
+def test_only_policy_files_are_extracted(tmp_path: Path) -> None:
+    extracted = extract_policy_files(
+        _archive(tmp_path), tmp_path / "out", ArchiveLimits()
+    )
+
+    assert extracted.root == tmp_path / "out" / "owner-repo-sha"
+    assert sorted(
+        path.relative_to(extracted.root).as_posix()
+        for path in extracted.root.rglob("*")
+        if path.is_file()
+    ) == ["router.yaml", "rules/style.md", "scripts/ship.sh"]
+    assert (extracted.extracted_files, extracted.skipped_members) == (3, 2)
+    assert extracted.extracted_bytes == sum(
+        len(FILES[path])
+        for path in ("router.yaml", "rules/style.md", "scripts/ship.sh")
+    )
+    assert (extracted.root / "scripts" / "ship.sh").stat().st_mode & 0o100
+
+
+@pytest.mark.skipif(
+    not hasattr(tarfile, "data_filter"), reason="needs tarfile extraction filters"
+)
+def test_links_leaving_the_target_are_rejected(tmp_path: Path) -> None:
+    archive = _archive(tmp_path, links={"rules/passwd.md": "../../../../etc/passwd"})
+
+    with pytest.raises(tarfile.FilterError):
+        extract_policy_files(archive, tmp_path / "out", ArchiveLimits())
+
+
+def test_links_to_skipped_members_fail_extraction(tmp_path: Path) -> None:
+    archive = _archive(tmp_path, links={"rules/manual.md": "../docs/manual.pdf"})
+
+    with pytest.raises(
+        RepositorySyncError,
+        match="rules/manual.md points to docs/manual.pdf, which is not extracted",
+    ):
+        extract_policy_files(archive, tmp_path / "out", ArchiveLimits())
+
+
+@pytest.mark.skipif(
+    not hasattr(tarfile, "data_filter"), reason="needs tarfile extraction filters"
+)
+def test_links_between_policy_files_are_extracted(tmp_path: Path) -> None:
+    archive = _archive(tmp_path, links={"rules/alias.md": "style.md"})
+
+    extracted = extract_policy_files(archive, tmp_path / "out", ArchiveLimits())
+
+    assert (extracted.root / "rules" / "alias.md").read_bytes() == b"# style\n"
+
+
+@pytest.mark.parametrize("root_name", ["..", ""])
+def test_members_outside_a_top_level_directory_fail_extraction(
+    tmp_path: Path, root_name: str
+) -> None:
+    path = tmp_path / "archive.tar.gz"
+    with tarfile.open(path, mode="w:gz") as archive:
+        member = _member(f"{root_name}/rules/style.md", tarfile.REGTYPE)
+        member.size = len(FILES["rules/style.md"])
+        archive.addfile(member, io.BytesIO(FILES["rules/style.md"]))
+
+    with pytest.raises(RepositorySyncError, match="outside a top-level directory"):
+        extract_policy_files(path, tmp_path / "out" / "nested", ArchiveLimits())
+    assert not (tmp_path / "out" / "rules").exists()
+
+
+@pytest.mark.parametrize(
+    ("limits", "message"),
+    [
+        (
+            ArchiveLimits(max_file_bytes=8),
+            "router.yaml has 10 bytes, over the limit of 8",
+        ),
+        (ArchiveLimits(max_total_bytes=20), "exceed 20 bytes"),
+        (ArchiveLimits(max_files=2), "more than 2 policy files"),
+    ],
+)
+def test_limits_fail_extraction(
+    tmp_path: Path, limits: ArchiveLimits, message: str
+) -> None:
+    with pytest.raises(RepositorySyncError, match=message):
+        extract_policy_files(_archive(tmp_path), tmp_path / "out", limits)
+
+
+def test_sync_over_limit_keeps_previous_snapshot(tmp_path: Path) -> None:
+    api = FakeGitHubApi()
+    gateway = build_gateway(
+        tmp_path,
+        api,
+        max_sync_retries=0,
+        archive_limits=ArchiveLimits(max_file_bytes=1024),
+    )
+    api.files["docs/large.bin"] = "x" * 4096
+    gateway.force_refresh()
+    api.sha = "sha-2"
+    api.files["rules/rule1.md"] = "y" * 4096
+
+    with pytest.raises(RepositorySyncError, match="rules/rule1.md has 4096 bytes"):
+        gateway.force_refresh()
+
+    assert gateway.current_revision() == "sha-1"
+    assert not (tmp_path / "cache" / "docs").exists()
@@ -0,0 +1,120 @@
+"""Tests for cache verification, repair and compressed cold rule files."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from policygate.infrastructure.repository.cold_blobs import (
+    cold_blob_matches_size,
+    cold_blob_path,
+    read_cold_blob,
+    write_cold_blob,
+)
+from tests.fake_github import DEFAULT_FILES, FakeGitHubApi, build_gateway
+
+SYNCED = {
+    "refresh_interval_seconds": 60,
+    "max_sync_retries": 0,
+    "cold_blob_promote_reads": 2,
+}
+
+LARGE_RULE = "# large rule\n" + "keep this rule in mind\n" * 200
+
+
+def _api_with_large_rule() -> FakeGitHubApi:
+    router = DEFAULT_FILES["router.yaml"].replace(
+        "rules:\n",
+        "rules:\n  big:\n    path: rules/big.md\n    description: Big rule\n",
+    )
+    return FakeGitHubApi(
+        files={**DEFAULT_FILES, "router.yaml": router, "rules/big.md": LARGE_RULE}
+    )
+
+
+def test_cold_blob_round_trip_and_trailer_size(tmp_path: Path) -> None:
+    blob = tmp_path / "blobs" / "rule.md.gz"
+    data = LARGE_RULE.encode()
+
+    write_cold_blob(data, blob)
+
+    assert read_cold_blob(blob) == data
+    assert cold_blob_matches_size(blob, len(data))
+    assert not cold_blob_matches_size(blob, len(data) + 1)
+
+
+def test_verify_cache_reports_intact_snapshot(tmp_path: Path) -> None:
+    gateway = build_gateway(tmp_path, FakeGitHubApi(), sync=True, **SYNCED)
+
+    result = gateway.verify_cache()
+
+    assert result.sha == "sha-1"
+    assert result.checked_files == len(DEFAULT_FILES)
+    assert result.corrupted_files == []
+
+
+def test_verify_cache_repairs_only_damaged_files(tmp_path: Path) -> None:
+    api = FakeGitHubApi()
+    gateway = build_gateway(tmp_path, api, sync=True, **SYNCED)
+    rule_path = tmp_path / "cache" / "rules" / "rule1.md"
+    rule_path.write_text("# rule ONE\n", encoding="utf-8")
+    (tmp_path / "cache" / "scripts" / "script1.py").unlink()
+    tarball_downloads = api.count("/tarball/main")
+
+    quick = gateway.verify_cache(full=False, repair=False)
+    result = gateway.verify_cache()
+
+    assert quick.corrupted_files == ["scripts/script1.py"]
+    assert result.corrupted_files == ["rules/rule1.md", "scripts/script1.py"]
+    assert result.repaired_files == result.corrupted_files
+    assert api.count("/tarball/main") == tarball_downloads
+    assert api.count("/contents/rules/rule1.md") == 1
+    assert gateway.read_text("rules/rule1.md") == "# rule one\n"
+    assert gateway.verify_cache().corrupted_files == []
+
+
+def test_large_rules_are_stored_compressed(tmp_path: Path) -> None:
+    gateway = build_gateway(
+        tmp_path, _api_with_large_rule(), sync=True, **SYNCED, cold_blob_min_bytes=1024
+    )
+    cache = tmp_path / "cache"
+
+    metadata = json.loads((cache / ".policygate_sync.json").read_text("utf-8"))
+    assert metadata["cold_files"] == ["rules/big.md"]
+    assert not (cache / "rules" / "big.md").exists()
+    assert cold_blob_path(cache, "rules/big.md").is_file()
+    assert gateway.read_many_texts(["rules/big.md", "rules/rule1.md"]) == {
+        "rules/big.md": LARGE_RULE,
+        "rules/rule1.md": "# rule one\n",
+    }
+    assert gateway.verify_cache().corrupted_files == []
+
+
+def test_frequently_read_cold_rule_is_promoted(tmp_path: Path) -> None:
+    gateway = build_gateway(
+        tmp_path, _api_with_large_rule(), sync=True, **SYNCED, cold_blob_min_bytes=1024
+    )
+    plain = tmp_path / "cache" / "rules" / "big.md"
+
+    gateway.read_text("rules/big.md")
+    assert not plain.exists()
+    gateway.read_text("rules/big.md")
+
+    assert plain.read_text(encoding="utf-8") == LARGE_RULE
+    gateway.force_refresh()
+    assert plain.is_file()
+
+
+def test_damaged_cold_blob_is_repaired(tmp_path: Path) -> None:
+    gateway = build_gateway(
+        tmp_path, _api_with_large_rule(), sync=True, **SYNCED, cold_blob_min_bytes=1024
+    )
+    blob = cold_blob_path(tmp_path / "cache", "rules/big.md")
+    damaged = bytearray(blob.read_bytes())
+    damaged[20] ^= 0xFF
+    blob.write_bytes(bytes(damaged))
+
+    result = gateway.verify_cache()
+
+    assert result.repaired_files == ["rules/big.md"]
+    assert read_cold_blob(blob).decode() == LARGE_RULE
@@ -0,0 +1,109 @@
+"""Tests for the compact router representation."""
+
+from __future__ import annotations
+
+import dataclasses
+
+import pytest
+
+from policygate.domains.gateway.compact_router import CompactRouter, CompactTask
+from policygate.domains.gateway.compiler import (
+    ROUTER_CACHE_FORMAT,
+    FileEntry,
+    compile_router,
+    dump_router_cache,
+    load_compiled_router_cache,
+    load_router_cache,
+    normalize_path,
+    parse_router,
+)
+
+ROUTER_YAML = """
+tasks:
+  review:
+    description: Review code
+    rules: [py_style, py_tests]
+  release:
+    description: Review code
+    rules: [py_style]
+    scripts: [lint]
+rules:
+  py_style:
+    path: rules/py_style.md
+    description: Shared description
+  py_tests:
+    path: rules/py_tests.md
+    description: Shared description
+scripts:
+  lint:
+    path: scripts/lint.py
+    description: Lint
+"""
+
+
+def test_parse_router_returns_compact_router() -> None:
+    router = parse_router(ROUTER_YAML)
+
+    assert isinstance(router, CompactRouter)
+    assert router.tasks["release"] == CompactTask(
+        description="Review code", rules=("py_style",), scripts=("lint",)
+    )
+    assert router.rules["py_tests"].path == "rules/py_tests.md"
+    assert router.scripts["lint"].description == "Lint"
+
+
+def test_repeated_strings_are_shared() -> None:
+    router = parse_router(ROUTER_YAML)
+    review = router.tasks["review"]
+    release = router.tasks["release"]
+    style_key = next(alias for alias in router.rules if alias == "py_style")
+
+    assert review.rules[0] is release.rules[0] is style_key
+    assert review.description is release.description
+    assert router.rules["py_style"].description is router.rules["py_tests"].description
+
+
+def test_compact_router_is_immutable_and_slotted() -> None:
+    router = parse_router(ROUTER_YAML)
+    task = router.tasks["review"]
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        task.description = "changed"  # type: ignore[misc]
+    with pytest.raises(TypeError):
+        router.rules["new"] = router.rules["py_style"]  # type: ignore[index]
+    assert not hasattr(task, "__dict__")
+    assert not hasattr(router.rules["py_style"], "__dict__")
+
+
+def test_router_cache_round_trip_requires_matching_router_hash() -> None:
+    router = parse_router(ROUTER_YAML)
+    raw = dump_router_cache(router, router_sha256="abc")
+
+    restored = load_router_cache(raw, router_sha256="abc")
+
+    assert restored == router
+    assert restored.tasks["review"].rules[0] is next(iter(restored.rules))
+    assert load_router_cache(raw, router_sha256="other") is None
+    outdated = raw.replace(f'"format":{ROUTER_CACHE_FORMAT}', '"format":0')
+    assert load_router_cache(outdated, "abc") is None
+    assert load_router_cache("{not json", router_sha256="abc") is None
+    no_router = f'{{"format":{ROUTER_CACHE_FORMAT},"router_sha256":"abc"}}'
+    assert load_router_cache(no_router, router_sha256="abc") is None
+
+
+def test_compiled_router_cache_links_without_validation() -> None:
+    router = parse_router(ROUTER_YAML)
+    manifest = {
+        normalize_path(asset.path): FileEntry(size=1, sha256="h")
+        for asset in [*router.rules.values(), *router.scripts.values()]
+    }
+    compiled = compile_router(router, manifest)
+    raw = dump_router_cache(
+        router, router_sha256="abc", rule_includes=compiled.rule_includes
+    )
+
+    assert load_compiled_router_cache(raw, "abc", manifest) == compiled
+    assert load_compiled_router_cache(raw, "abc", {}) is None
+    assert (
+        load_compiled_router_cache(dump_router_cache(router, "abc"), "abc", {}) is None
+    )
@@ -2,14 +2,39 @@
 
 from __future__ import annotations
 
+import hashlib
+from collections.abc import Callable
 from pathlib import Path
 
 import pytest
 
-from policygate.domains.gateway.exceptions import RouterReferenceError
+from policygate.domains.gateway import services
+from policygate.domains.gateway.compiler import (
+    FileEntry,
+    compile_router,
+    dump_router_cache,
+    parse_router,
+)
+from policygate.domains.gateway.exceptions import (
+    InvalidCursorError,
+    RouterReferenceError,
+    RouterValidationError,
+)
+from policygate.domains.gateway.models import CacheVerification
 from policygate.domains.gateway.services import PolicyGatewayService
 
 
+def rule_section(alias: str, body: str) -> str:
+    """Expected ``read_rules`` section of a rule file holding ``body``."""
+    content_hash = hashlib.sha256(body.encode("utf-8")).hexdigest()[:16]
+    return f'<{alias} hash="{content_hash}">\n{body.rstrip()}\n</{alias}>'
+
+
+def rules_document(*sections: str, sha: str = "sha-1") -> str:
+    """Expected ``read_rules`` document of ``sections`` read from ``sha``."""
+    return "\n\n".join([*sections, f'<snapshot sha="{sha}" />'])
+
+
 class StubRepositoryGateway:
     """In-memory repository gateway stub for service tests."""
 
@@ -33,21 +58,64 @@ scripts:
             "rules/rule1.md": "# rule",
             "scripts/script1.py": "print('ok')\n",
         }
+        self.revision: str | None = "sha-1"
         self.refresh_calls = 0
         self.force_refresh_calls = 0
+        self.read_many_calls = 0
+        self.router_reads = 0
+        self.router_cache: str | None = None
+        self.manifests: dict[str, dict[str, FileEntry]] = {}
+        self.sync_listeners: list[Callable[[str | None], None]] = []
 
     def refresh_if_needed(self) -> None:
         self.refresh_calls += 1
 
+    def current_revision(self) -> str | None:
+        return self.revision
+
+    def file_manifest(self) -> dict[str, FileEntry]:
+        return {
+            path: FileEntry(
+                size=len(content.encode("utf-8")),
+                sha256=hashlib.sha256(content.encode("utf-8")).hexdigest(),
+            )
+            for path, content in {**self.files, "router.yaml": self.router}.items()
+        }
+
+    def manifest_at(self, revision: str) -> dict[str, FileEntry] | None:
+        if revision == self.revision:
+            return self.file_manifest()
+        return self.manifests.get(revision)
+
+    def read_router_cache(self) -> str | None:
+        return self.router_cache
+
+    def add_sync_listener(self, listener: Callable[[str | None], None]) -> None:
+        self.sync_listeners.append(listener)
+
+    def lazy_files(self) -> frozenset[str]:
+        return frozenset()
+
     def read_text(self, relative_path: str) -> str:
         if relative_path == "router.yaml":
+            self.router_reads += 1
             return self.router
         return self.files[relative_path]
 
     def force_refresh(self) -> None:
         self.force_refresh_calls += 1
 
+    def verify_cache(self, full: bool = True, repair: bool = True) -> CacheVerification:
+        return CacheVerification(
+            sha=self.revision,
+            checked_files=len(self.files),
+            full=full,
+            corrupted_files=["rules/rule1.md"],
+            repaired_files=["rules/rule1.md"] if repair else [],
+        )
+
     def read_many_texts(self, relative_paths: list[str]) -> dict[str, str]:
+        self.read_many_calls += 1
         return {path: self.files[path] for path in relative_paths}
 
     def copy_many_files(
@@ -87,9 +155,29 @@ def test_read_rules_returns_selected_rule_content() -> None:
 
     payload = service.read_rules(["rule1"])
 
-    assert "<rule1>" in payload
-    assert "</rule1>" in payload
-    assert "# rule" in payload
+    assert payload == rules_document(rule_section("rule1", "# rule"))
+
+
+def test_read_rules_with_budget_continues_from_cursor() -> None:
+    gateway = StubRepositoryGateway()
+    gateway.router = gateway.router.replace(
+        "\nscripts:\n",
+        "\n  rule2:\n    path: rules/rule2.md\n    description: Rule two\nscripts:\n",
+    )
+    gateway.files["rules/rule2.md"] = "# second"
+    service = PolicyGatewayService(repository_gateway=gateway)
+
+    first = service.read_rules(["rule1", "rule2"], max_chars=50)
+    assert first.startswith(rules_document(rule_section("rule1", "# rule")))
+    assert "<rule2" not in first
+    cursor = first.rsplit("next cursor: ", 1)[1].rstrip("_")
+
+    second = service.read_rules(["rule1", "rule2"], max_chars=50, cursor=cursor)
+    assert second == rules_document(rule_section("rule2", "# second"))
+
+    gateway.revision = "sha-2"
+    with pytest.raises(InvalidCursorError):
+        service.read_rules(["rule1", "rule2"], max_chars=50, cursor=cursor)
 
 
 def test_read_rules_raises_for_unknown_alias() -> None:
@@ -121,3 +209,134 @@ def test_sync_repository_forces_refresh() -> None:
 
     assert payload == {"status": "synced"}
     assert gateway.force_refresh_calls == 1
+
+
+def test_search_rules_ranks_matching_rule_with_snippet() -> None:
+    gateway = StubRepositoryGateway()
+    gateway.files["rules/rule1.md"] = "# rule\nAlways sanitize SQL input."
+    service = PolicyGatewayService(repository_gateway=gateway)
+
+    hits = service.search_rules("sql injection", limit=5)
+
+    assert [hit.alias for hit in hits] == ["rule1"]
+    assert "SQL" in hits[0].snippet
+
+
+def test_search_rules_reuses_index_within_revision() -> None:
+    gateway = StubRepositoryGateway()
+    service = PolicyGatewayService(repository_gateway=gateway)
+
+    service.search_rules("rule")
+    service.search_rules("example")
+    assert gateway.read_many_calls == 1
+
+    gateway.revision = "sha-2"
+    service.search_rules("rule")
+    assert gateway.read_many_calls == 1
+
+    gateway.files["rules/rule1.md"] = "# rule updated"
+    gateway.revision = "sha-3"
+    assert service.search_rules("updated")[0].alias == "rule1"
+    assert gateway.read_many_calls == 2
+
+
+def test_outline_router_reuses_parsed_router_within_revision() -> None:
+    gateway = StubRepositoryGateway()
+    service = PolicyGatewayService(repository_gateway=gateway)
+
+    first = service.outline_router(section="rules", limit=1)
+    gateway.router = "tasks: {}"
+    second = service.outline_router(section="rules", limit=1)
+
+    assert first == second
+    assert "snapshot: sha-1" in first
+
+    gateway.revision = "sha-2"
+    assert "rule1" not in service.outline_router()
+
+
+def test_unchanged_router_file_is_not_parsed_again() -> None:
+    gateway = StubRepositoryGateway()
+    service = PolicyGatewayService(repository_gateway=gateway)
+
+    service.outline_router()
+    gateway.files["rules/rule1.md"] = "# rule updated"
+    gateway.revision = "sha-2"
+    outline = service.outline_router(limit=1)
+
+    assert gateway.router_reads == 1
+    assert "snapshot: sha-2" in outline
+
+
+def test_router_cache_replaces_yaml_parsing_when_hash_matches() -> None:
+    gateway = StubRepositoryGateway()
+    router_sha256 = hashlib.sha256(gateway.router.encode("utf-8")).hexdigest()
+    cached = parse_router(gateway.router.replace("Rule one", "Cached rule"))
+    gateway.router_cache = dump_router_cache(cached, router_sha256=router_sha256)
+    service = PolicyGatewayService(repository_gateway=gateway)
+
+    assert "Cached rule" in service.outline_router()
+    assert gateway.router_reads == 0
+
+
+def test_router_compiled_at_sync_time_is_not_validated_again(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    gateway = StubRepositoryGateway()
+    compiled = compile_router(parse_router(gateway.router), gateway.file_manifest())
+    gateway.router_cache = dump_router_cache(
+        compiled.router,
+        router_sha256=hashlib.sha256(gateway.router.encode("utf-8")).hexdigest(),
+        rule_includes=compiled.rule_includes,
+    )
+
+    def _no_compile(*args: object, **kwargs: object) -> None:
+        raise AssertionError("router validated at request time")
+
+    monkeypatch.setattr(services, "compile_router", _no_compile)
+    service = PolicyGatewayService(repository_gateway=gateway)
+
+    assert "Rule one" in service.outline_router()
+    gateway.files["rules/rule1.md"] = "# rule updated"
+    gateway.revision = "sha-2"
+    assert service.read_rules(["rule1"]) == rules_document(
+        rule_section("rule1", "# rule updated"), sha="sha-2"
+    )
+    assert gateway.router_reads == 0
+
+
+def test_stale_router_cache_falls_back_to_yaml() -> None:
+    gateway = StubRepositoryGateway()
+    gateway.router_cache = dump_router_cache(
+        parse_router(gateway.router), router_sha256="outdated"
+    )
+    service = PolicyGatewayService(repository_gateway=gateway)
+
+    assert "Rule one" in service.outline_router()
+    assert gateway.router_reads == 1
+
+
+def test_load_rejects_router_with_dangling_references() -> None:
+    gateway = StubRepositoryGateway()
+    gateway.router = gateway.router.replace("rules: [rule1]", "rules: [rule1, ghost]")
+    del gateway.files["scripts/script1.py"]
+    service = PolicyGatewayService(repository_gateway=gateway)
+
+    with pytest.raises(RouterValidationError) as error:
+        service.outline_router()
+
+    assert "unknown rule 'ghost'" in str(error.value)
+    assert "missing file 'scripts/script1.py'" in str(error.value)
+
+
+def test_verify_cache_drops_bodies_of_repaired_files() -> None:
+    gateway = StubRepositoryGateway()
+    service = PolicyGatewayService(repository_gateway=gateway)
+    service.search_rules(query="rule")
+    gateway.files["rules/rule1.md"] = "# repaired rule"
+
+    result = service.verify_cache()
+    hits = service.search_rules(query="repaired")
+
+    assert result.repaired_files == ["rules/rule1.md"]
+    assert [hit.alias for hit in hits] == ["rule1"]
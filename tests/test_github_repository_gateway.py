@@ -2,14 +2,20 @@
 
 from __future__ import annotations
 
+import hashlib
 from pathlib import Path
 
 import pytest
 
-from policygate.domains.gateway.exceptions import RepositorySyncError
+from policygate.domains.gateway.compiler import load_router_cache
+from policygate.domains.gateway.exceptions import (
+    RepositorySyncError,
+    RouterValidationError,
+)
 from policygate.infrastructure.repository.github_repository_gateway import (
     GitHubRepositoryGateway,
 )
+from tests.fake_github import FakeGitHubApi, build_gateway
 
 
 def _build_gateway() -> GitHubRepositoryGateway:
@@ -91,3 +97,122 @@ def test_copy_repository_entries_requires_rules(tmp_path: Path) -> None:
 
     with pytest.raises(RepositorySyncError, match="missing required entry: rules"):
         gateway._copy_repository_entries(source_root)
+
+
+def _build_cached_gateway(tmp_path: Path, io_workers: int) -> GitHubRepositoryGateway:
+    cache = tmp_path / "cache"
+    (cache / "rules").mkdir(parents=True, exist_ok=True)
+    (cache / "scripts" / "nested").mkdir(parents=True, exist_ok=True)
+    for number in range(6):
+        (cache / "rules" / f"rule{number}.md").write_text(
+            f"# rule {number}\n", encoding="utf-8"
+        )
+    (cache / "scripts" / "tool.py").write_text("first\n", encoding="utf-8")
+    (cache / "scripts" / "nested" / "tool.py").write_text("second\n", encoding="utf-8")
+    return GitHubRepositoryGateway(
+        repository_url="https://github.com/owner/repo",
+        access_token="token",
+        local_repo_data_dir=str(cache),
+        refresh_interval_seconds=60,
+        io_workers=io_workers,
+    )
+
+
+@pytest.mark.parametrize("io_workers", [1, 4])
+def test_read_many_texts_keeps_input_order(tmp_path: Path, io_workers: int) -> None:
+    gateway = _build_cached_gateway(tmp_path, io_workers=io_workers)
+    paths = [f"rules/rule{number}.md" for number in (5, 0, 3, 1)]
+
+    contents = gateway.read_many_texts(paths)
+
+    assert list(contents) == paths
+    assert contents["rules/rule3.md"] == "# rule 3\n"
+
+
+@pytest.mark.parametrize("io_workers", [1, 4])
+def test_read_many_texts_reports_first_missing_path(
+    tmp_path: Path,
+    io_workers: int,
+) -> None:
+    gateway = _build_cached_gateway(tmp_path, io_workers=io_workers)
+
+    with pytest.raises(RepositorySyncError, match="rules/missing_a.md"):
+        gateway.read_many_texts(
+            ["rules/rule0.md", "rules/missing_a.md", "rules/missing_b.md"]
+        )
+
+
+@pytest.mark.parametrize("io_workers", [1, 4])
+def test_copy_many_files_last_duplicate_name_wins(
+    tmp_path: Path,
+    io_workers: int,
+) -> None:
+    gateway = _build_cached_gateway(tmp_path, io_workers=io_workers)
+    destination = tmp_path / "out"
+
+    copied = gateway.copy_many_files(
+        relative_paths=["scripts/tool.py", "rules/rule1.md", "scripts/nested/tool.py"],
+        destination_directory=str(destination),
+    )
+
+    assert copied == [
+        str(destination / "tool.py"),
+        str(destination / "rule1.md"),
+        str(destination / "tool.py"),
+    ]
+    assert (destination / "tool.py").read_text(encoding="utf-8") == "second\n"
+
+
+def test_compile_snapshot_rejects_dangling_rule_path(tmp_path: Path) -> None:
+    gateway = _build_cached_gateway(tmp_path, io_workers=1)
+    source_root = tmp_path / "source"
+    (source_root / "rules").mkdir(parents=True, exist_ok=True)
+    (source_root / "router.yaml").write_text(
+        "rules:\n  r1:\n    path: rules/absent.md\n    description: Missing\n",
+        encoding="utf-8",
+    )
+
+    with pytest.raises(RouterValidationError, match="rules/absent.md"):
+        gateway._compile_snapshot(source_root)
+
+    assert (tmp_path / "cache" / "rules" / "rule0.md").exists()
+
+
+def test_file_manifest_is_built_from_cache_without_metadata(tmp_path: Path) -> None:
+    gateway = _build_cached_gateway(tmp_path, io_workers=2)
+
+    manifest = gateway.file_manifest()
+
+    assert manifest["rules/rule0.md"].size == len("# rule 0\n")
+    assert (
+        manifest["scripts/nested/tool.py"].sha256
+        == hashlib.sha256(b"second\n").hexdigest()
+    )
+
+
+def test_router_cache_is_built_once_for_existing_cache(tmp_path: Path) -> None:
+    gateway = _build_cached_gateway(tmp_path, io_workers=1)
+    router_yaml = "rules:\n  r0:\n    path: rules/rule0.md\n    description: Zero\n"
+    (tmp_path / "cache" / "router.yaml").write_text(router_yaml, encoding="utf-8")
+
+    raw = gateway.read_router_cache()
+
+    assert raw is not None
+    cache_file = tmp_path / "cache" / ".policygate_router.json"
+    assert cache_file.read_text(encoding="utf-8") == raw
+    router = load_router_cache(raw, hashlib.sha256(router_yaml.encode()).hexdigest())
+    assert router is not None
+    assert router.rules["r0"].path == "rules/rule0.md"
+
+
+def test_sync_writes_router_cache_with_snapshot(tmp_path: Path) -> None:
+    api = FakeGitHubApi()
+    gateway = build_gateway(tmp_path, api)
+
+    gateway.force_refresh()
+
+    raw = (tmp_path / "cache" / ".policygate_router.json").read_text(encoding="utf-8")
+    router_sha256 = gateway.file_manifest()["router.yaml"].sha256
+    router = load_router_cache(raw, router_sha256)
+    assert router is not None
+    assert router.tasks["task1"].scripts == ("script1",)
@@ -0,0 +1,135 @@
+"""Tests for the local directory repository gateway."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from policygate.domains.gateway.compiler import FileEntry
+from policygate.domains.gateway.exceptions import RepositorySyncError
+from policygate.domains.gateway.services import PolicyGatewayService
+from policygate.infrastructure.repository import local_directory_gateway
+from policygate.infrastructure.repository.local_directory_gateway import (
+    LocalDirectoryRepositoryGateway,
+)
+from tests.fake_github import DEFAULT_FILES
+
+
+def _write_tree(root: Path, files: dict[str, str]) -> None:
+    for relative_path, content in files.items():
+        target = root / relative_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content, encoding="utf-8")
+
+
+def _edit(path: Path, content: str) -> None:
+    stat = path.stat()
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def checkout(tmp_path: Path) -> Path:
+    root = tmp_path / "policies"
+    _write_tree(root, DEFAULT_FILES)
+    return root
+
+
+def _build_gateway(root: Path) -> LocalDirectoryRepositoryGateway:
+    return LocalDirectoryRepositoryGateway(root_dir=str(root), poll_interval_seconds=0)
+
+
+def test_serves_checkout_without_copying(checkout: Path) -> None:
+    gateway = _build_gateway(checkout)
+
+    assert gateway.read_text("rules/rule1.md") == "# rule one\n"
+    assert sorted(gateway.file_manifest()) == [
+        "router.yaml",
+        "rules/rule1.md",
+        "scripts/script1.py",
+    ]
+    assert gateway.current_revision().startswith("local-")
+    assert gateway.sync_status().stale is False
+
+
+def test_rescan_rehashes_only_changed_files(
+    checkout: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    gateway = _build_gateway(checkout)
+    first_revision = gateway.current_revision()
+    router_entry = gateway.file_manifest()["router.yaml"]
+
+    hashed: list[str] = []
+    original_hash_file = local_directory_gateway.hash_file
+
+    def _recording_hash_file(path: Path) -> FileEntry:
+        hashed.append(path.name)
+        return original_hash_file(path)
+
+    monkeypatch.setattr(local_directory_gateway, "hash_file", _recording_hash_file)
+
+    gateway.refresh_if_needed()
+    assert hashed == []
+    assert gateway.current_revision() == first_revision
+
+    _edit(checkout / "rules" / "rule1.md", "# rule one, edited\n")
+    gateway.refresh_if_needed()
+
+    assert hashed == ["rule1.md"]
+    assert gateway.current_revision() != first_revision
+    assert gateway.file_manifest()["router.yaml"] is router_entry
+
+
+def test_touch_without_content_change_keeps_revision(checkout: Path) -> None:
+    gateway = _build_gateway(checkout)
+    revision = gateway.current_revision()
+
+    _edit(checkout / "rules" / "rule1.md", "# rule one\n")
+    gateway.refresh_if_needed()
+
+    assert gateway.current_revision() == revision
+
+
+def test_poll_interval_limits_scans(checkout: Path) -> None:
+    gateway = LocalDirectoryRepositoryGateway(
+        root_dir=str(checkout), poll_interval_seconds=3600
+    )
+    revision = gateway.current_revision()
+
+    _edit(checkout / "rules" / "rule1.md", "# changed\n")
+    gateway.refresh_if_needed()
+    assert gateway.current_revision() == revision
+
+    gateway.force_refresh()
+    assert gateway.current_revision() != revision
+
+
+def test_removed_router_keeps_last_known_files(checkout: Path) -> None:
+    gateway = _build_gateway(checkout)
+    revision = gateway.current_revision()
+
+    (checkout / "router.yaml").unlink()
+    gateway.refresh_if_needed()
+
+    status = gateway.sync_status()
+    assert status.stale is True
+    assert status.sha == revision
+    assert "router.yaml" in (status.last_error or "")
+
+
+def test_missing_router_is_rejected(tmp_path: Path) -> None:
+    with pytest.raises(RepositorySyncError, match="router.yaml"):
+        LocalDirectoryRepositoryGateway(root_dir=str(tmp_path))
+
+
+def test_service_picks_up_edited_rule(checkout: Path) -> None:
+    service = PolicyGatewayService(repository_gateway=_build_gateway(checkout))
+    assert "# rule one" in service.read_rules(["rule1"])
+
+    _edit(checkout / "rules" / "rule1.md", "# rule one, edited\n")
+
+    assert "# rule one, edited" in service.read_rules(["rule1"])
+    assert service.search_rules("edited")[0].alias == "rule1"
@@ -0,0 +1,44 @@
+"""End-to-end tests for read_rules delivery modes through the MCP client."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastmcp import Client
+
+from policygate.domains.gateway.services import PolicyGatewayService
+from policygate.entry_points import mcp_server
+from tests.test_gateway_service import (
+    StubRepositoryGateway,
+    rule_section,
+    rules_document,
+)
+
+
+def test_read_rules_chunked_reports_progress_per_rule(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    service = PolicyGatewayService(repository_gateway=StubRepositoryGateway())
+    monkeypatch.setattr(mcp_server, "build_service", lambda: service)
+    progress: list[tuple[float, float | None, str | None]] = []
+
+    async def _on_progress(
+        value: float,
+        total: float | None,
+        message: str | None,
+    ) -> None:
+        progress.append((value, total, message))
+
+    async def _run() -> str:
+        async with Client(mcp_server.mcp, progress_handler=_on_progress) as client:
+            result = await client.call_tool(
+                name="read_rules",
+                arguments={"rule_names": ["rule1"], "chunked": True},
+            )
+            return result.data
+
+    payload = asyncio.run(_run())
+
+    assert payload == rules_document(rule_section("rule1", "# rule"))
+    assert progress == [(1, 1, rule_section("rule1", "# rule"))]
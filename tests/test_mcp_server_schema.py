@@ -40,6 +40,16 @@ def test_read_rules_schema_has_string_items() -> None:
     assert schema["items"]["type"] == "string"
 
 
+def test_search_rules_schema_has_query_and_limit() -> None:
+    async def _get_schema() -> dict:
+        tool = await mcp.get_tool("search_rules")
+        return tool.parameters["properties"]
+
+    schema = asyncio.run(_get_schema())
+    assert schema["query"]["type"] == "string"
+    assert schema["limit"]["type"] == "integer"
+
+
 def test_copy_scripts_schema_has_string_items() -> None:
     async def _get_schema() -> dict:
         tool = await mcp.get_tool("copy_scripts")
@@ -50,6 +60,18 @@ def test_copy_scripts_schema_has_string_items() -> None:
     assert schema["items"]["type"] == "string"
 
 
+def test_configure_profiling_schema_has_mode_choices() -> None:
+    async def _get_schema() -> dict:
+        tool = await mcp.get_tool("configure_profiling")
+        return tool.parameters["properties"]
+
+    schema = asyncio.run(_get_schema())
+    assert schema["next_calls"]["type"] == "integer"
+    assert {"enum": ["cprofile", "sampling"], "type": "string"} in schema["mode"][
+        "anyOf"
+    ]
+
+
 def test_build_service_reuses_cached_instance(monkeypatch: pytest.MonkeyPatch) -> None:
     gateway_init_calls = 0
 
@@ -59,15 +81,34 @@ def test_build_service_reuses_cached_instance(monkeypatch: pytest.MonkeyPatch) -
             gateway_init_calls += 1
 
     fake_settings = SimpleNamespace(
+        repository_backend="github",
         github_repository_url="https://github.com/owner/repo",
         github_access_token="token",
+        github_api_url="https://api.github.com",
         local_repo_data_dir="~/.policygate/repo_data",
         repository_refresh_interval_seconds=1800,
+        repository_refresh_min_interval_seconds=60,
+        repository_refresh_max_interval_seconds=7200,
+        repository_io_workers=8,
+        repository_sync_max_retries=3,
+        repository_sync_retry_backoff_seconds=0.5,
+        repository_background_refresh=True,
+        repository_invalidate_file="",
+        repository_cold_blob_min_bytes=0,
+        repository_cold_blob_promote_reads=3,
+        repository_sparse_sync=False,
+        repository_sparse_tasks="",
+        repository_archive_max_file_bytes=0,
+        repository_archive_max_total_bytes=0,
+        repository_archive_max_files=0,
+        usage_stats_file="",
     )
 
     monkeypatch.setattr(mcp_server, "get_settings", lambda: fake_settings)
     monkeypatch.setattr(mcp_server, "GitHubRepositoryGateway", FakeGateway)
+    mcp_server.build_repository_gateway.cache_clear()
     mcp_server.build_service.cache_clear()
+    mcp_server.build_usage_recorder.cache_clear()
 
     first = mcp_server.build_service()
     second = mcp_server.build_service()
@@ -75,4 +116,6 @@ def test_build_service_reuses_cached_instance(monkeypatch: pytest.MonkeyPatch) -
     assert first is second
     assert gateway_init_calls == 1
 
+    mcp_server.build_repository_gateway.cache_clear()
     mcp_server.build_service.cache_clear()
+    mcp_server.build_usage_recorder.cache_clear()
@@ -0,0 +1,99 @@
+"""Unit tests for tool call profiling."""
+
+from __future__ import annotations
+
+import logging
+import pstats
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from policygate.config.profiling import ToolProfiler
+from policygate.config.tracing import tracer
+
+
+@pytest.fixture
+def profiler(tmp_path: Path) -> Iterator[ToolProfiler]:
+    tool_profiler = ToolProfiler(sample_interval_seconds=0.001)
+    tool_profiler.configure(profile_dir=str(tmp_path / "profiles"))
+    try:
+        yield tool_profiler
+    finally:
+        tracer.disable()
+
+
+def _busy(milliseconds: float) -> None:
+    deadline = time.perf_counter() + milliseconds / 1000
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_armed_profiler_profiles_next_calls_only(profiler: ToolProfiler) -> None:
+    profiler.configure(next_calls=2)
+
+    for _ in range(3):
+        with profiler.profile("read_rules"):
+            _busy(1)
+
+    status = profiler.status()
+    assert status.armed_calls == 0
+    assert len(status.recent_profiles) == 2
+    stats = pstats.Stats(status.recent_profiles[0])
+    assert "_busy" in stats.get_stats_profile().func_profiles
+
+
+def test_sampling_mode_writes_collapsed_stacks(profiler: ToolProfiler) -> None:
+    profiler.configure(mode="sampling", next_calls=1)
+
+    with profiler.profile("search_rules"):
+        _busy(30)
+
+    (profile_path,) = profiler.status().recent_profiles
+    assert profile_path.endswith(".collapsed")
+    lines = Path(profile_path).read_text(encoding="utf-8").splitlines()
+    assert any("test_profiling:_busy" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_slow_call_profiling_keeps_only_slow_calls(profiler: ToolProfiler) -> None:
+    profiler.configure(slow_call_threshold_ms=20, profile_slow_calls=True)
+
+    with profiler.profile("outline_router"):
+        pass
+    with profiler.profile("outline_router"):
+        _busy(25)
+
+    (profile_path,) = profiler.status().recent_profiles
+    assert "-outline_router-" in Path(profile_path).name
+
+
+def test_slow_call_record_has_stage_breakdown(
+    profiler: ToolProfiler,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    profiler.configure(slow_call_threshold_ms=5)
+
+    with caplog.at_level(logging.WARNING, logger="policygate"):
+        with tracer.span("tool.read_rules"):
+            with tracer.span("service.load_snapshot"):
+                _busy(6)
+            with tracer.span("rules.render"):
+                pass
+        with tracer.span("tool.outline_router"):
+            pass
+
+    (record,) = [r for r in caplog.records if r.getMessage() == "Slow tool call"]
+    assert record.tool == "read_rules"
+    assert set(record.stages_ms) == {"service.load_snapshot", "rules.render"}
+    assert record.stages_ms["service.load_snapshot"] >= 5
+
+
+def test_disabling_slow_call_log_stops_tracing(profiler: ToolProfiler) -> None:
+    profiler.configure(slow_call_threshold_ms=5)
+    assert tracer.enabled
+
+    profiler.configure()
+
+    assert not tracer.enabled
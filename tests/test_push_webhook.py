@@ -0,0 +1,258 @@
+"""Tests for push webhook verification, routing and targeted syncs."""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import http.client
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from policygate.entry_points.push_webhook import (
+    PushEvent,
+    PushWebhookServer,
+    parse_push_event,
+    verify_signature,
+)
+from policygate.infrastructure.repository.github_repository_gateway import (
+    GitHubRepositoryGateway,
+    _chain_push,
+)
+from tests.fake_github import FakeGitHubApi, build_gateway
+
+SECRET = "webhook-secret"
+PUSH_PAYLOAD = (
+    Path(__file__).parent / "fixtures" / "github_push_event.json"
+).read_bytes()
+PUSHED_SHA = "0d1a26e67d8f5eaf1f6ba5c57fc3c7d91ac0fd1c"
+
+
+def _sign(body: bytes, secret: str = SECRET) -> str:
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def _headers(body: bytes, event: str = "push") -> dict[str, str]:
+    return {"x-github-event": event, "x-hub-signature-256": _sign(body)}
+
+
+def _wait_for_push_sync(gateway: GitHubRepositoryGateway) -> None:
+    thread = gateway._push_thread
+    if thread is not None:
+        thread.join(timeout=5)
+
+
+def test_signature_verification_uses_raw_body() -> None:
+    assert verify_signature(SECRET, PUSH_PAYLOAD, _sign(PUSH_PAYLOAD))
+    assert not verify_signature(SECRET, PUSH_PAYLOAD + b" ", _sign(PUSH_PAYLOAD))
+    assert not verify_signature(SECRET, PUSH_PAYLOAD, _sign(PUSH_PAYLOAD, "other"))
+    assert not verify_signature(SECRET, PUSH_PAYLOAD, None)
+    assert not verify_signature("", PUSH_PAYLOAD, _sign(PUSH_PAYLOAD, ""))
+
+
+def test_recorded_push_payload_is_parsed() -> None:
+    event = parse_push_event(PUSH_PAYLOAD)
+
+    assert event == PushEvent(
+        repository="owner/repo",
+        ref="refs/heads/main",
+        sha=PUSHED_SHA,
+        default_branch="main",
+        before="6113728f27ae82c7b1a177c8d03f9e96e0adf246",
+    )
+    assert event.targets_default_branch
+
+
+def test_handle_routes_deliveries() -> None:
+    pushes: list[PushEvent] = []
+    server = PushWebhookServer(
+        secret=SECRET, on_push=lambda event: pushes.append(event) or True
+    )
+    other_branch = json.dumps(
+        {**json.loads(PUSH_PAYLOAD), "ref": "refs/heads/feature"}
+    ).encode()
+
+    assert server.handle("/other", _headers(PUSH_PAYLOAD), PUSH_PAYLOAD)[0] == 404
+    assert server.handle("/webhook", {"x-github-event": "push"}, PUSH_PAYLOAD) == (
+        401,
+        "invalid signature",
+    )
+    assert server.handle("/webhook", _headers(b"{}", "ping"), b"{}") == (200, "pong")
+    assert server.handle("/webhook", _headers(b"{}", "issues"), b"{}")[0] == 202
+    assert server.handle("/webhook", _headers(b"[]"), b"[]")[0] == 400
+    assert server.handle("/webhook", _headers(other_branch), other_branch) == (
+        202,
+        "ignored ref: refs/heads/feature",
+    )
+    assert pushes == []
+
+    status, message = server.handle("/webhook", _headers(PUSH_PAYLOAD), PUSH_PAYLOAD)
+
+    assert (status, message) == (202, f"sync scheduled: {PUSHED_SHA}")
+    assert [event.sha for event in pushes] == [PUSHED_SHA]
+
+
+def test_server_accepts_signed_delivery_over_http() -> None:
+    pushes: list[PushEvent] = []
+    server = PushWebhookServer(
+        secret=SECRET, on_push=lambda event: pushes.append(event) or True
+    )
+    server.start()
+    try:
+        host, port = server.address
+        request = urllib.request.Request(
+            f"http://{host}:{port}/webhook",
+            data=PUSH_PAYLOAD,
+            headers={
+                "X-GitHub-Event": "push",
+                "X-Hub-Signature-256": _sign(PUSH_PAYLOAD),
+                "Content-Type": "application/json",
+            },
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            assert response.status == 202
+
+        request.remove_header("X-hub-signature-256")
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request, timeout=5)
+        assert error.value.code == 401
+    finally:
+        server.stop()
+
+    assert [event.sha for event in pushes] == [PUSHED_SHA]
+
+
+@pytest.mark.parametrize(
+    ("content_length", "status"),
+    [("abc", 400), ("-5", 400), (str(2**40), 413)],
+)
+def test_server_rejects_bad_content_length_before_reading(
+    content_length: str, status: int
+) -> None:
+    server = PushWebhookServer(secret=SECRET, on_push=lambda event: True)
+    server.start()
+    try:
+        host, port = server.address
+        connection = http.client.HTTPConnection(host, port, timeout=5)
+        connection.putrequest("POST", "/webhook")
+        connection.putheader("Content-Length", content_length)
+        connection.endheaders()
+        response = connection.getresponse()
+        assert response.status == status
+        connection.close()
+    finally:
+        server.stop()
+
+
+def test_server_times_out_short_request_body() -> None:
+    server = PushWebhookServer(
+        secret=SECRET, on_push=lambda event: True, request_timeout_seconds=0.2
+    )
+    server.start()
+    try:
+        host, port = server.address
+        connection = http.client.HTTPConnection(host, port, timeout=5)
+        connection.putrequest("POST", "/webhook")
+        connection.putheader("Content-Length", str(len(PUSH_PAYLOAD)))
+        connection.endheaders(PUSH_PAYLOAD[:10])
+        started = time.monotonic()
+        response = connection.getresponse()
+        assert response.status == 408
+        assert time.monotonic() - started < 2
+        connection.close()
+    finally:
+        server.stop()
+
+
+def test_push_syncs_pushed_sha_without_polling_api(tmp_path: Path) -> None:
+    api = FakeGitHubApi()
+    gateway = build_gateway(tmp_path, api)
+    gateway.force_refresh()
+    api.files["rules/rule1.md"] = "# rule one, updated\n"
+    api.requests.clear()
+
+    assert gateway.notify_push("Owner/Repo", PUSHED_SHA, before="sha-1")
+    _wait_for_push_sync(gateway)
+
+    assert api.requests == [f"/repos/owner/repo/tarball/{PUSHED_SHA}"]
+    assert gateway.current_revision() == PUSHED_SHA
+    assert gateway.read_text("rules/rule1.md") == "# rule one, updated\n"
+
+
+def test_requests_do_not_wait_for_a_running_push_sync(tmp_path: Path) -> None:
+    api = FakeGitHubApi()
+    gateway = build_gateway(tmp_path, api, sync=True)
+    api.tarball_gate = threading.Event()
+    gateway.notify_push("owner/repo", PUSHED_SHA, before="sha-1")
+    gateway._scheduler.record_changed(now=0)
+
+    request = threading.Thread(target=gateway.refresh_if_needed)
+    started = time.monotonic()
+    request.start()
+    request.join(timeout=2)
+    waited = time.monotonic() - started
+    api.tarball_gate.set()
+    _wait_for_push_sync(gateway)
+
+    assert waited < 1
+    assert gateway.current_revision() == PUSHED_SHA
+
+
+def test_late_delivery_of_older_push_does_not_sync_backwards(tmp_path: Path) -> None:
+    api = FakeGitHubApi()
+    gateway = build_gateway(tmp_path, api)
+    gateway.force_refresh()
+    api.sha = "sha-3"
+
+    gateway.notify_push("owner/repo", "sha-3", before="sha-2")
+    _wait_for_push_sync(gateway)
+    assert gateway.current_revision() == "sha-3"
+
+    api.requests.clear()
+    gateway.notify_push("owner/repo", "sha-2", before="sha-1")
+    _wait_for_push_sync(gateway)
+
+    assert gateway.current_revision() == "sha-3"
+    assert api.count("/tarball/sha-2") == 0
+    assert api.count("/commits/main") == 1
+
+
+def test_pending_pushes_chain_only_when_they_continue_each_other() -> None:
+    assert _chain_push(None, "sha-1", "sha-2") == ("sha-1", "sha-2")
+    assert _chain_push(("sha-1", "sha-2"), "sha-2", "sha-3") == ("sha-1", "sha-3")
+    assert _chain_push(("sha-2", "sha-3"), "sha-1", "sha-2") == ("sha-1", "sha-3")
+    assert _chain_push(("sha-1", "sha-2"), "sha-7", "sha-8") == (None, None)
+
+
+def test_push_for_other_repository_is_ignored(tmp_path: Path) -> None:
+    api = FakeGitHubApi()
+    gateway = build_gateway(tmp_path, api)
+
+    assert not gateway.notify_push("someone/else", PUSHED_SHA)
+    assert gateway._push_thread is None
+    assert api.requests == []
+
+
+def test_touching_invalidate_file_makes_check_due(tmp_path: Path) -> None:
+    api = FakeGitHubApi()
+    signal = tmp_path / "invalidate"
+    signal.touch()
+    gateway = build_gateway(tmp_path, api, invalidate_file=str(signal))
+    gateway.refresh_if_needed()
+    api.sha = "sha-2"
+
+    gateway.refresh_if_needed()
+    assert gateway.current_revision() == "sha-1"
+
+    later = time.time() + 10
+    os.utime(signal, (later, later))
+    gateway.refresh_if_needed()
+
+    assert gateway.current_revision() == "sha-2"
@@ -0,0 +1,121 @@
+"""Tests for adaptive refresh scheduling and GitHub rate-limit handling."""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from policygate.domains.gateway.exceptions import RepositorySyncError
+from policygate.infrastructure.repository.refresh_scheduler import (
+    AdaptiveRefreshScheduler,
+    RateLimitBudget,
+)
+from tests.fake_github import FakeGitHubApi, build_gateway
+
+SCHEDULED = {
+    "refresh_interval_seconds": 60,
+    "min_refresh_interval_seconds": 10,
+    "max_refresh_interval_seconds": 600,
+}
+
+
+def test_scheduler_backs_off_when_quiet_and_resets_after_change() -> None:
+    scheduler = AdaptiveRefreshScheduler(
+        initial_interval_seconds=60,
+        min_interval_seconds=10,
+        max_interval_seconds=200,
+    )
+
+    scheduler.record_unchanged(now=0)
+    assert scheduler.next_check_at == 60
+    scheduler.record_unchanged(now=60)
+    assert scheduler.next_check_at == 180
+    scheduler.record_unchanged(now=180)
+    scheduler.record_unchanged(now=380)
+    assert scheduler.next_check_at == 580
+
+    scheduler.record_changed(now=600)
+    assert scheduler.next_check_at == 610
+
+
+def test_scheduler_backs_off_exponentially_on_errors() -> None:
+    scheduler = AdaptiveRefreshScheduler(
+        initial_interval_seconds=60,
+        min_interval_seconds=10,
+        max_interval_seconds=100,
+    )
+
+    scheduler.record_error(now=0)
+    assert scheduler.next_check_at == 20
+    scheduler.record_error(now=0)
+    assert scheduler.next_check_at == 40
+    scheduler.record_error(now=0)
+    scheduler.record_error(now=0)
+    assert scheduler.next_check_at == 100
+
+    scheduler.record_throttled(now=0, retry_at=500)
+    assert scheduler.next_check_at == 500
+
+
+def test_budget_blocks_on_retry_after_and_exhausted_limit() -> None:
+    budget = RateLimitBudget(reserve=0)
+
+    assert budget.observe(429, {"retry-after": "30"}, now=100) is True
+    assert budget.blocked_for(now=110) == 20
+
+    budget = RateLimitBudget(reserve=0)
+    throttled = budget.observe(
+        403,
+        {"x-ratelimit-remaining": "0", "x-ratelimit-reset": "400"},
+        now=100,
+    )
+    assert throttled is True
+    assert budget.blocked_for(now=100) == 300
+
+    budget = RateLimitBudget(reserve=0)
+    assert budget.observe(403, {"x-ratelimit-remaining": "10"}, now=100) is False
+    assert budget.blocked_for(now=100) == 0
+
+
+def test_gateway_skips_checks_until_schedule_is_due(tmp_path: Path) -> None:
+    api = FakeGitHubApi()
+    gateway = build_gateway(tmp_path, api, **SCHEDULED)
+
+    gateway.refresh_if_needed()
+    gateway.refresh_if_needed()
+
+    assert api.count("/commits/main") == 1
+    assert api.count("/tarball/main") == 1
+    assert gateway.read_text("rules/rule1.md") == "# rule one\n"
+
+
+def test_throttled_gateway_shares_budget_and_serves_cache(tmp_path: Path) -> None:
+    api = FakeGitHubApi()
+    budget = RateLimitBudget()
+    first = build_gateway(
+        tmp_path, api, name="first", rate_limit_budget=budget, **SCHEDULED
+    )
+    second = build_gateway(
+        tmp_path, api, name="second", rate_limit_budget=budget, **SCHEDULED
+    )
+    first.force_refresh()
+    second.force_refresh()
+
+    api.queue_response(429, headers={"Retry-After": "120"})
+    with pytest.raises(httpx.HTTPStatusError):
+        first.force_refresh()
+    requests_after_throttle = len(api.requests)
+
+    first._scheduler.record_changed(now=0)
+    second._scheduler.record_changed(now=0)
+    first.refresh_if_needed()
+    second.refresh_if_needed()
+    with pytest.raises(RepositorySyncError, match="rate limit"):
+        second.force_refresh()
+
+    assert len(api.requests) == requests_after_throttle
+    assert budget.blocked_for(time.time()) > 100
+    assert second.read_text("rules/rule1.md") == "# rule one\n"
@@ -0,0 +1,213 @@
+"""Tests for retries, resumable downloads and last-known-good fallback."""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from policygate.domains.gateway.exceptions import RepositorySyncError
+from policygate.infrastructure.repository.github_repository_gateway import (
+    GitHubRepositoryGateway,
+)
+from tests.fake_github import FakeGitHubApi, build_gateway
+
+RETRYING = {
+    "refresh_interval_seconds": 60,
+    "max_sync_retries": 2,
+    "sync_retry_backoff_seconds": 0,
+}
+
+
+def _make_due(gateway: GitHubRepositoryGateway) -> None:
+    gateway._scheduler.record_changed(now=0)
+
+
+def test_interrupted_download_resumes_with_range_request(tmp_path: Path) -> None:
+    api = FakeGitHubApi()
+    api.interrupt_tarball_after = 40
+    gateway = build_gateway(tmp_path, api, **RETRYING)
+
+    gateway.force_refresh()
+
+    assert api.range_requests == ["bytes=40-"]
+    assert gateway.read_text("rules/rule1.md") == "# rule one\n"
+    assert gateway.sync_status().sha == "sha-1"
+
+
+def test_server_errors_are_retried(tmp_path: Path) -> None:
+    api = FakeGitHubApi()
+    api.queue_response(502)
+    api.queue_response(503)
+    gateway = build_gateway(tmp_path, api, **RETRYING)
+
+    gateway.force_refresh()
+
+    assert gateway.current_revision() == "sha-1"
+
+
+def test_retries_are_bounded(tmp_path: Path) -> None:
+    api = FakeGitHubApi()
+    for _ in range(3):
+        api.queue_response(500)
+    gateway = build_gateway(tmp_path, api, **RETRYING)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        gateway.force_refresh()
+
+    assert not (tmp_path / "cache").exists()
+
+
+def test_outage_keeps_last_good_snapshot_and_flags_stale(tmp_path: Path) -> None:
+    api = FakeGitHubApi()
+    gateway = build_gateway(tmp_path, api, **RETRYING)
+    gateway.force_refresh()
+
+    for _ in range(3):
+        api.queue_response(500)
+    _make_due(gateway)
+    gateway.refresh_if_needed()
+
+    status = gateway.sync_status()
+    assert status.stale is True
+    assert status.sha == "sha-1"
+    assert "500" in (status.last_error or "")
+    assert gateway.read_text("rules/rule1.md") == "# rule one\n"
+
+    api.sha = "sha-2"
+    api.files["rules/rule1.md"] = "# rule one v2\n"
+    _make_due(gateway)
+    gateway.refresh_if_needed()
+
+    assert gateway.sync_status().stale is False
+    assert gateway.read_text("rules/rule1.md") == "# rule one v2\n"
+
+
+def test_invalid_router_is_rejected_and_previous_snapshot_served(
+    tmp_path: Path,
+) -> None:
+    api = FakeGitHubApi()
+    gateway = build_gateway(tmp_path, api, **RETRYING)
+    gateway.force_refresh()
+
+    api.sha = "sha-2"
+    del api.files["rules/rule1.md"]
+    api.files["rules/other.md"] = "# other\n"
+    _make_due(gateway)
+    gateway.refresh_if_needed()
+
+    status = gateway.sync_status()
+    assert status.stale is True
+    assert status.sha == "sha-1"
+    assert "rules/rule1.md" in (status.last_error or "")
+    assert gateway.read_text("rules/rule1.md") == "# rule one\n"
+
+
+def test_interrupted_swap_is_recovered_on_startup(tmp_path: Path) -> None:
+    api = FakeGitHubApi()
+    build_gateway(tmp_path, api, **RETRYING).force_refresh()
+    (tmp_path / "cache").rename(tmp_path / ".cache.previous")
+
+    gateway = build_gateway(tmp_path, api, **RETRYING)
+
+    assert gateway.current_revision() == "sha-1"
+    assert gateway.read_text("rules/rule1.md") == "# rule one\n"
+
+
+def test_reads_during_snapshot_swap_wait_for_new_snapshot(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    api = FakeGitHubApi()
+    gateway = build_gateway(tmp_path, api, **RETRYING)
+    gateway.force_refresh()
+    live_dir = (tmp_path / "cache").resolve()
+    between_renames = threading.Event()
+    results: list[object] = []
+    rename = Path.rename
+
+    def slow_rename(self: Path, target: Path) -> Path:
+        renamed = rename(self, target)
+        if self == live_dir:
+            between_renames.set()
+            time.sleep(0.2)
+        return renamed
+
+    def read_during_swap() -> None:
+        between_renames.wait(timeout=5)
+        try:
+            results.append(gateway.read_many_texts(["rules/rule1.md"]))
+        except RepositorySyncError as error:
+            results.append(error)
+
+    monkeypatch.setattr(Path, "rename", slow_rename)
+    reader = threading.Thread(target=read_during_swap)
+    reader.start()
+    api.sha = "sha-2"
+    api.files["rules/rule1.md"] = "# rule one v2\n"
+    gateway.force_refresh()
+    reader.join(timeout=5)
+
+    assert results == [{"rules/rule1.md": "# rule one v2\n"}]
+
+
+def test_background_refresh_runs_off_request_path(tmp_path: Path) -> None:
+    api = FakeGitHubApi()
+    gateway = build_gateway(tmp_path, api, background_refresh=True)
+    gateway.refresh_if_needed()
+    assert gateway.current_revision() == "sha-1"
+
+    api.sha = "sha-2"
+    _make_due(gateway)
+    gateway.refresh_if_needed()
+    assert gateway._background_thread is not None
+    gateway._background_thread.join(timeout=5)
+
+    assert gateway.current_revision() == "sha-2"
+
+
+def test_requests_do_not_wait_for_a_running_background_sync(
+    tmp_path: Path,
+) -> None:
+    api = FakeGitHubApi()
+    gateway = build_gateway(tmp_path, api, background_refresh=True)
+    gateway.refresh_if_needed()
+    api.sha = "sha-2"
+    api.tarball_gate = threading.Event()
+    _make_due(gateway)
+    gateway.refresh_if_needed()
+
+    request = threading.Thread(target=gateway.refresh_if_needed)
+    started = time.monotonic()
+    request.start()
+    request.join(timeout=2)
+    waited = time.monotonic() - started
+    api.tarball_gate.set()
+    assert gateway._background_thread is not None
+    gateway._background_thread.join(timeout=5)
+
+    assert waited < 1
+    assert gateway.read_text("rules/rule1.md") == "# rule one\n"
+    assert gateway.current_revision() == "sha-2"
+
+
+def test_malformed_commit_payload_flags_background_refresh_stale(
+    tmp_path: Path,
+) -> None:
+    api = FakeGitHubApi()
+    gateway = build_gateway(tmp_path, api, background_refresh=True)
+    gateway.refresh_if_needed()
+
+    api.commit_payload = {"commit": {"message": "no sha here"}}
+    _make_due(gateway)
+    gateway.refresh_if_needed()
+    assert gateway._background_thread is not None
+    gateway._background_thread.join(timeout=5)
+
+    status = gateway.sync_status()
+    assert status.stale is True
+    assert status.sha == "sha-1"
+    assert "'sha'" in (status.last_error or "")
@@ -0,0 +1,102 @@
+"""Tests for cached MCP tool responses."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+from fastmcp import Client, FastMCP
+
+from policygate.domains.gateway.services import PolicyGatewayService
+from policygate.entry_points import mcp_server
+from policygate.entry_points.response_cache import ToolResponseCache
+from tests.test_gateway_service import (
+    StubRepositoryGateway,
+    rule_section,
+    rules_document,
+)
+
+
+def _call(server: FastMCP, name: str, arguments: dict[str, Any]) -> Any:
+    async def _run() -> Any:
+        async with Client(server) as client:
+            return (await client.call_tool(name=name, arguments=arguments)).data
+
+    return asyncio.run(_run())
+
+
+@pytest.fixture
+def gateway(monkeypatch: pytest.MonkeyPatch) -> StubRepositoryGateway:
+    stub = StubRepositoryGateway()
+    service = PolicyGatewayService(repository_gateway=stub)
+    monkeypatch.setattr(mcp_server, "build_service", lambda: service)
+    return stub
+
+
+def test_repeated_read_rules_is_served_from_cache(
+    gateway: StubRepositoryGateway,
+) -> None:
+    first = _call(mcp_server.mcp, "read_rules", {"rule_names": ["rule1"]})
+    second = _call(mcp_server.mcp, "read_rules", {"rule_names": ["rule1"]})
+
+    assert first == second == rules_document(rule_section("rule1", "# rule"))
+    assert gateway.read_many_calls == 1
+    assert gateway.refresh_calls >= 2
+
+
+def test_new_revision_invalidates_cached_responses(
+    gateway: StubRepositoryGateway,
+) -> None:
+    _call(mcp_server.mcp, "read_rules", {"rule_names": ["rule1"]})
+    gateway.revision = "sha-2"
+    gateway.files["rules/rule1.md"] = "# changed"
+
+    payload = _call(mcp_server.mcp, "read_rules", {"rule_names": ["rule1"]})
+
+    assert payload == rules_document(rule_section("rule1", "# changed"), sha="sha-2")
+    assert gateway.read_many_calls == 2
+
+
+def test_cache_repair_invalidates_cached_responses(
+    gateway: StubRepositoryGateway,
+) -> None:
+    gateway.files["rules/rule1.md"] = "# damaged"
+    _call(mcp_server.mcp, "read_rules", {"rule_names": ["rule1"]})
+    gateway.files["rules/rule1.md"] = "# repaired"
+
+    _call(mcp_server.mcp, "verify_cache", {})
+    payload = _call(mcp_server.mcp, "read_rules", {"rule_names": ["rule1"]})
+
+    assert payload == rules_document(rule_section("rule1", "# repaired"))
+
+
+def test_chunked_read_rules_bypasses_cache(gateway: StubRepositoryGateway) -> None:
+    cache = mcp_server.response_cache
+    arguments = {"rule_names": ["rule1"], "chunked": True}
+
+    for _ in range(2):
+        _call(mcp_server.mcp, "read_rules", arguments)
+
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_cache_evicts_least_recently_used_within_budget() -> None:
+    server = FastMCP(name="cache-test")
+    calls: list[str] = []
+
+    @server.tool
+    def echo(text: str) -> str:
+        calls.append(text)
+        return text
+
+    cache = ToolResponseCache(
+        revision=lambda: "sha-1", tool_names=["echo"], max_chars=20
+    )
+    server.add_middleware(cache)
+
+    for text in ["aaaa", "bbbb", "aaaa", "cccc", "bbbb"]:
+        assert _call(server, "echo", {"text": text}) == text
+
+    assert calls == ["aaaa", "bbbb", "cccc", "bbbb"]
+    assert cache.hits == 1
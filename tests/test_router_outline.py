@@ -0,0 +1,82 @@
+"""Unit tests for paged and filtered router outline rendering."""
+
+from __future__ import annotations
+
+import pytest
+
+from policygate.domains.gateway.compact_router import CompactRouter
+from policygate.domains.gateway.exceptions import InvalidCursorError
+from policygate.domains.gateway.models import RouterConfig
+from policygate.domains.gateway.outline import RouterOutline
+
+
+def _router() -> CompactRouter:
+    config = RouterConfig.model_validate(
+        {
+            "tasks": {
+                "deploy": {"description": "Deploy", "rules": ["py_style"]},
+            },
+            "rules": {
+                "py_style": {"path": "rules/py_style.md", "description": "Style"},
+                "sec_tokens": {"path": "rules/sec.md", "description": "Tokens"},
+                "py_tests": {"path": "rules/py_tests.md", "description": "Tests"},
+            },
+            "scripts": {
+                "lint": {"path": "scripts/lint.py", "description": "Lint"},
+            },
+        }
+    )
+    return CompactRouter.from_config(config)
+
+
+def test_default_render_matches_full_outline() -> None:
+    outline = RouterOutline(_router(), revision="sha-1")
+
+    rendered = outline.render()
+
+    assert rendered.startswith("# Router\n## Tasks\n### deploy")
+    assert "- **py_style**: Style" in rendered
+    assert "- **lint**: `scripts/lint.py` — Lint" in rendered
+    assert "snapshot" not in rendered
+
+
+def test_prefix_filter_keeps_router_order() -> None:
+    outline = RouterOutline(_router(), revision="sha-1")
+
+    rendered = outline.render(section="rules", prefix="py_")
+
+    assert rendered.index("py_style") < rendered.index("py_tests")
+    assert "sec_tokens" not in rendered
+    assert "## Tasks" not in rendered
+    assert rendered.endswith("_Entries 1-2 of 2; snapshot: sha-1_")
+
+
+def test_offset_and_limit_page_through_sections() -> None:
+    outline = RouterOutline(_router(), revision="sha-1")
+
+    first = outline.render(limit=2)
+    second = outline.render(offset=2, limit=2)
+
+    assert "### deploy" in first
+    assert "py_style" in first
+    assert "next offset: 2; snapshot: sha-1" in first
+    assert "sec_tokens" in second
+    assert "py_tests" in second
+    assert "next offset: 4" in second
+
+
+def test_fields_restrict_entry_details() -> None:
+    outline = RouterOutline(_router(), revision="sha-1")
+
+    rendered = outline.render(section="scripts", fields=[])
+
+    assert "- **lint**\n" in rendered
+    assert "scripts/lint.py" not in rendered
+
+
+def test_page_of_another_snapshot_is_rejected() -> None:
+    outline = RouterOutline(_router(), revision="sha-2")
+
+    assert outline.render(offset=2, limit=2, snapshot="sha-2").startswith("# Router")
+    with pytest.raises(InvalidCursorError, match="snapshot sha-1"):
+        outline.render(offset=2, limit=2, snapshot="sha-1")
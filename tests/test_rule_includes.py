@@ -0,0 +1,121 @@
+"""Tests for rules that include other rules."""
+
+from __future__ import annotations
+
+import pytest
+
+from policygate.domains.gateway.compiler import (
+    FileEntry,
+    compile_router,
+    parse_router,
+    referenced_paths,
+)
+from policygate.domains.gateway.exceptions import RouterValidationError
+from policygate.domains.gateway.outline import RouterOutline
+from policygate.domains.gateway.services import PolicyGatewayService
+from tests.test_gateway_service import (
+    StubRepositoryGateway,
+    rule_section,
+    rules_document,
+)
+
+ROUTER = """
+tasks:
+  review:
+    description: Review code
+    rules: [py_style]
+rules:
+  base:
+    path: rules/base.md
+    description: Shared conventions
+  py_base:
+    path: rules/py_base.md
+    description: Python conventions
+    includes: [base]
+  py_style:
+    path: rules/py_style.md
+    description: Python style
+    includes: [py_base, base]
+  py_tests:
+    path: rules/py_tests.md
+    description: Python tests
+    includes: [py_base]
+""".strip()
+
+
+def _manifest(paths: list[str]) -> dict[str, FileEntry]:
+    return {path: FileEntry(size=1, sha256="x") for path in paths}
+
+
+def _service() -> PolicyGatewayService:
+    gateway = StubRepositoryGateway()
+    gateway.router = ROUTER
+    gateway.files = {
+        "rules/base.md": "shared",
+        "rules/py_base.md": "python",
+        "rules/py_style.md": "style",
+        "rules/py_tests.md": "tests",
+    }
+    return PolicyGatewayService(repository_gateway=gateway)
+
+
+def test_compile_orders_includes_before_including_rules() -> None:
+    router = parse_router(ROUTER)
+    compiled = compile_router(
+        router,
+        manifest=_manifest([rule.path for rule in router.rules.values()]),
+    )
+
+    assert compiled.rule_includes["base"] == ()
+    assert compiled.rule_includes["py_style"] == ("base", "py_base")
+    assert referenced_paths(router, tasks=["review"]) == {
+        "rules/base.md",
+        "rules/py_base.md",
+        "rules/py_style.md",
+    }
+    assert (
+        "- **py_style**: Python style (includes: py_base, base)"
+        in RouterOutline(router).render()
+    )
+
+
+def test_compile_reports_include_cycles_and_unknown_includes() -> None:
+    router = parse_router(
+        """
+rules:
+  a: {path: rules/a.md, description: A, includes: [b]}
+  b: {path: rules/b.md, description: B, includes: [a, missing]}
+""".strip()
+    )
+
+    with pytest.raises(RouterValidationError) as error:
+        compile_router(router, manifest=_manifest(["rules/a.md", "rules/b.md"]))
+
+    assert "rule include cycle: a -> b -> a" in str(error.value)
+    assert "rule 'b' includes unknown rule 'missing'" in str(error.value)
+
+
+def test_read_rules_emits_shared_includes_once() -> None:
+    payload = _service().read_rules(["py_style", "py_tests"])
+
+    assert payload == rules_document(
+        rule_section("base", "shared"),
+        rule_section("py_base", "python"),
+        rule_section("py_style", "style"),
+        rule_section("py_tests", "tests"),
+    )
+
+
+def test_paged_read_continues_through_included_rules() -> None:
+    service = _service()
+    marker = '\n\n<snapshot sha="sha-1" />'
+    pages = [service.read_rules(["py_tests"], max_chars=70)]
+    while "next cursor: " in pages[-1]:
+        page, cursor = pages[-1].rsplit("\n\n_Truncated; next cursor: ", 1)
+        pages[-1] = page.removesuffix(marker)
+        pages.append(
+            service.read_rules(["py_tests"], max_chars=70, cursor=cursor.rstrip("_"))
+        )
+
+    assert len(pages) == 3
+    assert "\n\n".join(pages) == service.read_rules(["py_tests"])
@@ -0,0 +1,96 @@
+"""Unit tests for budgeted rules pages and continuation cursors."""
+
+from __future__ import annotations
+
+import pytest
+
+from policygate.domains.gateway.exceptions import InvalidCursorError
+from policygate.domains.gateway.reading import (
+    RulesPage,
+    decode_rules_cursor,
+    encode_rules_cursor,
+)
+from tests.test_gateway_service import rule_section, rules_document
+
+FILES = {
+    "rules/a.md": "alpha line one\nalpha line two\n",
+    "rules/b.md": "beta\n",
+    "rules/c.md": "gamma\n",
+}
+SECTIONS = [("a", "rules/a.md"), ("b", "rules/b.md"), ("c", "rules/c.md")]
+
+
+def _page(
+    max_chars: int | None,
+    start: tuple[int, int] = (0, 0),
+    reads: list[str] | None = None,
+) -> RulesPage:
+    def _read(path: str) -> str:
+        if reads is not None:
+            reads.append(path)
+        return FILES[path]
+
+    return RulesPage(
+        sections=SECTIONS,
+        read_text=_read,
+        start=start,
+        max_chars=max_chars,
+        make_cursor=lambda index, offset: f"{index}/{offset}",
+    )
+
+
+def test_unbounded_page_matches_full_document() -> None:
+    page = _page(max_chars=None)
+
+    rendered = page.render()
+
+    assert rendered == rules_document(
+        *(rule_section(alias, FILES[path]) for alias, path in SECTIONS),
+        sha="unknown",
+    )
+    assert page.next_cursor is None
+
+
+def test_page_stops_at_rule_boundary() -> None:
+    page = _page(max_chars=110)
+
+    rendered = page.render()
+
+    assert rendered.startswith(rule_section("a", FILES["rules/a.md"]) + "\n\n<b ")
+    assert "<c " not in rendered
+    assert rendered.endswith(
+        '</b>\n\n<snapshot sha="unknown" />\n\n_Truncated; next cursor: 2/0_'
+    )
+
+
+def test_oversized_rule_is_cut_at_line_break_and_resumed() -> None:
+    reads: list[str] = []
+    first = _page(max_chars=50, reads=reads)
+    first_text = "".join(chunk.text for chunk in first)
+
+    assert first_text.endswith('">\nalpha line one\n')
+    assert first.next_cursor == f"0/{len(first_text)}"
+    assert reads == ["rules/a.md"]
+
+    second = _page(max_chars=200, start=(0, len(first_text)))
+    second_text = "".join(chunk.text for chunk in second)
+
+    assert second_text.startswith("alpha line two\n</a>\n\n<b ")
+    assert first_text + second_text == "".join(
+        chunk.text for chunk in _page(max_chars=None)
+    )
+
+
+def test_cursor_roundtrip_and_snapshot_mismatch() -> None:
+    cursor = encode_rules_cursor("sha-1", ["a", "b"], 1, 7)
+
+    assert decode_rules_cursor(cursor, revision="sha-1", rule_names=["a", "b"]) == (
+        1,
+        7,
+    )
+    with pytest.raises(InvalidCursorError, match="snapshot"):
+        decode_rules_cursor(cursor, revision="sha-2", rule_names=["a", "b"])
+    with pytest.raises(InvalidCursorError, match="aliases"):
+        decode_rules_cursor(cursor, revision="sha-1", rule_names=["b"])
+    with pytest.raises(InvalidCursorError, match="malformed"):
+        decode_rules_cursor("garbage", revision="sha-1", rule_names=["a"])
@@ -0,0 +1,77 @@
+"""Unit tests for the BM25 rule search index."""
+
+from __future__ import annotations
+
+from policygate.domains.gateway.search import RuleSearchIndex, SearchDocument
+
+
+def _document(alias: str, description: str, body: str) -> SearchDocument:
+    return SearchDocument(
+        alias=alias,
+        description=description,
+        metadata_text=description,
+        body=body,
+    )
+
+
+def test_search_ranks_description_matches_first() -> None:
+    index = RuleSearchIndex(
+        documents=[
+            _document("style", "Code style", "Use black formatting for python."),
+            _document("security", "Security review", "Check python code for secrets."),
+        ]
+    )
+
+    hits = index.search("security python")
+
+    assert [hit.alias for hit in hits] == ["security", "style"]
+    assert hits[0].score > hits[1].score
+
+
+def test_search_returns_empty_for_unknown_terms() -> None:
+    index = RuleSearchIndex(documents=[_document("style", "Code style", "body")])
+
+    assert index.search("kubernetes") == []
+    assert index.search("") == []
+
+
+def test_search_respects_limit() -> None:
+    index = RuleSearchIndex(
+        documents=[_document(f"rule{i}", "Shared topic", "topic") for i in range(5)]
+    )
+
+    assert len(index.search("topic", limit=2)) == 2
+
+
+def test_rebuild_reuses_unchanged_documents() -> None:
+    first = RuleSearchIndex(
+        documents=[
+            _document("a", "Alpha", "alpha body"),
+            _document("b", "Beta", "beta body"),
+        ],
+        revision="sha-1",
+    )
+
+    second = RuleSearchIndex(
+        documents=[
+            _document("a", "Alpha", "alpha body"),
+            _document("b", "Beta", "changed gamma body"),
+        ],
+        revision="sha-2",
+        previous=first,
+    )
+
+    assert second.reused_count == 1
+    assert [hit.alias for hit in second.search("gamma")] == ["b"]
+    assert first.search("gamma") == []
+
+
+def test_bodies_by_hash_skips_documents_without_hash() -> None:
+    index = RuleSearchIndex(
+        documents=[
+            SearchDocument("a", "Alpha", "Alpha", "alpha body", content_hash="h1"),
+            _document("b", "Beta", "beta body"),
+        ]
+    )
+
+    assert index.bodies_by_hash() == {"h1": "alpha body"}
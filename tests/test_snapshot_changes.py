@@ -0,0 +1,109 @@
+"""Tests for rule hashes, snapshot comparison and unchanged-rule markers."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from policygate.domains.gateway.services import PolicyGatewayService
+from policygate.infrastructure.repository.local_directory_gateway import (
+    LocalDirectoryRepositoryGateway,
+)
+from tests.fake_github import FakeGitHubApi, build_gateway
+from tests.test_gateway_service import (
+    StubRepositoryGateway,
+    rule_section,
+    rules_document,
+)
+
+
+def _two_rule_gateway() -> StubRepositoryGateway:
+    gateway = StubRepositoryGateway()
+    gateway.router = gateway.router.replace(
+        "\nscripts:\n",
+        "\n  rule2:\n    path: rules/rule2.md\n    description: Rule two\nscripts:\n",
+    )
+    gateway.files["rules/rule2.md"] = "# second"
+    return gateway
+
+
+def test_known_hashes_replace_current_rules_with_markers() -> None:
+    gateway = _two_rule_gateway()
+    service = PolicyGatewayService(repository_gateway=gateway)
+    hashes = service.rule_hashes().hashes
+
+    payload = service.read_rules(
+        ["rule1", "rule2"],
+        known_hashes={"rule1": hashes["rule1"], "rule2": "outdated"},
+    )
+
+    assert service.rule_hashes(["rule2"]).model_dump() == {
+        "sha": "sha-1",
+        "hashes": {"rule2": hashes["rule2"]},
+    }
+    assert payload == rules_document(
+        f'<rule1 unchanged="{hashes["rule1"]}" />',
+        f'<rule2 hash="{hashes["rule2"]}">\n# second\n</rule2>',
+    )
+    assert gateway.read_many_calls == 1
+
+
+def test_paged_read_with_known_hashes_binds_cursor_to_markers() -> None:
+    service = PolicyGatewayService(repository_gateway=_two_rule_gateway())
+    known = {"rule1": service.rule_hashes().hashes["rule1"]}
+
+    first = service.read_rules(["rule1", "rule2"], max_chars=60, known_hashes=known)
+    cursor = first.rsplit("next cursor: ", 1)[1].rstrip("_")
+    second = service.read_rules(
+        ["rule1", "rule2"], max_chars=60, cursor=cursor, known_hashes=known
+    )
+
+    assert first.startswith('<rule1 unchanged="')
+    assert second == rules_document(rule_section("rule2", "# second"))
+
+
+def test_changed_since_compares_stored_manifests() -> None:
+    gateway = _two_rule_gateway()
+    gateway.manifests["sha-0"] = gateway.file_manifest()
+    gateway.files["rules/rule2.md"] = "# second, revised"
+    service = PolicyGatewayService(repository_gateway=gateway)
+
+    changes = service.changed_since("sha-0")
+    unknown = service.changed_since("sha-unknown")
+
+    assert changes.sha == "sha-1"
+    assert changes.complete
+    assert changes.changed == {"rule2": service.rule_hashes().hashes["rule2"]}
+    assert service.changed_since("sha-1").changed == {}
+    assert not unknown.complete
+    assert set(unknown.changed) == {"rule1", "rule2"}
+
+
+def test_github_gateway_keeps_manifests_of_earlier_commits(tmp_path: Path) -> None:
+    api = FakeGitHubApi()
+    gateway = build_gateway(tmp_path, api, max_sync_retries=0)
+    gateway.force_refresh()
+    first = gateway.file_manifest()
+    api.sha = "sha-2"
+    api.files["rules/rule1.md"] = "# rule one, revised\n"
+
+    gateway.force_refresh()
+
+    assert gateway.manifest_at("sha-1") == first
+    assert gateway.manifest_at("sha-2") == gateway.file_manifest()
+    assert gateway.manifest_at("../sha-1") is None
+    assert gateway.manifest_at("sha-3") is None
+
+
+def test_local_gateway_keeps_manifests_of_seen_revisions(tmp_path: Path) -> None:
+    (tmp_path / "rules").mkdir()
+    (tmp_path / "router.yaml").write_text("rules: {}\n", encoding="utf-8")
+    gateway = LocalDirectoryRepositoryGateway(str(tmp_path), poll_interval_seconds=0)
+    first_revision = gateway.current_revision()
+    first = dict(gateway.file_manifest())
+
+    (tmp_path / "rules" / "new.md").write_text("# new\n", encoding="utf-8")
+    gateway.force_refresh()
+
+    assert first_revision is not None
+    assert gateway.current_revision() != first_revision
+    assert gateway.manifest_at(first_revision) == first
@@ -0,0 +1,126 @@
+"""Tests for sparse repository sync and on-demand file fetching."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from policygate.domains.gateway.compiler import parse_router, referenced_paths
+from policygate.domains.gateway.exceptions import RepositorySyncError
+from policygate.domains.gateway.services import PolicyGatewayService
+from tests.fake_github import FakeGitHubApi, build_gateway
+
+ROUTER = (
+    "tasks:\n"
+    "  review:\n"
+    "    description: Review code\n"
+    "    rules: [style]\n"
+    "  deploy:\n"
+    "    description: Deploy service\n"
+    "    rules: [release]\n"
+    "    scripts: [ship]\n"
+    "rules:\n"
+    "  style:\n"
+    "    path: rules/style.md\n"
+    "    description: Style guide\n"
+    "  release:\n"
+    "    path: ./rules/release.md\n"
+    "    description: Release checklist\n"
+    "scripts:\n"
+    "  ship:\n"
+    "    path: scripts/ship.py\n"
+    "    description: Ship it\n"
+)
+FILES = {
+    "router.yaml": ROUTER,
+    "rules/style.md": "# style\n",
+    "rules/release.md": "# release\n",
+    "rules/unused.md": "# unused\n",
+    "scripts/ship.py": "print('ship')\n",
+}
+SPARSE = {
+    "refresh_interval_seconds": 60,
+    "max_sync_retries": 0,
+    "sparse_sync": True,
+}
+
+
+def _stored_files(cache: Path) -> list[str]:
+    return sorted(
+        path.relative_to(cache).as_posix()
+        for path in cache.rglob("*")
+        if path.is_file() and not path.name.startswith(".policygate")
+    )
+
+
+def test_referenced_paths_follow_task_allowlist() -> None:
+    router = parse_router(ROUTER)
+
+    assert referenced_paths(router) == {
+        "rules/style.md",
+        "rules/release.md",
+        "scripts/ship.py",
+    }
+    assert referenced_paths(router, tasks=["review", "missing"]) == {"rules/style.md"}
+
+
+def test_sparse_sync_stores_only_referenced_files(tmp_path: Path) -> None:
+    gateway = build_gateway(tmp_path, FakeGitHubApi(files=FILES), sync=True, **SPARSE)
+
+    assert _stored_files(tmp_path / "cache") == [
+        "router.yaml",
+        "rules/release.md",
+        "rules/style.md",
+        "scripts/ship.py",
+    ]
+    assert set(gateway.file_manifest()) == set(FILES)
+    assert gateway.verify_cache().corrupted_files == []
+
+
+def test_files_outside_task_allowlist_are_fetched_once(tmp_path: Path) -> None:
+    api = FakeGitHubApi(files=FILES)
+    gateway = build_gateway(tmp_path, api, sync=True, **SPARSE, sparse_tasks=["review"])
+    cache = tmp_path / "cache"
+    metadata = json.loads((cache / ".policygate_sync.json").read_text("utf-8"))
+
+    assert metadata["lazy_files"] == [
+        "rules/release.md",
+        "rules/unused.md",
+        "scripts/ship.py",
+    ]
+    assert gateway.read_many_texts(["rules/style.md", "./rules/release.md"]) == {
+        "rules/style.md": "# style\n",
+        "./rules/release.md": "# release\n",
+    }
+    gateway.read_text("rules/release.md")
+
+    assert api.count("/contents/rules/release.md") == 1
+    assert (cache / "rules" / "release.md").is_file()
+    gateway.force_refresh()
+    assert (cache / "rules" / "release.md").is_file()
+
+
+def test_fetched_file_must_match_manifest(tmp_path: Path) -> None:
+    api = FakeGitHubApi(files=FILES)
+    gateway = build_gateway(tmp_path, api, sync=True, **SPARSE, sparse_tasks=["review"])
+    api.files["scripts/ship.py"] = "print('tampered')\n"
+
+    with pytest.raises(RepositorySyncError, match="does not match manifest"):
+        gateway.copy_many_files(["scripts/ship.py"], str(tmp_path / "out"))
+
+    assert not (tmp_path / "cache" / "scripts" / "ship.py").exists()
+
+
+def test_search_does_not_fetch_files_left_out(tmp_path: Path) -> None:
+    api = FakeGitHubApi(files=FILES)
+    gateway = build_gateway(tmp_path, api, sync=True, **SPARSE, sparse_tasks=["review"])
+    service = PolicyGatewayService(repository_gateway=gateway)
+
+    hits = service.search_rules("release checklist")
+
+    assert [hit.alias for hit in hits] == ["release"]
+    assert not [path for path in api.requests if "/contents/" in path]
+    assert not (tmp_path / "cache" / "rules" / "release.md").exists()
+    assert [hit.alias for hit in service.search_rules("style")] == ["style"]
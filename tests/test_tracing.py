@@ -0,0 +1,114 @@
+"""Unit tests for span tracing."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from policygate.config.tracing import (
+    InMemorySpanExporter,
+    JsonLinesSpanExporter,
+    Tracer,
+    tracer,
+)
+from policygate.domains.gateway.services import PolicyGatewayService
+from tests.test_gateway_service import StubRepositoryGateway
+
+
+@pytest.fixture
+def exporter() -> Iterator[InMemorySpanExporter]:
+    memory = InMemorySpanExporter()
+    tracer.configure(exporter=memory)
+    try:
+        yield memory
+    finally:
+        tracer.disable()
+
+
+def test_disabled_tracer_returns_shared_noop_span() -> None:
+    local = Tracer()
+
+    first = local.span("a")
+    second = local.span("b", key="value")
+
+    assert first is second
+    with first as span:
+        span.set_attribute("ignored", 1)
+
+
+def test_nested_spans_share_trace_and_link_parent() -> None:
+    local = Tracer()
+    memory = InMemorySpanExporter()
+    local.configure(exporter=memory)
+
+    with local.span("outer") as outer, local.span("inner", size=3) as inner:
+        inner.set_attribute("extra", True)
+
+    finished = {span.name: span for span in memory.spans}
+    assert [span.name for span in memory.spans] == ["inner", "outer"]
+    assert finished["inner"].trace_id == finished["outer"].trace_id
+    assert finished["inner"].parent_span_id == outer.span_id
+    assert finished["outer"].parent_span_id is None
+    assert inner.attributes == {"size": 3, "extra": True}
+    assert finished["outer"].duration_ns >= finished["inner"].duration_ns
+
+
+def test_sampling_drops_whole_trace() -> None:
+    local = Tracer()
+    memory = InMemorySpanExporter()
+    draws = iter([0.9, 0.1])
+    local.configure(exporter=memory, sample_rate=0.5, random_source=lambda: next(draws))
+
+    with local.span("dropped"), local.span("dropped-child"):
+        pass
+    with local.span("kept"), local.span("kept-child"):
+        pass
+
+    assert [span.name for span in memory.spans] == ["kept-child", "kept"]
+
+
+def test_span_records_error_status() -> None:
+    local = Tracer()
+    memory = InMemorySpanExporter()
+    local.configure(exporter=memory)
+
+    with pytest.raises(ValueError), local.span("failing"):
+        raise ValueError("boom")
+
+    (span,) = memory.spans
+    assert span.status == "error"
+    assert span.attributes["error"] == "ValueError: boom"
+
+
+def test_json_lines_exporter_writes_otel_fields(tmp_path: Path) -> None:
+    trace_file = tmp_path / "traces" / "spans.jsonl"
+    local = Tracer()
+    local.configure(exporter=JsonLinesSpanExporter(str(trace_file)))
+
+    with local.span("root", alias="rule1"):
+        pass
+
+    (line,) = trace_file.read_text(encoding="utf-8").splitlines()
+    record = json.loads(line)
+    assert record["name"] == "root"
+    assert record["attributes"] == {"alias": "rule1"}
+    assert record["end_time_unix_nano"] >= record["start_time_unix_nano"]
+    assert len(record["trace_id"]) == 32
+    assert len(record["span_id"]) == 16
+
+
+def test_service_emits_stage_spans(exporter: InMemorySpanExporter) -> None:
+    service = PolicyGatewayService(repository_gateway=StubRepositoryGateway())
+
+    service.read_rules(rule_names=["rule1"])
+
+    names = [span.name for span in exporter.spans]
+    assert "service.load_snapshot" in names
+    assert "router.parse_yaml" in names
+    assert "rules.render" in names
+    spans = {span.name: span for span in exporter.spans}
+    load = spans["service.load_snapshot"]
+    assert spans["router.parse_yaml"].trace_id == load.trace_id
@@ -0,0 +1,111 @@
+"""Tests for alias usage recording, the usage_stats tool and its store."""
+
+from __future__ import annotations
+
+import asyncio
+import shutil
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastmcp import Client
+
+from policygate.domains.gateway.models import AliasUsage
+from policygate.domains.gateway.services import PolicyGatewayService
+from policygate.domains.gateway.usage import UsageRecorder
+from policygate.entry_points import mcp_server
+from policygate.infrastructure.usage.usage_store import (
+    SqliteUsageStore,
+    UsageStatsWriter,
+)
+from tests.test_gateway_service import StubRepositoryGateway
+
+
+def test_tool_calls_are_recorded_including_cached_responses(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    service = PolicyGatewayService(repository_gateway=StubRepositoryGateway())
+    monkeypatch.setattr(mcp_server, "build_service", lambda: service)
+
+    async def _run() -> dict[str, Any]:
+        async with Client(mcp_server.mcp) as client:
+
+            async def _call(name: str, **arguments: Any) -> Any:
+                return (await client.call_tool(name=name, arguments=arguments)).data
+
+            await _call("read_rules", rule_names=["rule1"])
+            await _call("read_rules", rule_names=["rule1"])
+            page = await _call("read_rules", rule_names=["rule1"], max_chars=5)
+            cursor = page.rsplit("next cursor: ", 1)[1].rstrip("_")
+            await _call("read_rules", rule_names=["rule1"], max_chars=5, cursor=cursor)
+            copied = await _call("copy_scripts", script_names=["script1"])
+            shutil.rmtree(copied["destination_directory"])
+            return await _call("usage_stats")
+
+    stats = asyncio.run(_run())
+
+    hits = {
+        (entry["kind"], entry["alias"]): entry["hits"] for entry in stats["entries"]
+    }
+    assert hits == {
+        ("rule", "rule1"): 3,
+        ("task", "task1"): 3,
+        ("script", "script1"): 1,
+    }
+    assert stats["entries"][0]["bytes_served"] == 3 * len("# rule")
+    assert stats["entries"][0]["mean_ms"] > 0
+    assert stats["unused"] == {"rule": [], "script": [], "task": []}
+
+
+def test_unchanged_and_included_rules_are_counted() -> None:
+    gateway = StubRepositoryGateway()
+    gateway.router = gateway.router.replace(
+        "    description: Rule one\n",
+        "    description: Rule one\n    includes: [rule2]\n"
+        "  rule2:\n    path: rules/rule2.md\n    description: Rule two\n",
+    )
+    gateway.files["rules/rule2.md"] = "# second"
+    service = PolicyGatewayService(repository_gateway=gateway)
+    known = service.rule_hashes(["rule2"]).hashes
+
+    service.record_rule_reads(["rule1"], 0.004, known_hashes=known)
+    service.record_rule_reads(["rule1", "missing"], 0.001)
+    stats = service.usage_stats(kind="rule", limit=1)
+
+    assert [entry.model_dump() for entry in stats.entries] == [
+        {
+            "kind": "rule",
+            "alias": "rule1",
+            "hits": 1,
+            "bytes_served": len("# rule"),
+            "total_ms": 4.0,
+            "mean_ms": 4.0,
+        }
+    ]
+    assert service.usage_stats(kind="rule").entries[1].bytes_served == 0
+    assert stats.unused == {"rule": []}
+    assert service.usage_stats(kind="script").unused == {"script": ["script1"]}
+
+
+def test_writer_adds_batches_to_sqlite_store(tmp_path: Path) -> None:
+    store = SqliteUsageStore(tmp_path / "state" / "usage.sqlite3")
+    recorder = UsageRecorder(store.load())
+    writer = UsageStatsWriter(recorder=recorder, store=store, interval_seconds=60)
+
+    recorder.record("rule", "rule1", 10, 0.002)
+    recorder.record("rule", "rule1", 10, 0.002)
+    writer.flush()
+    recorder.record("rule", "rule1", 10, 0.002)
+    recorder.record("script", "script1", 5, 0.001)
+    writer.stop()
+
+    assert sorted(store.load(), key=lambda usage: usage.alias) == [
+        AliasUsage(kind="rule", alias="rule1", hits=3, bytes_served=30, total_ms=6.0),
+        AliasUsage(
+            kind="script", alias="script1", hits=1, bytes_served=5, total_ms=1.0
+        ),
+    ]
+    assert UsageRecorder(store.load()).top("rule", 5, known={"rule1"}) == ["rule1"]
+
+    (tmp_path / "broken.sqlite3").write_text("not a database", encoding="utf-8")
+    assert SqliteUsageStore(tmp_path / "broken.sqlite3").load() == []
@@ -0,0 +1,129 @@
+"""Tests for snapshot warm-up after syncs."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+from policygate.domains.gateway.models import AliasUsage
+from policygate.domains.gateway.services import PolicyGatewayService
+from policygate.domains.gateway.usage import UsageRecorder
+from policygate.domains.gateway.warmup import WarmUpRunner
+from tests.fake_github import FakeGitHubApi, build_gateway
+from tests.test_gateway_service import rule_section, rules_document
+from tests.test_snapshot_changes import _two_rule_gateway
+
+
+def _usage(**hits: int) -> UsageRecorder:
+    return UsageRecorder(
+        AliasUsage(kind="rule", alias=alias, hits=count)
+        for alias, count in hits.items()
+    )
+
+
+def test_warm_up_preloads_most_read_rules() -> None:
+    gateway = _two_rule_gateway()
+    usage = _usage(rule2=3, rule1=1, removed=9)
+    service = PolicyGatewayService(repository_gateway=gateway, usage=usage)
+
+    assert service.warm_up(top_rules=1) == 1
+    gateway.read_many_calls = 0
+    gateway.files["rules/rule2.md"] = "# edited on disk"
+
+    assert service.read_rules(["rule2"]) == rules_document(
+        rule_section("rule2", "# second")
+    )
+    assert service.read_rules(["rule2"], max_chars=100) == service.read_rules(["rule2"])
+    assert gateway.read_many_calls == 0
+    assert service.read_rules(["rule1"]) == rules_document(
+        rule_section("rule1", "# rule")
+    )
+    assert gateway.read_many_calls == 1
+    assert usage.top("rule", 5, known={"rule1", "rule2"}) == ["rule2", "rule1"]
+
+
+def test_repair_drops_preloaded_bodies_of_repaired_files() -> None:
+    gateway = _two_rule_gateway()
+    service = PolicyGatewayService(
+        repository_gateway=gateway, usage=_usage(rule1=2, rule2=1)
+    )
+    service.outline_router()
+    gateway.files["rules/rule1.md"] = "# damaged"
+    service.warm_up(top_rules=2)
+    gateway.files["rules/rule1.md"] = "# rule"
+
+    service.verify_cache()
+
+    assert service.read_rules(["rule1"]) == rules_document(
+        rule_section("rule1", "# rule")
+    )
+    assert service.read_rules(["rule2"]) == rules_document(
+        rule_section("rule2", "# second")
+    )
+
+
+def test_warm_up_rereads_changed_rules_and_stops_when_cancelled() -> None:
+    gateway = _two_rule_gateway()
+    service = PolicyGatewayService(
+        repository_gateway=gateway, usage=_usage(rule1=2, rule2=1)
+    )
+    service.warm_up(top_rules=2)
+    gateway.files["rules/rule2.md"] = "# second, revised"
+    gateway.revision = "sha-2"
+
+    assert service.warm_up(top_rules=2, cancelled=lambda: True) == 0
+    assert service.read_rules(["rule2"]) == rules_document(
+        rule_section("rule2", "# second, revised"), sha="sha-2"
+    )
+
+    gateway.read_many_calls = 0
+    assert service.warm_up(top_rules=2) == 2
+    assert gateway.read_many_calls == 1
+
+
+def test_warm_up_builds_search_index_off_the_request_path() -> None:
+    gateway = _two_rule_gateway()
+    service = PolicyGatewayService(repository_gateway=gateway, usage=_usage(rule2=1))
+
+    service.warm_up(top_rules=1)
+    gateway.read_many_calls = 0
+
+    assert [hit.alias for hit in service.search_rules("second")] == ["rule2"]
+    assert gateway.read_many_calls == 0
+
+
+def test_runner_restarts_job_for_newer_requests() -> None:
+    started = threading.Event()
+    release = threading.Event()
+    runs: list[bool] = []
+
+    def _job(cancelled: Callable[[], bool]) -> None:
+        if not runs:
+            started.set()
+            release.wait(5)
+        runs.append(cancelled())
+
+    runner = WarmUpRunner(_job)
+    runner.schedule()
+    started.wait(5)
+    runner.schedule()
+    runner.schedule()
+    release.set()
+    runner.join(5)
+
+    assert runs == [True, False]
+
+
+def test_github_gateway_notifies_listeners_of_new_commits(tmp_path: Path) -> None:
+    api = FakeGitHubApi()
+    gateway = build_gateway(tmp_path, api, max_sync_retries=0)
+    revisions: list[str | None] = []
+    gateway.add_sync_listener(revisions.append)
+
+    gateway.force_refresh()
+    gateway.force_refresh()
+    api.sha = "sha-2"
+    gateway.force_refresh()
+
+    assert revisions == ["sha-1", "sha-2"]